@@ -1,18 +1,266 @@
+"""
+Anonymous carts kept in the cache, keyed by phone.
+
+With django-redis every cart is one Redis hash (product id -> quantity).
+Each add/update/remove is a single script call that checks the per-item
+cap, writes the field and refreshes the TTL atomically, so concurrent
+clicks on one cart need no lock and no read-modify-write round trips.
+Small hashes of integers are stored packed by Redis itself (listpack), and
+reads slide the TTL too, so a cart expires CART_TTL after its last use.
+Values are validated once, where they are written (`set_cached_cart` and
+the script arguments); reads only decode.
+
+Without Redis (local DEBUG runs on LocMemCache) the cart is a plain dict
+under one cache key, rewritten under `cart_write_lock`.
+
+The database copy is written behind: every mutation also adds the cart to a
+dirty set in the same script call, and `flush_dirty_carts` (a periodic
+task) mirrors those carts into `CartItem` for phones that already have a
+customer; a guest's cart lives in the cache alone, as before. A cart emptied by the customer
+keeps an empty marker field until it expires, so the flush can tell it from
+one that expired or was evicted. A cart missing from the cache is
+rehydrated from the database on first touch, except for a short while
+after a checkout: its transaction drops the cached cart on commit and leaves
+a marker, so a rehydration that read the pre-commit rows cannot put the
+ordered items back.
+"""
+
+import logging
+from decimal import Decimal
+
+from django.conf import settings
 from django.core.cache import cache
+from django.db import transaction
+
+from core.redis_client import get_redis_client, redis_key
+from products.image_variants import image_variant_urls
 from products.models import Product
+from products.read_model import get_catalog_read_model
+from products.stock_overlay import get_stock_levels
+from users.models import Customer
+
+from .locks import cart_write_lock
+from .models import Cart, CartItem
+
+logger = logging.getLogger(__name__)
+
+MAX_ITEM_QTY = 99
+CART_TTL = 60 * 60 * 24
+CART_FLUSH_BATCH = 500
+
+DIRTY_CARTS_KEY = "cart:dirty"
+CHECKOUT_MARKER_TTL = 60
+
+# Script results below zero are never quantities.
+_OVER_LIMIT = -1
+_NO_CART = -2
+
+# Field kept in a hash the customer emptied; never a product id.
+_EMPTY_FIELD = "_"
+
+# KEYS[1] cart hash, KEYS[2] dirty set; ARGV: product id, quantity to add,
+# cap, ttl, create.
+_ADD_SCRIPT = """
+if ARGV[5] == '0' and redis.call('EXISTS', KEYS[1]) == 0 then
+  return -2
+end
+local current = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+if current + tonumber(ARGV[2]) > tonumber(ARGV[3]) then
+  return -1
+end
+local quantity = redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+redis.call('HDEL', KEYS[1], '_')
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('SADD', KEYS[2], KEYS[1])
+return quantity
+"""
+
+# KEYS[1] cart hash, KEYS[2] dirty set; ARGV: product id, quantity (0
+# removes), cap, ttl.
+_SET_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  return -2
+end
+local quantity = tonumber(ARGV[2])
+if quantity > tonumber(ARGV[3]) then
+  return -1
+end
+if quantity == 0 then
+  redis.call('HDEL', KEYS[1], ARGV[1])
+  if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('HSET', KEYS[1], '_', 0)
+  end
+else
+  redis.call('HSET', KEYS[1], ARGV[1], quantity)
+  redis.call('HDEL', KEYS[1], '_')
+end
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('SADD', KEYS[2], KEYS[1])
+return quantity
+"""
+
+# KEYS[1] cart hash, KEYS[2] dirty set; ARGV: product id, ttl. Returns 1
+# removed, 0 not in cart.
+_REMOVE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  return -2
+end
+local removed = redis.call('HDEL', KEYS[1], ARGV[1])
+if removed == 1 then
+  if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('HSET', KEYS[1], '_', 0)
+  end
+  redis.call('EXPIRE', KEYS[1], ARGV[2])
+  redis.call('SADD', KEYS[2], KEYS[1])
+end
+return removed
+"""
+
+
+# KEYS[1] cart hash, KEYS[2] dirty set; ARGV: cap, ttl, create, then (op,
+# product id, quantity) per operation. All or nothing: returns -1 without
+# writing if any final quantity is over the cap.
+_BATCH_SCRIPT = """
+if ARGV[3] == '0' and redis.call('EXISTS', KEYS[1]) == 0 then
+  return -2
+end
+local quantities = {}
+for i = 4, #ARGV, 3 do
+  local op, pid, quantity = ARGV[i], ARGV[i + 1], tonumber(ARGV[i + 2])
+  if quantities[pid] == nil then
+    quantities[pid] = tonumber(redis.call('HGET', KEYS[1], pid) or '0')
+  end
+  if op == 'add' then
+    quantities[pid] = quantities[pid] + quantity
+  elseif op == 'set' then
+    quantities[pid] = quantity
+  else
+    quantities[pid] = 0
+  end
+end
+for _, quantity in pairs(quantities) do
+  if quantity > tonumber(ARGV[1]) then
+    return -1
+  end
+end
+for pid, quantity in pairs(quantities) do
+  if quantity > 0 then
+    redis.call('HSET', KEYS[1], pid, quantity)
+  else
+    redis.call('HDEL', KEYS[1], pid)
+  end
+end
+redis.call('HDEL', KEYS[1], '_')
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  redis.call('HSET', KEYS[1], '_', 0)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('SADD', KEYS[2], KEYS[1])
+return 0
+"""
+
+# KEYS[1] cart hash, KEYS[2] dirty set, KEYS[3] checkout marker; ARGV: ttl,
+# dirty, then (product id, quantity) pairs. Fills a missing hash only, and
+# not while a checkout is dropping the cart, so a cart written meanwhile
+# wins; returns 0 in either case.
+_RESTORE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 or redis.call('EXISTS', KEYS[3]) == 1 then
+  return 0
+end
+for i = 3, #ARGV, 2 do
+  redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+if ARGV[2] == '1' then
+  redis.call('SADD', KEYS[2], KEYS[1])
+end
+return 1
+"""
+
+# KEYS[1] cart hash, KEYS[2] dirty set; ARGV: ttl, then (product id, quantity
+# read, new quantity) triples. A field is only rewritten (0 deletes it) while
+# it still holds the quantity read, so writes landing after that read win.
+_TRIM_SCRIPT = """
+local changed = 0
+for i = 2, #ARGV, 3 do
+  if redis.call('HGET', KEYS[1], ARGV[i]) == ARGV[i + 1] then
+    if ARGV[i + 2] == '0' then
+      redis.call('HDEL', KEYS[1], ARGV[i])
+    else
+      redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 2])
+    end
+    changed = changed + 1
+  end
+end
+if changed > 0 then
+  if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('HSET', KEYS[1], '_', 0)
+  end
+  redis.call('EXPIRE', KEYS[1], ARGV[1])
+  redis.call('SADD', KEYS[2], KEYS[1])
+end
+return changed
+"""
+
+CART_BATCH_OPS = ("add", "set", "remove")
+
+
+class CartItemLimitError(ValueError):
+    def __init__(self):
+        super().__init__(f"Max {MAX_ITEM_QTY} quantity per item")
+
+
+def apply_cart_operations(quantities, operations):
+    """
+    Apply (op, product_id, quantity) operations to a {product_id: quantity}
+    map in place, with the same rules as the batch script. Returns the ids
+    whose quantity changed; raises CartItemLimitError before any change.
+    """
+    result = dict(quantities)
+    for op, product_id, quantity in operations:
+        if op == "add":
+            result[product_id] = result.get(product_id, 0) + quantity
+        elif op == "set":
+            result[product_id] = quantity
+        else:
+            result[product_id] = 0
+    if any(quantity > MAX_ITEM_QTY for quantity in result.values()):
+        raise CartItemLimitError()
+
+    changed = [pid for pid, quantity in result.items() if quantity != quantities.get(pid, 0)]
+    quantities.clear()
+    quantities.update({pid: quantity for pid, quantity in result.items() if quantity > 0})
+    return changed
 
 
 def _anon_cart_key(phone):
+    # Dict carts: the LocMemCache fallback, and Redis carts written before
+    # the hash store (adopted on first touch, gone one CART_TTL after deploy).
     return f"cart:anon:v1:{phone}"
 
 
-def get_cached_cart(phone):
-    data = cache.get(_anon_cart_key(phone))
-    if not isinstance(data, dict):
-        return {}
+def _cart_hash_key(phone):
+    return redis_key(f"cart:anon:v2:{phone}")
+
+
+def _script_keys(phone):
+    return 2, _cart_hash_key(phone), redis_key(DIRTY_CARTS_KEY)
+
+
+def _checkout_marker_key(phone):
+    return f"cart:checkout:{phone}"
 
+
+def _checked_out(client, phone):
+    """Whether a checkout of the phone's cart committed (or is committing) just now."""
+    if client is None:
+        return cache.get(_checkout_marker_key(phone)) is not None
+    return bool(client.exists(redis_key(_checkout_marker_key(phone))))
+
+
+def _normalize(cart_map):
     normalized = {}
-    for k, v in data.items():
+    for k, v in (cart_map or {}).items():
         try:
             pid = str(int(k))
             qty = int(v)
@@ -23,34 +271,384 @@ def get_cached_cart(phone):
     return normalized
 
 
-def set_cached_cart(phone, cart_map, timeout=60 * 60 * 24):
-    safe = {}
-    for k, v in (cart_map or {}).items():
-        try:
-            pid = str(int(k))
-            qty = int(v)
-            if qty > 0:
-                safe[pid] = qty
-        except Exception:
-            continue
-    cache.set(_anon_cart_key(phone), safe, timeout)
+def _decode_cart(raw):
+    cart_map = {pid.decode(): int(qty) for pid, qty in raw.items()}
+    cart_map.pop(_EMPTY_FIELD, None)
+    return cart_map
+
+
+def _database_cart(phone):
+    """{product_id: quantity} of the phone's primary customer's cart, one query."""
+    primary = Customer.objects.filter(phone=phone).order_by("id").values("id")[:1]
+    rows = CartItem.objects.filter(cart__customer_id=primary).values_list("product_id", "quantity")
+    return {str(pid): min(qty, MAX_ITEM_QTY) for pid, qty in rows if qty > 0}
+
+
+def _restore_cart(client, phone):
+    """
+    Fill a missing hash from a legacy dict cart (which only the cache knew,
+    so it is marked dirty) or else from the database copy.
+    """
+    legacy = cache.get(_anon_cart_key(phone))
+    legacy = _normalize(legacy) if isinstance(legacy, dict) else {}
+    cart_map = {pid: min(qty, MAX_ITEM_QTY) for pid, qty in legacy.items()} or _database_cart(phone)
+    if not cart_map:
+        return {}
+
+    args = [CART_TTL, 1 if legacy else 0]
+    for pid, qty in cart_map.items():
+        args.extend([pid, qty])
+    _, key, dirty_key = _script_keys(phone)
+    marker_key = redis_key(_checkout_marker_key(phone))
+    restored = int(client.eval(_RESTORE_SCRIPT, 3, key, dirty_key, marker_key, *args))
+    if legacy:
+        cache.delete(_anon_cart_key(phone))
+    if not restored:
+        return _decode_cart(client.hgetall(_cart_hash_key(phone)))
+    return cart_map
+
+
+def _run_script(client, phone, script, *args):
+    """Run a cart script, restoring the cart once if the hash is missing."""
+    result = int(client.eval(script, *_script_keys(phone), *args))
+    if result == _NO_CART and _restore_cart(client, phone):
+        result = int(client.eval(script, *_script_keys(phone), *args))
+    return result
+
+
+def _mark_dirty(phones):
+    # LocMemCache fallback only; one process, so a read-modify-write is fine.
+    dirty = cache.get(DIRTY_CARTS_KEY) or set()
+    cache.set(DIRTY_CARTS_KEY, dirty | set(phones), None)
+
+
+def _load_fallback_cart(phone):
+    """The dict cart, rehydrated from the database if missing; None if neither has one."""
+    data = cache.get(_anon_cart_key(phone))
+    if isinstance(data, dict):
+        cache.touch(_anon_cart_key(phone), CART_TTL)
+        return data
+    cart_map = _database_cart(phone)
+    if not cart_map or _checked_out(None, phone):
+        return None
+    cache.set(_anon_cart_key(phone), cart_map, CART_TTL)
+    return cart_map
+
+
+def _store_fallback_cart(phone, cart_map):
+    cache.set(_anon_cart_key(phone), cart_map, CART_TTL)
+    _mark_dirty([phone])
+
+
+def get_cached_cart(phone):
+    client = get_redis_client()
+    if client is None:
+        return _load_fallback_cart(phone) or {}
+
+    key = _cart_hash_key(phone)
+    pipe = client.pipeline(transaction=False)
+    pipe.hgetall(key)
+    pipe.expire(key, CART_TTL)
+    raw, _ = pipe.execute()
+    if not raw:
+        return _restore_cart(client, phone)
+    return _decode_cart(raw)
+
+
+def set_cached_cart(phone, cart_map, timeout=CART_TTL):
+    safe = _normalize(cart_map)
+    client = get_redis_client()
+    if client is None:
+        cache.set(_anon_cart_key(phone), safe, timeout)
+        _mark_dirty([phone])
+        return safe
+
+    _, key, dirty_key = _script_keys(phone)
+    pipe = client.pipeline(transaction=True)
+    pipe.delete(key)
+    pipe.hset(key, mapping=safe or {_EMPTY_FIELD: 0})
+    pipe.expire(key, timeout)
+    pipe.sadd(dirty_key, key)
+    pipe.execute()
     return safe
 
 
+def add_cached_cart_item(phone, product_id, quantity):
+    """
+    Add `quantity` of a product, creating the cart if needed. Returns the new
+    quantity; raises CartItemLimitError (and changes nothing) past the cap.
+    """
+    client = get_redis_client()
+    if client is None:
+        with cart_write_lock(phone):
+            cart_map = _load_fallback_cart(phone) or {}
+            next_qty = int(cart_map.get(str(product_id), 0)) + quantity
+            if next_qty > MAX_ITEM_QTY:
+                raise CartItemLimitError()
+            cart_map[str(product_id)] = next_qty
+            _store_fallback_cart(phone, cart_map)
+        return next_qty
+
+    args = (int(product_id), int(quantity), MAX_ITEM_QTY, CART_TTL)
+    # Only the first add to a new cart looks for a stored cart to keep.
+    result = _run_script(client, phone, _ADD_SCRIPT, *args, 0)
+    if result == _NO_CART:
+        result = int(client.eval(_ADD_SCRIPT, *_script_keys(phone), *args, 1))
+    if result == _OVER_LIMIT:
+        raise CartItemLimitError()
+    return result
+
+
+def set_cached_cart_item(phone, product_id, quantity):
+    """
+    Set a product's quantity (0 removes it) in an existing cart. Returns
+    False when the phone has no cart; raises CartItemLimitError past the cap.
+    """
+    client = get_redis_client()
+    if client is None:
+        with cart_write_lock(phone):
+            cart_map = _load_fallback_cart(phone)
+            if cart_map is None:
+                return False
+            if quantity == 0:
+                cart_map.pop(str(product_id), None)
+            elif quantity > MAX_ITEM_QTY:
+                raise CartItemLimitError()
+            else:
+                cart_map[str(product_id)] = quantity
+            _store_fallback_cart(phone, cart_map)
+        return True
+
+    result = _run_script(client, phone, _SET_SCRIPT, int(product_id), int(quantity), MAX_ITEM_QTY, CART_TTL)
+    if result == _OVER_LIMIT:
+        raise CartItemLimitError()
+    return result != _NO_CART
+
+
+def remove_cached_cart_item(phone, product_id):
+    """None when the phone has no cart, else whether the item was in it."""
+    client = get_redis_client()
+    if client is None:
+        with cart_write_lock(phone):
+            cart_map = _load_fallback_cart(phone)
+            if cart_map is None:
+                return None
+            if cart_map.pop(str(product_id), None) is None:
+                return False
+            _store_fallback_cart(phone, cart_map)
+        return True
+
+    result = _run_script(client, phone, _REMOVE_SCRIPT, int(product_id), CART_TTL)
+    if result == _NO_CART:
+        return None
+    return result == 1
+
+
+def apply_cached_cart_batch(phone, operations, create=False):
+    """
+    Apply (op, product_id, quantity) operations to the cached cart in one
+    atomic step. Returns False, changing nothing, when the phone has no
+    cart and `create` is not set.
+    """
+    client = get_redis_client()
+    if client is None:
+        with cart_write_lock(phone):
+            cart_map = _load_fallback_cart(phone)
+            if cart_map is None and not create:
+                return False
+            cart_map = {int(pid): qty for pid, qty in (cart_map or {}).items()}
+            apply_cart_operations(cart_map, operations)
+            _store_fallback_cart(phone, _normalize(cart_map))
+        return True
+
+    args = [MAX_ITEM_QTY, CART_TTL, 1 if create else 0]
+    for op, product_id, quantity in operations:
+        args.extend([op, int(product_id), int(quantity)])
+    result = _run_script(client, phone, _BATCH_SCRIPT, *args)
+    if result == _OVER_LIMIT:
+        raise CartItemLimitError()
+    return result != _NO_CART
+
+
+def trim_cached_cart(phone, read_map, trimmed_map):
+    """
+    Lower the lines of `read_map` (the cart as read) to `trimmed_map`,
+    dropping the ones it lacks. Lines changed since the read are left alone.
+    """
+    changes = [
+        (pid, qty, trimmed_map.get(pid, 0)) for pid, qty in read_map.items() if trimmed_map.get(pid, 0) != qty
+    ]
+    if not changes:
+        return
+    client = get_redis_client()
+    if client is None:
+        with cart_write_lock(phone):
+            cart_map = _load_fallback_cart(phone)
+            if cart_map is None:
+                return
+            for pid, qty, new_qty in changes:
+                if cart_map.get(pid) != qty:
+                    continue
+                if new_qty:
+                    cart_map[pid] = new_qty
+                else:
+                    cart_map.pop(pid)
+            _store_fallback_cart(phone, cart_map)
+        return
+
+    args = [CART_TTL]
+    for pid, qty, new_qty in changes:
+        args.extend([pid, qty, new_qty])
+    client.eval(_TRIM_SCRIPT, *_script_keys(phone), *args)
+
+
 def clear_cached_cart(phone):
+    client = get_redis_client()
+    if client is not None:
+        client.delete(_cart_hash_key(phone))
     cache.delete(_anon_cart_key(phone))
 
 
+def mark_cart_checked_out(phone):
+    """
+    Keep the phone's cart from being rehydrated or flushed for
+    CHECKOUT_MARKER_TTL, while a checkout's cleared database rows commit.
+    """
+    client = get_redis_client()
+    if client is None:
+        cache.set(_checkout_marker_key(phone), 1, CHECKOUT_MARKER_TTL)
+        return
+    client.set(redis_key(_checkout_marker_key(phone)), 1, ex=CHECKOUT_MARKER_TTL)
+
+
+def _stored_cart(client, phone):
+    """The cart as the cache holds it (possibly empty), or None if it holds none."""
+    if client is None:
+        data = cache.get(_anon_cart_key(phone))
+        return data if isinstance(data, dict) else None
+    raw = client.hgetall(_cart_hash_key(phone))
+    if not raw:
+        return None
+    return _decode_cart(raw)
+
+
+def _take_dirty_carts(client, limit):
+    if client is None:
+        dirty = sorted(cache.get(DIRTY_CARTS_KEY) or ())
+        cache.set(DIRTY_CARTS_KEY, set(dirty[limit:]), None)
+        return dirty[:limit]
+    prefix = _cart_hash_key("")
+    return [key.decode()[len(prefix):] for key in client.spop(redis_key(DIRTY_CARTS_KEY), limit) or []]
+
+
+def _restore_dirty_carts(client, phones):
+    if client is None:
+        _mark_dirty(phones)
+        return
+    client.sadd(redis_key(DIRTY_CARTS_KEY), *[_cart_hash_key(phone) for phone in phones])
+
+
+def persist_cached_cart(phone, client=None):
+    """
+    Mirror the phone's cached cart into its customer's database cart.
+    Returns False when the phone has no customer, the cache holds no cart
+    for it, or a checkout is dropping it, leaving the database as is.
+    """
+    primary_id = Customer.objects.filter(phone=phone).order_by("id").values_list("id", flat=True).first()
+    if primary_id is None:
+        return False
+    with transaction.atomic():
+        cart = Cart.objects.select_for_update().filter(customer_id=primary_id).first()
+        # Read under the row lock: checkout clears the rows holding it and
+        # marks the cart before the cached copy goes on commit.
+        if _checked_out(client, phone):
+            return False
+        cart_map = _stored_cart(client, phone)
+        if cart_map is None or (cart is None and not cart_map):
+            return False
+        if cart is None:
+            cart, _ = Cart.objects.get_or_create(customer_id=primary_id)
+
+        quantities = {int(pid): qty for pid, qty in cart_map.items()}
+        # Carts can outlive a deleted product.
+        live = set(Product.objects.filter(id__in=quantities).values_list("id", flat=True))
+        CartItem.objects.filter(cart=cart).exclude(product_id__in=live).delete()
+        CartItem.objects.bulk_create(
+            [CartItem(cart=cart, product_id=pid, quantity=qty) for pid, qty in quantities.items() if pid in live],
+            update_conflicts=True,
+            unique_fields=["cart", "product"],
+            update_fields=["quantity"],
+        )
+    return True
+
+
+def flush_dirty_carts(batch_size=CART_FLUSH_BATCH) -> int:
+    """Write every cart changed since the last flush to the database. Returns the carts written."""
+    client = get_redis_client()
+    flushed = 0
+    failed = []
+    while True:
+        phones = _take_dirty_carts(client, batch_size)
+        for phone in phones:
+            try:
+                if persist_cached_cart(phone, client):
+                    flushed += 1
+                elif _checked_out(client, phone):
+                    # Anything added since the checkout is written once the marker expires.
+                    failed.append(phone)
+            except Exception:
+                logger.exception("Cart flush failed phone=%s", phone)
+                failed.append(phone)
+        if len(phones) < batch_size:
+            break
+    if failed:
+        # Retried by the next flush.
+        _restore_dirty_carts(client, failed)
+    if flushed:
+        logger.info("Dirty carts flushed carts=%s", flushed)
+    return flushed
+
+
+def _cart_products(product_ids):
+    """
+    {id: (name, price, image_url, images)} from this worker's catalog read
+    model; only ids it does not hold yet are read from the database.
+    """
+    found = {}
+    if settings.USE_CATALOG_READ_MODEL:
+        model = get_catalog_read_model()
+        for pid in product_ids:
+            record = model.product(pid)
+            if record is not None:
+                found[pid] = (record.name, Decimal(record.price), record.image_url, record.images)
+
+    missing = [pid for pid in product_ids if pid not in found]
+    if missing:
+        for product in Product.objects.filter(id__in=missing).only("id", "name", "price", "image", "image_variants"):
+            found[product.id] = (
+                product.name,
+                product.price,
+                product.image.url if product.image else "",
+                image_variant_urls(product.image.name, product.image_variants),
+            )
+    return found
+
+
 def build_payload_from_cached_cart(phone, request=None):
+    """
+    Price a cached cart without touching the database once the read model
+    and the stock overlay are warm. Lines beyond the current stock are
+    trimmed, in the payload and in the stored cart.
+    """
     cart_map = get_cached_cart(phone)
     if not cart_map:
         return {"items": [], "total_items": 0, "total_amount": "0.00"}
 
     product_ids = [int(pid) for pid in cart_map.keys()]
-    products = Product.objects.filter(id__in=product_ids).only(
-        "id", "name", "price", "image", "stock_qty", "is_available"
-    )
-    product_map = {p.id: p for p in products}
+    products = _cart_products(product_ids)
+    # Live stock comes from the shared overlay hash, one multi-get per cart.
+    levels = get_stock_levels(products.keys())
+    base_url = request.build_absolute_uri("/")[:-1] if request else ""
 
     items = []
     total_items = 0
@@ -59,30 +657,30 @@ def build_payload_from_cached_cart(phone, request=None):
 
     for pid_text, qty in cart_map.items():
         pid = int(pid_text)
-        product = product_map.get(pid)
+        product = products.get(pid)
         if not product:
             continue
+        name, price, image_url, images = product
 
-        safe_qty = min(qty, product.stock_qty) if product.stock_qty >= 0 else qty
+        stock_qty = levels.get(pid, 0)
+        safe_qty = min(qty, stock_qty) if stock_qty >= 0 else qty
         if safe_qty <= 0:
             continue
 
         cleaned[str(pid)] = safe_qty
-        line_total = product.price * safe_qty
+        line_total = price * safe_qty
         image = None
-        if product.image:
-            if request:
-                image = request.build_absolute_uri(product.image.url)
-            else:
-                image = product.image.url
+        if image_url:
+            image = image_url if "://" in image_url else f"{base_url}{image_url}"
 
         items.append(
             {
-                "product_id": product.id,
-                "product_name": product.name,
-                "price": str(product.price),
+                "product_id": pid,
+                "product_name": name,
+                "price": str(price),
                 "quantity": safe_qty,
                 "image": image,
+                "images": images,
                 "line_total": str(line_total),
             }
         )
@@ -90,7 +688,7 @@ def build_payload_from_cached_cart(phone, request=None):
         total_amount += line_total
 
     if cleaned != cart_map:
-        set_cached_cart(phone, cleaned)
+        trim_cached_cart(phone, cart_map, cleaned)
 
     items.sort(key=lambda x: x["product_name"].lower())
     return {
@@ -1,9 +1,11 @@
+from collections import defaultdict
 from decimal import Decimal
 
 from django.db import IntegrityError, transaction
 from django.db.models import BooleanField, Case, F, Value, When
+from django.db.models.functions import Now
 
-from cart.cache_store import clear_cached_cart, get_cached_cart
+from cart.cache_store import clear_cached_cart, get_cached_cart, mark_cart_checked_out
 from cart.models import Cart, CartItem
 from notifications.services import create_order_notifications
 from orders.coupon_service import calculate_coupon_breakdown
@@ -11,12 +13,36 @@ from orders.models import Order, OrderItem
 from orders.pincode_service import ensure_serviceable_pincode
 from orders.services import create_bills_for_order, create_sales_records_for_order
 from orders.tasks import send_order_notifications
-from products.cache_utils import invalidate_catalog_cache
+from products.cache_utils import invalidate_catalog_change
+from products.catalog_changes import record_catalog_changes
 from products.models import Product
+from products.stock_overlay import adjust_stock_levels
+from products.tasks import record_placed_order_task
 from users.customer_resolver import merge_phone_carts
 from users.phone_utils import normalize_phone
 
 
+def clear_checked_out_carts(phones):
+    """
+    Empty the cached carts and their written-behind database copies. The
+    cached carts are dropped only on commit, and the checkout marker keeps
+    rehydration and flushes (which wait on the locked cart rows) from
+    bringing the ordered items back meanwhile.
+    """
+    carts = list(Cart.objects.select_for_update().filter(customer__phone__in=phones))
+    CartItem.objects.filter(cart__in=carts).delete()
+    for phone in phones:
+        mark_cart_checked_out(phone)
+
+    def drop_cached_carts():
+        for phone in phones:
+            # Counted from the commit, however long the transaction took.
+            mark_cart_checked_out(phone)
+            clear_cached_cart(phone)
+
+    transaction.on_commit(drop_cached_carts)
+
+
 @transaction.atomic
 def convert_cart_to_order(data):
     idempotency_key = data["idempotency_key"]
@@ -34,148 +60,43 @@ def convert_cart_to_order(data):
 
     ensure_serviceable_pincode(pincode=pincode, address=address)
 
+    # The cached cart is the source of truth: it is rehydrated from the
+    # database copy when missing, and a cart the customer emptied stays
+    # empty even while that copy still lags behind.
     cached_map = get_cached_cart(source_phone)
-    if cached_map:
-        customer, _ = merge_phone_carts(
-            phone=phone,
-            customer_name=name,
-            whatsapp_no=whatsapp_no,
-            create_if_missing=True,
-        )
-
-        customer.name = name
-        customer.whatsapp_no = whatsapp_no
-        customer.address = address
-        customer.save(update_fields=["name", "whatsapp_no", "address"])
-
-        subtotal_price = Decimal("0.00")
-        products = []
-        product_ids = [int(pid) for pid in cached_map.keys()]
-        product_qs = Product.objects.select_for_update().filter(id__in=product_ids)
-        product_map = {p.id: p for p in product_qs}
-
-        for pid_text, qty in cached_map.items():
-            pid = int(pid_text)
-            product = product_map.get(pid)
-            if not product:
-                continue
-            if product.stock_qty < qty:
-                raise Exception(f"{product.name} out of stock")
-            subtotal_price += product.price * qty
-            products.append((product, qty))
-
-        if not products:
-            raise Exception("Cart is empty")
-
-        pricing = calculate_coupon_breakdown(subtotal_price, coupon_code)
-
-        try:
-            order = Order.objects.create(
-                customer=customer,
-                customer_name=name,
-                phone=phone,
-                shipping_address=address,
-                idempotency_key=idempotency_key,
-                subtotal_price=pricing["subtotal"],
-                coupon_code=pricing["coupon_code"],
-                discount_percent=pricing["discount_percent"],
-                discount_amount=pricing["discount_amount"],
-                total_price=pricing["total"],
-            )
-        except IntegrityError:
-            existing = Order.objects.filter(idempotency_key=idempotency_key).first()
-            if existing:
-                return existing
-            raise
-
-        for product, qty in products:
-            OrderItem.objects.create(
-                order=order,
-                product=product,
-                quantity=qty,
-                price=product.price,
-            )
-            Product.objects.filter(pk=product.pk).update(
-                stock_qty=F("stock_qty") - qty,
-                is_available=Case(
-                    When(stock_qty__gt=qty, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ),
-            )
-
-        clear_cached_cart(source_phone)
-        if source_phone != phone:
-            clear_cached_cart(phone)
-
-        invalidate_catalog_cache()
-        create_bills_for_order(order)
-        create_sales_records_for_order(order)
-        create_order_notifications(order, event_type="ORDER_PLACED")
-        send_order_notifications.delay(order.id)
-        return order
-
-    customer, cart = None, None
-    if source_phone != phone:
-        _, source_cart = merge_phone_carts(
-            phone=source_phone,
-            create_if_missing=False,
-        )
-        customer, cart = merge_phone_carts(
-            phone=phone,
-            customer_name=name,
-            whatsapp_no=whatsapp_no,
-            create_if_missing=True,
-        )
-        if source_cart:
-            source_items = source_cart.items.select_related("product")
-            for src_item in source_items:
-                target_item, created = CartItem.objects.get_or_create(
-                    cart=cart,
-                    product=src_item.product,
-                    defaults={"quantity": src_item.quantity},
-                )
-                if not created:
-                    target_item.quantity += src_item.quantity
-                    target_item.save(update_fields=["quantity"])
-            source_cart.delete()
-    else:
-        customer, cart = merge_phone_carts(
-            phone=phone,
-            customer_name=name,
-            whatsapp_no=whatsapp_no,
-            create_if_missing=True,
-        )
+    if not cached_map:
+        raise Exception("Cart is empty")
 
-    if not cart:
-        raise Exception("Cart not found")
+    customer, _ = merge_phone_carts(
+        phone=phone,
+        customer_name=name,
+        whatsapp_no=whatsapp_no,
+        create_if_missing=True,
+    )
 
     customer.name = name
     customer.whatsapp_no = whatsapp_no
     customer.address = address
     customer.save(update_fields=["name", "whatsapp_no", "address"])
 
-    cart = Cart.objects.select_for_update().get(pk=cart.pk)
-    cart_items = cart.items.select_related("product")
-
-    if not cart_items.exists():
-        raise Exception("Cart is empty")
-
     subtotal_price = Decimal("0.00")
     products = []
-
-    product_ids = [item.product.id for item in cart_items]
+    product_ids = [int(pid) for pid in cached_map.keys()]
     product_qs = Product.objects.select_for_update().filter(id__in=product_ids)
     product_map = {p.id: p for p in product_qs}
 
-    for item in cart_items:
-        product = product_map[item.product.id]
-
-        if product.stock_qty < item.quantity:
+    for pid_text, qty in cached_map.items():
+        pid = int(pid_text)
+        product = product_map.get(pid)
+        if not product:
+            continue
+        if product.stock_qty < qty:
             raise Exception(f"{product.name} out of stock")
+        subtotal_price += product.price * qty
+        products.append((product, qty))
 
-        subtotal_price += product.price * item.quantity
-        products.append((product, item.quantity))
+    if not products:
+        raise Exception("Cart is empty")
 
     pricing = calculate_coupon_breakdown(subtotal_price, coupon_code)
 
@@ -205,7 +126,6 @@ def convert_cart_to_order(data):
             quantity=qty,
             price=product.price,
         )
-
         Product.objects.filter(pk=product.pk).update(
             stock_qty=F("stock_qty") - qty,
             is_available=Case(
@@ -213,15 +133,25 @@ def convert_cart_to_order(data):
                 default=Value(False),
                 output_field=BooleanField(),
             ),
+            updated_at=Now(),
         )
 
-    cart.items.all().delete()
-
-    invalidate_catalog_cache()
+    clear_checked_out_carts({source_phone, phone})
 
+    stock_deltas = defaultdict(int)
+    for product, qty in products:
+        stock_deltas[product.pk] -= qty
+    sold_out = any(product.stock_qty <= -stock_deltas[product.pk] for product, _ in products)
+    invalidate_catalog_change(
+        "availability" if sold_out else "stock",
+        product_ids=[product.pk for product, _ in products],
+    )
+    # The queryset updates above bypass the post_save change log.
+    record_catalog_changes([product.pk for product, _ in products])
+    transaction.on_commit(lambda: adjust_stock_levels(stock_deltas))
     create_bills_for_order(order)
     create_sales_records_for_order(order)
     create_order_notifications(order, event_type="ORDER_PLACED")
     send_order_notifications.delay(order.id)
-
+    transaction.on_commit(lambda: record_placed_order_task.delay(order.id))
     return order
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .cache_store import flush_dirty_carts
+
+
+@shared_task(bind=True, max_retries=1, default_retry_delay=30)
+def flush_dirty_carts_task(self):
+    # Carts that fail are put back in the dirty set, not retried here.
+    return flush_dirty_carts()
@@ -0,0 +1,541 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest import mock
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from cart.cache_store import (
+    CART_TTL,
+    CartItemLimitError,
+    _anon_cart_key,
+    _cart_hash_key,
+    add_cached_cart_item,
+    apply_cached_cart_batch,
+    flush_dirty_carts,
+    get_cached_cart,
+    persist_cached_cart,
+    remove_cached_cart_item,
+    set_cached_cart_item,
+    trim_cached_cart,
+)
+from cart.services import clear_checked_out_carts
+from cart.models import Cart, CartItem
+from orders.models import Order, ServiceablePincode
+from products.models import Category, Product, Section
+from products.read_model import CatalogReadModel
+from products.stock_overlay import set_stock_levels
+from core.redis_client import get_redis_client, redis_key
+from users.models import Customer
+
+PHONE = "9123456789"
+
+
+def _lua_redis_client():
+    """
+    The suite's Redis when it runs on one, else a Lua-capable fakeredis
+    (`fakeredis[lua]`); None when neither is available.
+    """
+    client = get_redis_client()
+    if client is not None:
+        return client
+    try:
+        import fakeredis
+
+        client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        client.eval("return 1", 0)
+    except Exception:
+        return None
+    return client
+
+
+class CachedCartEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        section = Section.objects.create(name=Section.SectionType.BAKERY)
+        category = Category.objects.create(name="Bread", section=section)
+        self.product = Product.objects.create(name="Milk Bread", category=category, price=Decimal("50.00"), stock_qty=50)
+
+    def post(self, path, **data):
+        return self.client.post(f"/api/cart/{path}/", {"phone": PHONE, "product_id": self.product.id, **data}, format="json")
+
+    def test_add_update_and_remove_in_the_cached_cart(self):
+        self.assertEqual(self.post("add", quantity=2).status_code, 200)
+        self.assertEqual(self.post("add", quantity=3).status_code, 200)
+        self.assertEqual(get_cached_cart(PHONE), {str(self.product.id): 5})
+
+        self.assertEqual(self.post("item/update", quantity=7).data, {"message": "Cart updated"})
+        self.assertEqual(get_cached_cart(PHONE), {str(self.product.id): 7})
+
+        self.assertEqual(self.post("item/remove").data, {"message": "Item removed"})
+        self.assertEqual(get_cached_cart(PHONE), {})
+
+    def test_cap_is_enforced_without_changing_the_cart(self):
+        self.post("add", quantity=98)
+
+        response = self.post("add", quantity=2)
+        self.assertEqual((response.status_code, response.data), (400, {"error": "Max 99 quantity per item"}))
+        self.assertEqual(self.post("item/update", quantity=100).status_code, 400)
+        self.assertEqual(get_cached_cart(PHONE), {str(self.product.id): 98})
+
+
+class RedisCartStoreTests(TestCase):
+    """Python side of the Redis path; the scripts themselves run in Redis."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = mock.MagicMock()
+        self.client.exists.return_value = 0
+        patcher = mock.patch("cart.cache_store.get_redis_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_add_is_one_script_call_for_an_existing_cart(self):
+        self.client.eval.return_value = 4
+
+        self.assertEqual(add_cached_cart_item(PHONE, 7, 1), 4)
+        self.client.eval.assert_called_once_with(mock.ANY, 2, mock.ANY, mock.ANY, 7, 1, 99, CART_TTL, 0)
+        self.client.hgetall.assert_not_called()
+
+    def test_first_add_creates_the_cart_and_over_cap_raises(self):
+        self.client.eval.side_effect = [-2, 1]
+        self.assertEqual(add_cached_cart_item(PHONE, 7, 1), 1)
+        self.assertEqual(self.client.eval.call_args.args[-1], 1)
+
+        self.client.eval.side_effect = [-1]
+        with self.assertRaises(CartItemLimitError):
+            add_cached_cart_item(PHONE, 7, 99)
+
+    def test_legacy_dict_cart_is_adopted_before_the_write(self):
+        cache.set(_anon_cart_key(PHONE), {"3": 2})
+        self.client.eval.side_effect = [-2, 1, 5]
+
+        self.assertTrue(set_cached_cart_item(PHONE, 3, 5))
+        # Restored as a dirty cart: only the cache knew it.
+        self.assertEqual(self.client.eval.call_args_list[1].args[-4:], (CART_TTL, 1, "3", 2))
+        self.assertIsNone(cache.get(_anon_cart_key(PHONE)))
+        self.assertEqual(self.client.eval.call_count, 3)
+
+    def test_missing_hash_is_rehydrated_from_the_database_copy(self):
+        customer = Customer.objects.create(name="Cart User", phone=PHONE, whatsapp_no=PHONE)
+        product = Product.objects.create(
+            name="Bun",
+            category=Category.objects.create(name="Bread", section=Section.objects.create(name=Section.SectionType.BAKERY)),
+            price=Decimal("10.00"),
+        )
+        CartItem.objects.create(cart=Cart.objects.create(customer=customer), product=product, quantity=2)
+        self.client.pipeline.return_value.execute.return_value = [{}, 0]
+        self.client.eval.return_value = 1
+
+        self.assertEqual(get_cached_cart(PHONE), {str(product.id): 2})
+        self.assertEqual(self.client.eval.call_args.args[-4:], (CART_TTL, 0, str(product.id), 2))
+
+    def test_trim_is_one_compare_and_set_script_call(self):
+        trim_cached_cart(PHONE, {"7": 5, "9": 1, "11": 2}, {"7": 3, "11": 2})
+        self.client.eval.assert_called_once_with(mock.ANY, 2, mock.ANY, mock.ANY, CART_TTL, "7", 5, 3, "9", 1, 0)
+
+    def test_read_slides_the_ttl_in_the_same_round_trip(self):
+        pipe = self.client.pipeline.return_value
+        pipe.execute.return_value = [{b"7": b"2", b"9": b"1"}, 1]
+
+        self.assertEqual(get_cached_cart(PHONE), {"7": 2, "9": 1})
+        pipe.expire.assert_called_once_with(_cart_hash_key(PHONE), CART_TTL)
+        self.assertEqual(pipe.execute.call_count, 1)
+
+        pipe.execute.return_value = [{b"_": b"0"}, 1]
+        self.assertEqual(get_cached_cart(PHONE), {})
+        self.client.eval.assert_not_called()
+
+    def test_flush_writes_the_dirty_carts_it_pops(self):
+        product = Product.objects.create(
+            name="Bun",
+            category=Category.objects.create(name="Bread", section=Section.objects.create(name=Section.SectionType.BAKERY)),
+            price=Decimal("10.00"),
+        )
+        Customer.objects.create(name="Cart User", phone=PHONE, whatsapp_no=PHONE)
+        self.client.spop.side_effect = [[_cart_hash_key(PHONE).encode()]]
+        self.client.hgetall.return_value = {str(product.id).encode(): b"3", b"_": b"0"}
+
+        self.assertEqual(flush_dirty_carts(), 1)
+        self.assertEqual(
+            list(CartItem.objects.values_list("cart__customer__phone", "product_id", "quantity")), [(PHONE, product.id, 3)]
+        )
+
+    def test_update_without_a_cached_cart_falls_back_to_the_database_cart(self):
+        self.client.eval.return_value = -2
+        self.assertFalse(set_cached_cart_item(PHONE, 3, 5))
+
+
+@override_settings(USE_CATALOG_READ_MODEL=True, CATALOG_READ_MODEL_CHECK_SECONDS=0)
+class CartScriptTests(TestCase):
+    """The Lua scripts themselves, run by Redis (or a fake that speaks Lua)."""
+
+    def setUp(self):
+        cache.clear()
+        self.redis = _lua_redis_client()
+        if self.redis is None:
+            self.skipTest("needs Redis or fakeredis[lua]")
+        # A fresh phone per test keeps a shared Redis free of leftovers.
+        self.phone = f"9{uuid4().int % 10 ** 9:09d}"
+        patcher = mock.patch("cart.cache_store.get_redis_client", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.redis.delete, _cart_hash_key(self.phone))
+        self.addCleanup(self.redis.srem, redis_key("cart:dirty"), _cart_hash_key(self.phone))
+
+    def stored(self):
+        return {pid.decode(): int(qty) for pid, qty in self.redis.hgetall(_cart_hash_key(self.phone)).items()}
+
+    def test_add_set_and_remove_write_the_hash_and_mark_it_dirty(self):
+        self.assertEqual(add_cached_cart_item(self.phone, 7, 2), 2)
+        self.assertEqual(add_cached_cart_item(self.phone, 7, 3), 5)
+        self.assertTrue(set_cached_cart_item(self.phone, 9, 4))
+        self.assertEqual(self.stored(), {"7": 5, "9": 4})
+        self.assertTrue(self.redis.sismember(redis_key("cart:dirty"), _cart_hash_key(self.phone)))
+        self.assertGreater(self.redis.ttl(_cart_hash_key(self.phone)), CART_TTL - 60)
+
+        self.assertTrue(remove_cached_cart_item(self.phone, 7))
+        self.assertFalse(remove_cached_cart_item(self.phone, 7))
+        self.assertTrue(set_cached_cart_item(self.phone, 9, 0))
+        # Emptied by the customer: the marker field keeps the hash alive.
+        self.assertEqual(self.stored(), {"_": 0})
+        self.assertEqual(get_cached_cart(self.phone), {})
+
+    def test_writes_to_a_missing_cart_report_it(self):
+        self.assertFalse(set_cached_cart_item(self.phone, 7, 1))
+        self.assertIsNone(remove_cached_cart_item(self.phone, 7))
+        self.assertFalse(apply_cached_cart_batch(self.phone, [("add", 7, 1)]))
+        self.assertEqual(self.stored(), {})
+
+    def test_cap_is_checked_before_anything_is_written(self):
+        add_cached_cart_item(self.phone, 7, 98)
+        with self.assertRaises(CartItemLimitError):
+            add_cached_cart_item(self.phone, 7, 2)
+        with self.assertRaises(CartItemLimitError):
+            set_cached_cart_item(self.phone, 9, 100)
+        with self.assertRaises(CartItemLimitError):
+            apply_cached_cart_batch(self.phone, [("set", 9, 3), ("add", 7, 1), ("add", 7, 1)])
+        self.assertEqual(self.stored(), {"7": 98})
+
+    def test_batch_applies_operations_in_order(self):
+        add_cached_cart_item(self.phone, 7, 2)
+        self.assertTrue(
+            apply_cached_cart_batch(self.phone, [("add", 7, 3), ("set", 9, 4), ("remove", 7, 0), ("add", 11, 1)])
+        )
+        self.assertEqual(self.stored(), {"9": 4, "11": 1})
+        self.assertTrue(apply_cached_cart_batch(self.phone, [("remove", 9, 0), ("set", 11, 0)]))
+        self.assertEqual(self.stored(), {"_": 0})
+
+    def test_concurrent_adds_are_never_lost_and_never_pass_the_cap(self):
+        def add(quantity):
+            try:
+                return add_cached_cart_item(self.phone, 7, quantity)
+            except CartItemLimitError:
+                return None
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(add, [1] * 40))
+        self.assertEqual(sorted(results), list(range(1, 41)))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(add, [10] * 8))
+        self.assertEqual(sum(result is not None for result in results), 5)
+        self.assertEqual(self.stored(), {"7": 90})
+
+    def test_concurrent_sets_leave_one_of_the_written_values(self):
+        add_cached_cart_item(self.phone, 7, 1)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda quantity: set_cached_cart_item(self.phone, 7, quantity), range(1, 33)))
+        self.assertIn(self.stored()["7"], range(1, 33))
+
+    def test_trim_leaves_lines_written_after_the_read(self):
+        add_cached_cart_item(self.phone, 7, 5)
+        add_cached_cart_item(self.phone, 9, 1)
+        add_cached_cart_item(self.phone, 11, 2)
+        read_map = get_cached_cart(self.phone)
+        set_cached_cart_item(self.phone, 9, 6)
+
+        trim_cached_cart(self.phone, read_map, {"7": 3, "11": 2})
+        self.assertEqual(self.stored(), {"7": 3, "9": 6, "11": 2})
+
+        trim_cached_cart(self.phone, {"7": 3, "11": 2}, {})
+        trim_cached_cart(self.phone, {"9": 6}, {})
+        self.assertEqual(self.stored(), {"_": 0})
+
+    def test_restore_fills_a_missing_cart_but_never_overwrites_a_write(self):
+        with mock.patch("cart.cache_store._database_cart", return_value={"7": 2}):
+            self.assertEqual(get_cached_cart(self.phone), {"7": 2})
+        self.assertEqual(self.stored(), {"7": 2})
+        # Restored from the database copy, so there is nothing to flush.
+        self.assertFalse(self.redis.sismember(redis_key("cart:dirty"), _cart_hash_key(self.phone)))
+
+        self.redis.delete(_cart_hash_key(self.phone))
+
+        def write_then_read(phone):
+            # The customer's add lands between the database read and the restore.
+            self.redis.hset(_cart_hash_key(phone), "9", 1)
+            return {"7": 2}
+
+        with mock.patch("cart.cache_store._database_cart", side_effect=write_then_read):
+            self.assertEqual(get_cached_cart(self.phone), {"9": 1})
+        self.assertEqual(self.stored(), {"9": 1})
+
+    def test_first_write_to_an_evicted_cart_keeps_the_database_lines(self):
+        with mock.patch("cart.cache_store._database_cart", return_value={"7": 2}):
+            self.assertEqual(add_cached_cart_item(self.phone, 9, 1), 1)
+            self.assertTrue(set_cached_cart_item(self.phone, 7, 4))
+        self.assertEqual(self.stored(), {"7": 4, "9": 1})
+
+    def test_checkout_marker_blocks_restores_until_it_expires(self):
+        self.addCleanup(self.redis.delete, redis_key(f"cart:checkout:{self.phone}"))
+        with self.captureOnCommitCallbacks(execute=True):
+            clear_checked_out_carts({self.phone})
+        self.assertGreater(self.redis.ttl(redis_key(f"cart:checkout:{self.phone}")), 0)
+
+        # A rehydration that read the rows before the checkout committed.
+        with mock.patch("cart.cache_store._database_cart", return_value={"7": 2}):
+            self.assertEqual(get_cached_cart(self.phone), {})
+            self.assertEqual(add_cached_cart_item(self.phone, 9, 1), 1)
+        self.assertEqual(self.stored(), {"9": 1})
+
+        self.redis.delete(redis_key(f"cart:checkout:{self.phone}"), _cart_hash_key(self.phone))
+        with mock.patch("cart.cache_store._database_cart", return_value={"7": 2}):
+            self.assertEqual(get_cached_cart(self.phone), {"7": 2})
+
+
+class CachedCartViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        section = Section.objects.create(name=Section.SectionType.BAKERY)
+        self.category = Category.objects.create(name="Bread", section=section)
+        self.bread = Product.objects.create(
+            name="Milk Bread", category=self.category, price=Decimal("50.00"), stock_qty=3, image="products/milk.jpg"
+        )
+        self.bun = Product.objects.create(name="Bun", category=self.category, price=Decimal("12.50"), stock_qty=10)
+
+    def view(self):
+        return self.client.get(f"/api/cart/view/?phone={PHONE}").json()
+
+    def test_view_is_priced_from_the_read_model_and_stock_overlay(self):
+        add_cached_cart_item(PHONE, self.bread.id, 5)
+        add_cached_cart_item(PHONE, self.bun.id, 2)
+        self.view()
+
+        with self.assertNumQueries(0):
+            payload = self.view()
+
+        self.assertEqual(payload["total_items"], 5)
+        self.assertEqual(payload["total_amount"], "175.00")
+        bun, bread = payload["items"]
+        self.assertEqual((bread["quantity"], bread["line_total"]), (3, "150.00"))
+        self.assertEqual(bread["image"], "http://testserver/media/products/milk.jpg")
+        self.assertEqual((bun["price"], bun["image"]), ("12.50", None))
+        # The over-stock line was trimmed in the stored cart as well.
+        self.assertEqual(get_cached_cart(PHONE)[str(self.bread.id)], 3)
+
+    def test_trim_leaves_lines_changed_since_the_read(self):
+        add_cached_cart_item(PHONE, self.bread.id, 5)
+        add_cached_cart_item(PHONE, self.bun.id, 4)
+        read_map = get_cached_cart(PHONE)
+        # An add lands between the view's read and its trim.
+        add_cached_cart_item(PHONE, self.bread.id, 1)
+
+        trim_cached_cart(PHONE, read_map, {str(self.bread.id): 3})
+        self.assertEqual(get_cached_cart(PHONE), {str(self.bread.id): 6})
+
+    def test_products_newer_than_the_read_model_come_from_the_database(self):
+        model = CatalogReadModel.build("before-roll")
+        roll = Product.objects.create(name="Dinner Roll", category=self.category, price=Decimal("8.00"), stock_qty=4)
+        add_cached_cart_item(PHONE, self.bread.id, 1)
+        add_cached_cart_item(PHONE, roll.id, 2)
+
+        with mock.patch("cart.cache_store.get_catalog_read_model", return_value=model):
+            payload = self.view()
+        self.assertEqual([item["product_name"] for item in payload["items"]], ["Dinner Roll", "Milk Bread"])
+        self.assertEqual(payload["total_amount"], "66.00")
+
+
+@override_settings(CATALOG_READ_MODEL_CHECK_SECONDS=0)
+class CartBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        section = Section.objects.create(name=Section.SectionType.BAKERY)
+        category = Category.objects.create(name="Bread", section=section)
+        self.bread = Product.objects.create(name="Milk Bread", category=category, price=Decimal("50.00"), stock_qty=20)
+        self.bun = Product.objects.create(name="Bun", category=category, price=Decimal("10.00"), stock_qty=20)
+
+    def batch(self, *operations):
+        return self.client.post("/api/cart/batch/", {"phone": PHONE, "operations": list(operations)}, format="json")
+
+    def test_operations_apply_in_order_and_return_the_cart(self):
+        add_cached_cart_item(PHONE, self.bun.id, 1)
+
+        response = self.batch(
+            {"op": "add", "product_id": self.bread.id, "quantity": 2},
+            {"op": "set", "product_id": self.bread.id, "quantity": 4},
+            {"op": "remove", "product_id": self.bun.id},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_amount"], "200.00")
+        self.assertEqual(get_cached_cart(PHONE), {str(self.bread.id): 4})
+
+    def test_batch_over_the_cap_changes_nothing(self):
+        add_cached_cart_item(PHONE, self.bun.id, 1)
+
+        response = self.batch(
+            {"op": "remove", "product_id": self.bun.id},
+            {"op": "add", "product_id": self.bread.id, "quantity": 60},
+            {"op": "add", "product_id": self.bread.id, "quantity": 60},
+        )
+
+        self.assertEqual((response.status_code, response.data), (400, {"error": "Max 99 quantity per item"}))
+        self.assertEqual(get_cached_cart(PHONE), {str(self.bun.id): 1})
+        self.assertEqual(self.batch({"op": "add", "product_id": self.bun.id}).status_code, 400)
+
+    def test_database_cart_is_rehydrated_into_the_cache(self):
+        customer = Customer.objects.create(name="Cart User", phone=PHONE, whatsapp_no=PHONE)
+        cart = Cart.objects.create(customer=customer)
+        CartItem.objects.create(cart=cart, product=self.bread, quantity=1)
+
+        response = self.batch(
+            {"op": "add", "product_id": self.bun.id, "quantity": 3},
+            {"op": "set", "product_id": self.bread.id, "quantity": 2},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_amount"], "130.00")
+        self.assertEqual(get_cached_cart(PHONE), {str(self.bread.id): 2, str(self.bun.id): 3})
+        # Written back by the next flush.
+        self.assertEqual(dict(cart.items.values_list("product_id", "quantity")), {self.bread.id: 1})
+        flush_dirty_carts()
+        self.assertEqual(
+            dict(cart.items.values_list("product_id", "quantity")), {self.bread.id: 2, self.bun.id: 3}
+        )
+
+
+class WriteBehindCartTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        section = Section.objects.create(name=Section.SectionType.BAKERY)
+        category = Category.objects.create(name="Bread", section=section)
+        self.bread = Product.objects.create(name="Milk Bread", category=category, price=Decimal("50.00"), stock_qty=20)
+        self.bun = Product.objects.create(name="Bun", category=category, price=Decimal("10.00"), stock_qty=20)
+        Customer.objects.create(name="Cart User", phone=PHONE, whatsapp_no=PHONE)
+
+    def stored(self):
+        return dict(CartItem.objects.filter(cart__customer__phone=PHONE).values_list("product_id", "quantity"))
+
+    def test_flush_mirrors_changed_carts_once(self):
+        add_cached_cart_item(PHONE, self.bread.id, 2)
+        add_cached_cart_item(PHONE, self.bun.id, 1)
+        self.assertEqual(self.stored(), {})
+
+        self.assertEqual(flush_dirty_carts(), 1)
+        self.assertEqual(self.stored(), {self.bread.id: 2, self.bun.id: 1})
+        self.assertEqual(flush_dirty_carts(), 0)
+
+        set_cached_cart_item(PHONE, self.bread.id, 5)
+        remove_cached_cart_item(PHONE, self.bun.id)
+        flush_dirty_carts()
+        self.assertEqual(self.stored(), {self.bread.id: 5})
+
+    def test_guest_carts_stay_in_the_cache(self):
+        guest_phone = "9000000001"
+        add_cached_cart_item(guest_phone, self.bread.id, 2)
+
+        self.assertEqual(flush_dirty_carts(), 0)
+        self.assertFalse(Customer.objects.filter(phone=guest_phone).exists())
+        self.assertEqual(get_cached_cart(guest_phone), {str(self.bread.id): 2})
+
+    def test_emptied_cart_is_emptied_in_the_database_but_evicted_one_is_kept(self):
+        add_cached_cart_item(PHONE, self.bread.id, 2)
+        flush_dirty_carts()
+
+        cache.delete(_anon_cart_key(PHONE))
+        self.assertFalse(persist_cached_cart(PHONE))
+        self.assertEqual(self.stored(), {self.bread.id: 2})
+        self.assertEqual(self.client.get(f"/api/cart/view/?phone={PHONE}").json()["total_items"], 2)
+
+        remove_cached_cart_item(PHONE, self.bread.id)
+        self.assertEqual(get_cached_cart(PHONE), {})
+        flush_dirty_carts()
+        self.assertEqual(self.stored(), {})
+
+    def test_emptied_cart_stays_empty_before_the_flush(self):
+        ServiceablePincode.objects.create(code="400001", area_name="Test Area", is_active=True)
+        add_cached_cart_item(PHONE, self.bun.id, 2)
+        flush_dirty_carts()
+        self.client.post("/api/cart/item/remove/", {"phone": PHONE, "product_id": self.bun.id}, format="json")
+
+        view = self.client.get(f"/api/cart/view/?phone={PHONE}").json()
+        self.assertEqual((view["items"], view["total_items"]), ([], 0))
+        response = self.client.post(
+            "/api/cart/place/",
+            {
+                "phone": PHONE,
+                "customer_name": "Cart User",
+                "address": "Test Street 400001",
+                "pincode": "400001",
+                "idempotency_key": str(uuid4()),
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.stored(), {self.bun.id: 2})
+
+    def test_cart_trimmed_to_nothing_is_not_read_from_the_database(self):
+        add_cached_cart_item(PHONE, self.bun.id, 2)
+        flush_dirty_carts()
+        Product.objects.filter(pk=self.bun.pk).update(stock_qty=0)
+        set_stock_levels({self.bun.id: 0})
+
+        self.assertEqual(self.client.get(f"/api/cart/view/?phone={PHONE}").json()["total_items"], 0)
+        self.assertEqual(get_cached_cart(PHONE), {})
+        self.assertEqual(self.client.get(f"/api/cart/view/?phone={PHONE}").json()["items"], [])
+
+    def test_deleted_products_are_not_written(self):
+        add_cached_cart_item(PHONE, self.bread.id, 2)
+        add_cached_cart_item(PHONE, self.bun.id, 1)
+        with mock.patch("products.signals.queue_search_vector_update"):
+            self.bun.delete()
+
+        flush_dirty_carts()
+        self.assertEqual(self.stored(), {self.bread.id: 2})
+
+    def test_checkout_clears_both_copies(self):
+        add_cached_cart_item(PHONE, self.bread.id, 2)
+        flush_dirty_carts()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            clear_checked_out_carts({PHONE})
+        self.assertEqual(self.stored(), {})
+        self.assertEqual(get_cached_cart(PHONE), {})
+        self.assertEqual(flush_dirty_carts(), 0)
+
+    def test_cached_cart_outlives_the_checkout_only_until_commit(self):
+        add_cached_cart_item(PHONE, self.bread.id, 2)
+        flush_dirty_carts()
+        cache.delete(_anon_cart_key(PHONE))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            clear_checked_out_carts({PHONE})
+            # Rehydration that read the rows before they were cleared.
+            with mock.patch("cart.cache_store._database_cart", return_value={str(self.bread.id): 2}):
+                self.assertEqual(get_cached_cart(PHONE), {})
+            add_cached_cart_item(PHONE, self.bun.id, 1)
+            # The flush holds off while the checkout is dropping the cart.
+            self.assertEqual(flush_dirty_carts(), 0)
+        self.assertEqual(get_cached_cart(PHONE), {})
+        self.assertEqual(self.stored(), {})
+
+        add_cached_cart_item(PHONE, self.bun.id, 3)
+        cache.delete(f"cart:checkout:{PHONE}")
+        self.assertEqual(flush_dirty_carts(), 1)
+        self.assertEqual(self.stored(), {self.bun.id: 3})
@@ -1,6 +1,7 @@
 from django.urls import path
 from .views import (
     AddToCartAPIView,
+    CartBatchAPIView,
     ViewCartAPIView,
     PlaceOrderAPIView,
     UpdateCartItemAPIView,
@@ -13,6 +14,7 @@ urlpatterns = [
     path('view/', ViewCartAPIView.as_view()),
     path('item/update/', UpdateCartItemAPIView.as_view()),
     path('item/remove/', RemoveCartItemAPIView.as_view()),
+    path('batch/', CartBatchAPIView.as_view()),
     path('place/', PlaceOrderAPIView.as_view()),
     path('debug/cache/', CartCacheDebugAPIView.as_view()),
 ]
@@ -3,31 +3,25 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.core.cache import cache
 from django.conf import settings
-from django.db import transaction
-from django.db.models import Sum, F, DecimalField, Value
-from django.db.models.functions import Coalesce
-from users.customer_resolver import (
-    merge_phone_carts,
-    get_primary_customer_and_cart,
-)
 from core.throttles import CartAddRateThrottle, CheckoutPlaceRateThrottle
 from users.phone_utils import PhoneNormalizationError, normalize_phone
-from products.models import Product
-from .models import Cart, CartItem
 from .cache_store import (
+    CartItemLimitError,
+    add_cached_cart_item,
+    apply_cached_cart_batch,
     get_cached_cart,
-    set_cached_cart,
     clear_cached_cart,
     build_payload_from_cached_cart,
+    remove_cached_cart_item,
+    set_cached_cart_item,
 )
 from .serializers import (
     AddToCartSerializer,
-    CartSerializer,
+    CartBatchSerializer,
     PlaceOrderSerializer,
     UpdateCartItemSerializer,
     RemoveCartItemSerializer,
 )
-from .locks import cart_write_lock
 from .services import convert_cart_to_order
 
 
@@ -50,17 +44,8 @@ class AddToCartAPIView(PublicAPIView):
         quantity = serializer.validated_data["quantity"]
 
         try:
-            # Distributed lock prevents lost updates on concurrent cart writes.
-            with cart_write_lock(phone):
-                cart_map = get_cached_cart(phone)
-                current_qty = int(cart_map.get(str(product_id), 0))
-                next_qty = current_qty + quantity
-                if next_qty > 99:
-                    return Response({"error": "Max 99 quantity per item"}, status=400)
-
-                cart_map[str(product_id)] = next_qty
-                set_cached_cart(phone, cart_map)
-
+            # One atomic cache write; concurrent adds cannot lose updates.
+            add_cached_cart_item(phone, product_id, quantity)
             return Response({"message": "Added to cart"})
         except Exception as exc:
             return Response({"error": str(exc)}, status=400)
@@ -79,43 +64,36 @@ class ViewCartAPIView(PublicAPIView):
             return Response({"error": str(exc)}, status=400)
 
         # Cart is user-specific and write-heavy; avoid response caching for consistency.
-        anon_payload = build_payload_from_cached_cart(phone, request=request)
-        if anon_payload["total_items"] > 0:
-            return Response(anon_payload)
+        # The cached cart is the source of truth (rehydrated from the database
+        # copy when missing); that copy lags it by up to one flush.
+        return Response(build_payload_from_cached_cart(phone, request=request))
 
-        customer, cart = get_primary_customer_and_cart(
-            phone=phone,
-            create_if_missing=False,
-        )
-        if not customer:
-            payload = {"items": [], "total_items": 0, "total_amount": "0.00"}
-            return Response(payload)
-
-        if not cart:
-            payload = {"items": [], "total_items": 0, "total_amount": "0.00"}
-            return Response(payload)
-
-        cart = (
-            Cart.objects.filter(pk=cart.pk)
-            # Fetch item + product rows up-front for serializer to avoid N+1.
-            .prefetch_related("items__product")
-            .annotate(
-                total_items=Coalesce(Sum("items__quantity"), 0),
-                total_amount=Coalesce(
-                    Sum(
-                        F("items__quantity") * F("items__product__price"),
-                        output_field=DecimalField(max_digits=12, decimal_places=2),
-                    ),
-                    Value(0),
-                    output_field=DecimalField(max_digits=12, decimal_places=2),
-                ),
-            )
-            .first()
-        )
 
-        serializer = CartSerializer(cart, context={"request": request})
-        payload = serializer.data
-        return Response(payload)
+class CartBatchAPIView(PublicAPIView):
+    """
+    Apply a list of add/set/remove operations in one request, all or none,
+    and answer with the recomputed cart. Lines beyond the current stock are
+    trimmed in the answer, as for every cached cart view.
+    """
+
+    throttle_classes = [CartAddRateThrottle]
+    throttle_scope = "cart_add"
+
+    def post(self, request):
+        serializer = CartBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        phone = serializer.validated_data["phone"]
+        operations = [
+            (operation["op"], operation["product_id"], operation["quantity"])
+            for operation in serializer.validated_data["operations"]
+        ]
+
+        try:
+            apply_cached_cart_batch(phone, operations, create=True)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+        return Response(build_payload_from_cached_cart(phone, request=request))
 
 
 class UpdateCartItemAPIView(PublicAPIView):
@@ -127,62 +105,12 @@ class UpdateCartItemAPIView(PublicAPIView):
         product_id = serializer.validated_data["product_id"]
         quantity = serializer.validated_data["quantity"]
 
-        with cart_write_lock(phone):
-            cart_map = get_cached_cart(phone)
-            if cart_map:
-                pid = str(product_id)
-                if quantity == 0:
-                    if pid in cart_map:
-                        del cart_map[pid]
-                        set_cached_cart(phone, cart_map)
-                    return Response({"message": "Item removed"})
-
-                if quantity > 99:
-                    return Response({"error": "Max 99 quantity per item"}, status=400)
-
-                cart_map[pid] = quantity
-                set_cached_cart(phone, cart_map)
-                return Response({"message": "Cart updated"})
-
-        customer, cart = get_primary_customer_and_cart(
-            phone=phone,
-            create_if_missing=False,
-        )
-        if not customer:
-            return Response({"error": "Customer not found"}, status=404)
-
-        if not cart:
-            return Response({"error": "Cart not found"}, status=404)
-
-        with transaction.atomic():
-            cart = Cart.objects.select_for_update().filter(pk=cart.pk).first()
-            if not cart:
+        try:
+            if not set_cached_cart_item(phone, product_id, quantity):
                 return Response({"error": "Cart not found"}, status=404)
-
-            item = CartItem.objects.select_for_update().filter(cart=cart, product_id=product_id).first()
-            if not item:
-                # Fallback once for legacy duplicate carts created before phone-dedupe fix.
-                _, merged_cart = merge_phone_carts(phone=phone, create_if_missing=False)
-                if merged_cart:
-                    cart = Cart.objects.select_for_update().filter(pk=merged_cart.pk).first()
-                    item = CartItem.objects.select_for_update().filter(cart=cart, product_id=product_id).first()
-            if not item:
-                return Response({"error": "Cart item not found"}, status=404)
-
-            if quantity == 0:
-                item.delete()
-                return Response({"message": "Item removed"})
-
-            product = Product.objects.select_for_update().filter(id=product_id).first()
-            if not product:
-                return Response({"error": "Product not found"}, status=404)
-            if product.stock_qty < quantity:
-                return Response({"error": f"Only {product.stock_qty} in stock"}, status=400)
-
-            item.quantity = quantity
-            item.save(update_fields=["quantity"])
-
-        return Response({"message": "Cart updated"})
+        except CartItemLimitError as exc:
+            return Response({"error": str(exc)}, status=400)
+        return Response({"message": "Item removed" if quantity == 0 else "Cart updated"})
 
 
 class RemoveCartItemAPIView(PublicAPIView):
@@ -193,40 +121,11 @@ class RemoveCartItemAPIView(PublicAPIView):
         phone = serializer.validated_data["phone"]
         product_id = serializer.validated_data["product_id"]
 
-        with cart_write_lock(phone):
-            cart_map = get_cached_cart(phone)
-            if cart_map:
-                pid = str(product_id)
-                if pid not in cart_map:
-                    return Response({"error": "Cart item not found"}, status=404)
-                del cart_map[pid]
-                set_cached_cart(phone, cart_map)
-                return Response({"message": "Item removed"})
-
-        customer, cart = get_primary_customer_and_cart(
-            phone=phone,
-            create_if_missing=False,
-        )
-        if not customer:
-            return Response({"error": "Customer not found"}, status=404)
-
-        if not cart:
+        removed = remove_cached_cart_item(phone, product_id)
+        if removed is None:
             return Response({"error": "Cart not found"}, status=404)
-
-        with transaction.atomic():
-            cart = Cart.objects.select_for_update().filter(pk=cart.pk).first()
-            item = CartItem.objects.select_for_update().filter(cart=cart, product_id=product_id).first()
-            if not item:
-                # Fallback once for legacy duplicate carts created before phone-dedupe fix.
-                _, merged_cart = merge_phone_carts(phone=phone, create_if_missing=False)
-                if merged_cart:
-                    cart = Cart.objects.select_for_update().filter(pk=merged_cart.pk).first()
-                    item = CartItem.objects.select_for_update().filter(cart=cart, product_id=product_id).first()
-            if not item:
-                return Response({"error": "Cart item not found"}, status=404)
-
-            item.delete()
-
+        if not removed:
+            return Response({"error": "Cart item not found"}, status=404)
         return Response({"message": "Item removed"})
 
 
@@ -281,7 +180,7 @@ class CartCacheDebugAPIView(PublicAPIView):
         if not self._is_authorized(request):
             return Response({"detail": "Forbidden"}, status=403)
 
-        pattern = request.GET.get("pattern", "cart:anon:v1:*")
+        pattern = request.GET.get("pattern", "cart:anon:v2:*")
         try:
             max_keys = int(request.GET.get("max_keys", 100))
         except (TypeError, ValueError):
@@ -0,0 +1,22 @@
+from django.core.cache import cache
+
+
+def get_redis_client():
+    """
+    Return the raw redis-py client behind the default cache, or None when the
+    cache is not django-redis (local DEBUG runs use LocMemCache).
+    """
+    try:
+        from django_redis import get_redis_connection
+    except ImportError:
+        return None
+
+    try:
+        return get_redis_connection("default")
+    except NotImplementedError:
+        return None
+
+
+def redis_key(key):
+    # Apply KEY_PREFIX/VERSION so raw keys live next to regular cache keys.
+    return cache.make_key(key)
@@ -7,6 +7,7 @@ import socket
 from pathlib import Path
 
 import dj_database_url
+from celery.schedules import crontab
 from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
@@ -262,6 +263,28 @@ CELERY_TASK_DEFAULT_RETRY_DELAY = int(os.getenv("CELERY_TASK_DEFAULT_RETRY_DELAY
 CELERY_TASK_SOFT_TIME_LIMIT = int(os.getenv("CELERY_TASK_SOFT_TIME_LIMIT", "90"))
 CELERY_TASK_TIME_LIMIT = int(os.getenv("CELERY_TASK_TIME_LIMIT", "120"))
 CELERY_TASK_ALWAYS_EAGER = os.getenv("CELERY_TASK_ALWAYS_EAGER", "false").lower() == "true"
+CELERY_BEAT_SCHEDULE = {
+    "recompute-product-popularity": {
+        "task": "products.tasks.recompute_product_popularity_task",
+        "schedule": crontab(minute=15),
+    },
+    "rebuild-product-affinity": {
+        "task": "products.tasks.rebuild_product_affinity_task",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "flush-unavailable-views": {
+        "task": "products.tasks.flush_unavailable_views_task",
+        "schedule": crontab(minute="*/5"),
+    },
+    "compact-catalog-changes": {
+        "task": "products.tasks.compact_catalog_changes_task",
+        "schedule": crontab(minute=45),
+    },
+    "flush-dirty-carts": {
+        "task": "cart.tasks.flush_dirty_carts_task",
+        "schedule": crontab(),
+    },
+}
 
 
 # App flags / integrations
@@ -278,6 +301,20 @@ SYSTEM_ARCH_DEBUG_TOKEN = os.getenv("SYSTEM_ARCH_DEBUG_TOKEN", "")
 PRINT_AGENT_TOKEN = (os.getenv("PRINT_AGENT_TOKEN") or "").strip()
 PRINT_AGENT_CLAIM_TTL_SECONDS = int(os.getenv("PRINT_AGENT_CLAIM_TTL_SECONDS", "180"))
 USE_LAYERED_ARCHITECTURE = os.getenv("USE_LAYERED_ARCHITECTURE", "true").lower() == "true"
+USE_CATALOG_READ_MODEL = os.getenv("USE_CATALOG_READ_MODEL", "true").lower() == "true"
+CATALOG_READ_MODEL_CHECK_SECONDS = float(os.getenv("CATALOG_READ_MODEL_CHECK_SECONDS", "2"))
+# Public origin (e.g. https://www.thathwamasibakery.com) used to build absolute
+# image URLs when catalog payloads are rendered outside a request.
+SITE_BASE_URL = (os.getenv("SITE_BASE_URL") or "").strip().rstrip("/")
+CATALOG_WARM_DEBOUNCE_SECONDS = int(os.getenv("CATALOG_WARM_DEBOUNCE_SECONDS", "5"))
+CATALOG_WARM_SEARCH_LIMIT = int(os.getenv("CATALOG_WARM_SEARCH_LIMIT", "20"))
+SEARCH_VECTOR_FLUSH_DELAY_SECONDS = int(os.getenv("SEARCH_VECTOR_FLUSH_DELAY_SECONDS", "2"))
+POPULARITY_WINDOW_DAYS = int(os.getenv("POPULARITY_WINDOW_DAYS", "30"))
+# Rendered storefront HTML: whole pages for anonymous visitors, and the
+# home page fragments (ads, top choices, contact) for everyone else. Both are
+# keyed by catalog versions, so the TTL only bounds template/asset changes.
+STOREFRONT_PAGE_CACHE_SECONDS = int(os.getenv("STOREFRONT_PAGE_CACHE_SECONDS", "300"))
+STOREFRONT_FRAGMENT_CACHE_SECONDS = int(os.getenv("STOREFRONT_FRAGMENT_CACHE_SECONDS", "600"))
 
 # Sentry
 SENTRY_DSN = (os.getenv("SENTRY_DSN") or "").strip()
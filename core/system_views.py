@@ -4,6 +4,8 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from products.cache_utils import get_catalog_cache_metrics
+
 
 class ArchitectureStatusAPIView(APIView):
     permission_classes = [AllowAny]
@@ -47,5 +49,7 @@ class ArchitectureStatusAPIView(APIView):
                 "debug": bool(getattr(settings, "DEBUG", False)),
                 "cache_backend": cache_backend,
                 "redis_configured": "django_redis" in str(cache_backend),
+                # Single-flight counters: rebuilds, lock_waits, stale_serves, wait_timeouts.
+                "catalog_cache": get_catalog_cache_metrics(),
             }
         )
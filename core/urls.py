@@ -68,6 +68,7 @@ from products.views import (
     AdminAdvertisingManageView,
     AdminStockTrackerView,
     AdminStockListAPIView,
+    AdminStockBulkUpdateAPIView,
     AdminStockUpdateAPIView,
 )
 
@@ -148,6 +149,7 @@ urlpatterns = [
     path('api/products/', include('products.urls')),
     path('api/products/admin/stock/', AdminStockListAPIView.as_view(), name='admin-stock-list-api'),
     path('api/products/admin/stock/update/', AdminStockUpdateAPIView.as_view(), name='admin-stock-update-api'),
+    path('api/products/admin/stock/bulk/', AdminStockBulkUpdateAPIView.as_view(), name='admin-stock-bulk-api'),
     path('api/cart/', include('cart.urls')),
     path('api/orders/', include('orders.urls')),
     path('api/notifications/', include('notifications.urls')),
@@ -0,0 +1,6 @@
+#!/usr/bin/env sh
+set -eu
+
+exec celery -A core beat \
+  --loglevel="${CELERY_LOG_LEVEL:-INFO}" \
+  --schedule=/tmp/celerybeat-schedule
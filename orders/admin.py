@@ -10,6 +10,8 @@ from .models import (
     SalesRecord,
     ServiceablePincode,
 )
+from .delivery_contact import invalidate_delivery_contact
+from .pincode_service import invalidate_serviceable_pincodes
 
 
 class OrderItemInline(admin.TabularInline):
@@ -83,12 +85,36 @@ class ServiceablePincodeAdmin(admin.ModelAdmin):
     list_filter = ("is_active",)
     ordering = ("code",)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_serviceable_pincodes()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_serviceable_pincodes()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        invalidate_serviceable_pincodes()
+
 
 @admin.register(DeliveryContactSetting)
 class DeliveryContactSettingAdmin(admin.ModelAdmin):
     list_display = ("id", "delivery_contact_number", "updated_at")
     readonly_fields = ("updated_at",)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_delivery_contact()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_delivery_contact()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        invalidate_delivery_contact()
+
 
 @admin.register(CouponCode)
 class CouponCodeAdmin(admin.ModelAdmin):
@@ -1,12 +1,12 @@
 from datetime import timedelta
 
 from django.core.cache import cache
-from django.db.models import Sum, F, Q, Count, DecimalField
+from django.db.models import Sum, F, Q, DecimalField
 from django.db.models.functions import Coalesce
 from django.utils.timezone import now
 
 from .models import Order, OrderItem
-from products.models import ProductViewLog
+from products.models import ProductViewDaily
 
 
 ANALYTICS_CACHE_TTL = 60
@@ -88,14 +88,15 @@ def top_products():
 
 
 def unavailable_product_demand():
-    cache_key = "analytics:unavailable_demand:v2"
+    cache_key = "analytics:unavailable_demand:v3"
     cached = cache.get(cache_key)
     if cached is not None:
         return cached
 
+    # Served from the daily rollup that `flush_unavailable_views` fills.
     data = list(
-        ProductViewLog.objects.values(name=F("product__name"))
-        .annotate(views=Count("id"))
+        ProductViewDaily.objects.values(name=F("product__name"))
+        .annotate(views=Sum("views"))
         .order_by("-views")
     )
     cache.set(cache_key, data, ANALYTICS_CACHE_TTL)
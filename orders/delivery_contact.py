@@ -1,9 +1,25 @@
+import time
+
 from django.conf import settings
+from django.core.cache import cache
 
 from .models import DeliveryContactSetting
 
+DELIVERY_CONTACT_VERSION_KEY = "orders:delivery_contact:version"
+# Bounds staleness for writes that skip `invalidate_delivery_contact`
+# (shell, migrations).
+DELIVERY_CONTACT_CACHE_TTL = 10 * 60
 
-def get_delivery_contact_number():
+
+def delivery_contact_version():
+    version = cache.get(DELIVERY_CONTACT_VERSION_KEY)
+    if version is None:
+        version = time.time_ns() // 1000
+        cache.set(DELIVERY_CONTACT_VERSION_KEY, version, None)
+    return version
+
+
+def _load_delivery_contact_number():
     setting = DeliveryContactSetting.objects.only("delivery_contact_number").order_by("id").first()
     if setting is None:
         return (
@@ -13,6 +29,22 @@ def get_delivery_contact_number():
     return str(setting.delivery_contact_number or "").strip()
 
 
+def get_delivery_contact_number():
+    cache_key = f"orders:delivery_contact:v{delivery_contact_version()}"
+    number = cache.get(cache_key)
+    if number is None:
+        number = _load_delivery_contact_number()
+        cache.set(cache_key, number, DELIVERY_CONTACT_CACHE_TTL)
+    return number
+
+
+def invalidate_delivery_contact():
+    try:
+        cache.incr(DELIVERY_CONTACT_VERSION_KEY)
+    except ValueError:
+        cache.set(DELIVERY_CONTACT_VERSION_KEY, time.time_ns() // 1000, None)
+
+
 def get_or_create_delivery_contact_setting():
     setting = DeliveryContactSetting.objects.order_by("id").first()
     if setting is not None:
@@ -1,10 +1,20 @@
 import re
+import time
+
+from django.core.cache import cache
+
+from products.json_payload import encode_payload
 
 from .models import ServiceablePincode
 
 
 PINCODE_PATTERN = re.compile(r"\b(\d{6})\b")
 
+SERVICEABLE_PINCODES_VERSION_KEY = "orders:serviceable_pincodes:version"
+# Bounds staleness for writes that skip `invalidate_serviceable_pincodes`
+# (shell, migrations).
+SERVICEABLE_PINCODES_CACHE_TTL = 5 * 60
+
 
 def normalize_pincode(value):
     digits = "".join(ch for ch in str(value or "") if ch.isdigit())
@@ -35,3 +45,40 @@ def ensure_serviceable_pincode(pincode="", address=""):
         raise ValueError(f"Sorry, we do not deliver to pincode {resolved} yet.")
 
     return resolved
+
+
+def _serviceable_pincodes_version():
+    version = cache.get(SERVICEABLE_PINCODES_VERSION_KEY)
+    if version is None:
+        version = time.time_ns() // 1000
+        cache.set(SERVICEABLE_PINCODES_VERSION_KEY, version, None)
+    return version
+
+
+def serviceable_pincodes_payload():
+    """Encoded `{"pincodes": [...]}` body for the public pincode list."""
+    cache_key = f"orders:serviceable_pincodes:v{_serviceable_pincodes_version()}"
+    payload = cache.get(cache_key)
+    if payload is None:
+        rows = ServiceablePincode.objects.filter(is_active=True).order_by("code")[:200]
+        payload = encode_payload(
+            {
+                "pincodes": [
+                    {
+                        "code": row.code,
+                        "area_name": row.area_name,
+                        "label": f"{row.code}{(' - ' + row.area_name) if row.area_name else ''}",
+                    }
+                    for row in rows
+                ]
+            }
+        )
+        cache.set(cache_key, payload, SERVICEABLE_PINCODES_CACHE_TTL)
+    return payload
+
+
+def invalidate_serviceable_pincodes():
+    try:
+        cache.incr(SERVICEABLE_PINCODES_VERSION_KEY)
+    except ValueError:
+        cache.set(SERVICEABLE_PINCODES_VERSION_KEY, time.time_ns() // 1000, None)
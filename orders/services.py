@@ -1,11 +1,16 @@
+from collections import defaultdict
 from decimal import Decimal
 
 from django.db import IntegrityError, transaction
 from django.db.models import BooleanField, Case, F, Value, When
+from django.db.models.functions import Now
 
 from notifications.services import create_order_notifications
-from products.cache_utils import invalidate_catalog_cache
+from products.cache_utils import invalidate_catalog_change
+from products.catalog_changes import record_catalog_changes
 from products.models import Product
+from products.stock_overlay import adjust_stock_levels
+from products.tasks import record_placed_order_task
 from users.customer_resolver import resolve_primary_customer
 from users.phone_utils import normalize_phone
 
@@ -162,13 +167,26 @@ def create_order(validated_data):
                     default=Value(False),
                     output_field=BooleanField(),
                 ),
+                updated_at=Now(),
             )
 
-        invalidate_catalog_cache()
+        # Summed per product so the overlay always matches the row updates above.
+        stock_deltas = defaultdict(int)
+        for item in order_items:
+            stock_deltas[item["product"].pk] -= item["quantity"]
+        sold_out = any(item["product"].stock_qty <= -stock_deltas[item["product"].pk] for item in order_items)
+        invalidate_catalog_change(
+            "availability" if sold_out else "stock",
+            product_ids=[item["product"].pk for item in order_items],
+        )
+        # The queryset updates above bypass the post_save change log.
+        record_catalog_changes([item["product"].pk for item in order_items])
+        transaction.on_commit(lambda: adjust_stock_levels(stock_deltas))
         create_bills_for_order(order)
         create_sales_records_for_order(order)
         create_order_notifications(order, event_type="ORDER_PLACED")
         send_order_notifications.delay(order.id)
+        transaction.on_commit(lambda: record_placed_order_task.delay(order.id))
 
         return order
 
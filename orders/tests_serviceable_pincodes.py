@@ -0,0 +1,30 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from orders.models import ServiceablePincode
+from orders.pincode_service import invalidate_serviceable_pincodes
+
+
+class ServiceablePincodeListTests(TestCase):
+    url = "/api/orders/serviceable-pincodes/"
+
+    def setUp(self):
+        cache.clear()
+        ServiceablePincode.objects.create(code="560001", area_name="MG Road", is_active=True)
+
+    def test_unchanged_list_is_answered_with_304_from_cache(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.json()["pincodes"][0]["label"], "560001 - MG Road")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_invalidation_changes_the_validator(self):
+        etag = self.client.get(self.url)["ETag"]
+        ServiceablePincode.objects.create(code="560002", area_name="", is_active=True)
+        invalidate_serviceable_pincodes()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["pincodes"]), 2)
@@ -14,7 +14,7 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import DatabaseError, transaction
 from django.db.models import Count, F, Sum, Value, DecimalField, ExpressionWrapper
-from django.db.models.functions import Coalesce
+from django.db.models.functions import Coalesce, Now
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.utils import timezone
@@ -45,14 +45,21 @@ from .models import BillItem, BillPrintJob, CouponCode, Order, OrderFeedback, Or
 from .coupon_catalog import DEFAULT_COUPON_CODES
 from .coupon_rules import normalize_coupon_code
 from .coupon_service import apply_stored_coupon_breakdown, validate_coupon_payload
-from .delivery_contact import get_delivery_contact_number, get_or_create_delivery_contact_setting
+from .delivery_contact import (
+    get_delivery_contact_number,
+    get_or_create_delivery_contact_setting,
+    invalidate_delivery_contact,
+)
 from .escpos_usb import EscPosPrintError, print_bill_via_escpos_usb, _build_payload as build_escpos_payload
 from .serializers import OrderSerializer, OrderFeedbackWriteSerializer, BillSerializer
 from .services import create_order, create_order_from_cart
-from products.cache_utils import invalidate_catalog_cache
+from products.cache_utils import invalidate_catalog_change
+from products.catalog_changes import record_catalog_changes
+from products.json_payload import json_response
 from products.models import Category, Product, Section
+from products.stock_overlay import adjust_stock_levels
 from users.customer_resolver import resolve_primary_customer
-from .pincode_service import normalize_pincode
+from .pincode_service import invalidate_serviceable_pincodes, normalize_pincode, serviceable_pincodes_payload
 from PIL import Image
 
 
@@ -244,16 +251,7 @@ class ServiceablePincodeListAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        rows = ServiceablePincode.objects.filter(is_active=True).order_by("code")[:200]
-        payload = [
-            {
-                "code": row.code,
-                "area_name": row.area_name,
-                "label": f"{row.code}{(' - ' + row.area_name) if row.area_name else ''}",
-            }
-            for row in rows
-        ]
-        return Response({"pincodes": payload})
+        return json_response(request, serviceable_pincodes_payload())
 
 
 class CouponValidationAPIView(APIView):
@@ -314,6 +312,7 @@ class AdminPincodeManageView(TemplateView):
                 return self.render_to_response(context, status=400)
 
             updated = ServiceablePincode.objects.filter(code=code).update(is_active=(target == "1"))
+            invalidate_serviceable_pincodes()
             if not updated:
                 context = self.get_context_data(error="Pincode not found.")
                 return self.render_to_response(context, status=404)
@@ -335,6 +334,7 @@ class AdminPincodeManageView(TemplateView):
                 "is_active": is_active,
             },
         )
+        invalidate_serviceable_pincodes()
         return redirect("/admin-dashboard/pincodes/?saved=1")
 
 
@@ -357,6 +357,7 @@ class AdminDeliveryContactManageView(TemplateView):
         if action == "clear":
             row.delivery_contact_number = ""
             row.save(update_fields=["delivery_contact_number", "updated_at"])
+            invalidate_delivery_contact()
             return redirect("/admin-dashboard/delivery-contact/?saved=cleared")
 
         value = "".join(ch for ch in str(request.POST.get("delivery_contact_number") or "") if ch.isdigit())
@@ -366,6 +367,7 @@ class AdminDeliveryContactManageView(TemplateView):
 
         row.delivery_contact_number = value
         row.save()
+        invalidate_delivery_contact()
         return redirect("/admin-dashboard/delivery-contact/?saved=1")
 
 
@@ -1073,7 +1075,7 @@ class AdminBillEditView(TemplateView):
                     continue
                 product.stock_qty = product.stock_qty - net_delta
                 product.is_available = product.stock_qty > 0
-                product.save(update_fields=["stock_qty", "is_available"])
+                product.save(update_fields=["stock_qty", "is_available", "updated_at"])
 
             for item in order_items:
                 target_qty = new_quantities[item.id]
@@ -1237,12 +1239,19 @@ class AdminBillCancelAPIView(APIView):
                 Product.objects.filter(id=item.product_id).update(
                     stock_qty=F("stock_qty") + item.quantity,
                     is_available=True,
+                    updated_at=Now(),
                 )
 
             order.status = "Cancelled"
             order.save(update_fields=["status"])
             SalesRecord.objects.filter(order_id=order.id).delete()
-            invalidate_catalog_cache()
+            # Restored stock always brings the products back in stock.
+            invalidate_catalog_change("availability", product_ids=product_ids)
+            record_catalog_changes(product_ids)
+            stock_deltas = {}
+            for item in order_items:
+                stock_deltas[item.product_id] = stock_deltas.get(item.product_id, 0) + item.quantity
+            transaction.on_commit(lambda: adjust_stock_levels(stock_deltas))
 
         return Response(
             {
@@ -2,7 +2,13 @@ from django.contrib import admin
 from .models import Advertisement, Section, Category, Product
 
 admin.site.register(Section)
-admin.site.register(Category)
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "section", "product_count")
+    list_filter = ("section",)
+    readonly_fields = ("card_image", "product_count")
 
 
 @admin.register(Product)
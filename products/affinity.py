@@ -0,0 +1,115 @@
+"""
+Co-purchase ("bought together") neighbours for the related-products API.
+
+`rebuild_product_affinity` mines every order into ProductAffinity and keeps
+the top-K neighbours per product. Between rebuilds, each new order bumps its
+own pairs through `record_order_affinity`, so rows beyond the top K can
+accumulate until the next rebuild prunes them; reads always take the best K.
+"""
+
+from collections import Counter, defaultdict
+from datetime import timedelta
+from itertools import permutations
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ProductAffinity
+
+AFFINITY_TOP_K = 8
+AFFINITY_CACHE_KEY = "products:affinity:v1"
+AFFINITY_CACHE_TTL = 10 * 60
+AFFINITY_BATCH_SIZE = 1000
+
+
+def _cache_key(product_id):
+    return f"{AFFINITY_CACHE_KEY}:{product_id}"
+
+
+def affinity_related_ids(product_id, limit=AFFINITY_TOP_K):
+    """Top co-purchased product ids for one product, best first."""
+    key = _cache_key(product_id)
+    related_ids = cache.get(key)
+    if related_ids is None:
+        related_ids = list(
+            ProductAffinity.objects.filter(product_id=product_id)
+            .order_by("-score", "related_id")
+            .values_list("related_id", flat=True)[:AFFINITY_TOP_K]
+        )
+        cache.set(key, related_ids, AFFINITY_CACHE_TTL)
+    return related_ids[:limit]
+
+
+def forget_affinity(product_ids):
+    cache.delete_many([_cache_key(product_id) for product_id in product_ids])
+
+
+def record_order_affinity(order_id):
+    """Add one order's product pairs to the affinity table."""
+    from orders.models import OrderItem
+
+    product_ids = sorted(set(OrderItem.objects.filter(order_id=order_id).values_list("product_id", flat=True)))
+    if len(product_ids) < 2:
+        return 0
+
+    pairs = set(permutations(product_ids, 2))
+    with transaction.atomic():
+        existing = set(
+            ProductAffinity.objects.filter(product_id__in=product_ids, related_id__in=product_ids).values_list(
+                "product_id", "related_id"
+            )
+        )
+        if existing:
+            ProductAffinity.objects.filter(product_id__in=product_ids, related_id__in=product_ids).update(
+                score=F("score") + 1, updated_at=timezone.now()
+            )
+        # A concurrent order may create the same pair first; losing that one
+        # increment is fine until the next rebuild recounts it.
+        ProductAffinity.objects.bulk_create(
+            [ProductAffinity(product_id=a, related_id=b, score=1) for a, b in pairs - existing],
+            batch_size=AFFINITY_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+    transaction.on_commit(lambda: forget_affinity(product_ids))
+    return len(pairs)
+
+
+def rebuild_product_affinity(top_k=AFFINITY_TOP_K, days=None):
+    """
+    Recount co-purchases across all orders (or the last `days` days) and
+    replace the table with the top-K neighbours of every product.
+    """
+    from orders.models import OrderItem
+
+    rows = OrderItem.objects.order_by("order_id").values_list("order_id", "product_id")
+    if days:
+        rows = rows.filter(order__created_at__gte=timezone.now() - timedelta(days=days))
+
+    pair_counts = Counter()
+    current_order, basket = None, set()
+    for order_id, product_id in rows.iterator(chunk_size=2000):
+        if order_id != current_order:
+            pair_counts.update(permutations(sorted(basket), 2))
+            current_order, basket = order_id, set()
+        basket.add(product_id)
+    pair_counts.update(permutations(sorted(basket), 2))
+
+    neighbours = defaultdict(list)
+    for (product_id, related_id), score in pair_counts.items():
+        neighbours[product_id].append((score, related_id))
+
+    affinities = []
+    for product_id, scored in neighbours.items():
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        affinities.extend(
+            ProductAffinity(product_id=product_id, related_id=related_id, score=score)
+            for score, related_id in scored[:top_k]
+        )
+
+    with transaction.atomic():
+        ProductAffinity.objects.all().delete()
+        ProductAffinity.objects.bulk_create(affinities, batch_size=AFFINITY_BATCH_SIZE)
+    transaction.on_commit(lambda: forget_affinity(neighbours.keys()))
+    return len(affinities)
@@ -1,11 +1,121 @@
+import logging
+import time
+
 from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
 CATALOG_VERSION_KEY = "products:catalog:version"
+CATALOG_METRICS_KEY = "products:catalog:metrics"
+CATALOG_METRIC_NAMES = ("rebuilds", "lock_waits", "stale_serves", "wait_timeouts")
+CATALOG_SCOPE_KINDS = ("product", "category", "section")
+
+# Cache namespaces that share one version counter. Anything not listed here is
+# versioned under its own name.
+CATALOG_NAMESPACE_GROUPS = {
+    "category_cards_json": "category_cards",
+    "sections_json": "sections",
+    "section_categories_json": "section_categories",
+    "search_json": "search",
+    "home_top_choices_bakery_v1": "home_top_choices",
+    "home_top_choices_snacks_v1": "home_top_choices",
+    "catalog_bundle_json": "read_model",
+}
+
+# Product payloads are cached without stock fields (see stock_overlay), so
+# they can live much longer than the old 3 minute TTL.
+CATALOG_STATIC_CACHE_TTL = 60 * 60
+
+# Single-flight rebuilds: one request rebuilds a missing entry under a short
+# lock while the others serve the previous payload (kept this much longer than
+# the entry itself) or wait briefly for the builder.
+CATALOG_STALE_WINDOW = 10 * 60
+CATALOG_REBUILD_LOCK_TTL = 10
+CATALOG_REBUILD_WAIT_SECONDS = 1.5
+CATALOG_REBUILD_POLL_SECONDS = 0.05
+
+# Which cache entries each kind of catalog change touches. Entity scopes are
+# bumped only for the ids involved in the change; namespaces are bumped as a
+# whole because their entries cannot be mapped back to individual rows.
+CATALOG_CHANGE_DEPENDENCIES = {
+    # stock_qty moved but availability did not flip. Stock lives in the live
+    # overlay hash, so no cached payload depends on it.
+    "stock": {
+        "scopes": (),
+        "namespaces": (),
+    },
+    # stock_qty moved and a product went in or out of stock; only the home
+    # page strips filter on availability.
+    "availability": {
+        "scopes": (),
+        "namespaces": ("home_top_choices",),
+    },
+    # name/price/image/description/category edits, creates and deletes.
+    "product": {
+        "scopes": ("product", "category", "section"),
+        "namespaces": ("search", "category_cards", "home_top_choices", "admin_related", "read_model"),
+    },
+    "related": {
+        "scopes": ("product",),
+        "namespaces": ("read_model",),
+    },
+    "category": {
+        "scopes": ("category", "section"),
+        "namespaces": ("search", "section_categories", "category_cards", "admin_related", "read_model"),
+    },
+    "section": {
+        "scopes": ("section",),
+        "namespaces": (
+            "search",
+            "sections",
+            "section_categories",
+            "category_cards",
+            "home_top_choices",
+            "read_model",
+        ),
+    },
+    "advertisement": {
+        "scopes": (),
+        "namespaces": ("home_ads",),
+    },
+    # The periodic popularity recompute reorders the home page strips.
+    "popularity": {
+        "scopes": (),
+        "namespaces": ("home_top_choices",),
+    },
+}
 
 
 def _new_version_value() -> int:
-    return int(timezone.now().timestamp())
+    # Microseconds, so a counter re-seeded after eviction or a cache clear
+    # cannot land on a value an older entry was built with.
+    return int(timezone.now().timestamp() * 1_000_000)
+
+
+def _namespace_version_key(namespace: str) -> str:
+    return f"{CATALOG_VERSION_KEY}:ns:{namespace}"
+
+
+def _scope_version_key(kind: str, scope_id) -> str:
+    return f"{CATALOG_VERSION_KEY}:{kind}:{scope_id}"
+
+
+def _read_versions(keys) -> list:
+    found = cache.get_many(keys)
+    missing = {key: _new_version_value() for key in keys if found.get(key) is None}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return [int(found[key]) for key in keys]
+
+
+def _bump_version(key: str) -> None:
+    try:
+        cache.incr(key)
+    except Exception:
+        cache.set(key, _new_version_value(), None)
 
 
 def get_catalog_cache_version() -> int:
@@ -16,8 +126,40 @@ def get_catalog_cache_version() -> int:
     return int(version)
 
 
-def catalog_cache_key(namespace: str, *parts) -> str:
-    version = get_catalog_cache_version()
+def get_catalog_namespace_version(namespace: str) -> str:
+    """Global plus namespace version, as embedded in that namespace's cache keys."""
+    group = CATALOG_NAMESPACE_GROUPS.get(namespace, namespace)
+    versions = _read_versions([CATALOG_VERSION_KEY, _namespace_version_key(group)])
+    return ".".join(str(value) for value in versions)
+
+
+def get_catalog_scope_versions(kind: str, scope_ids) -> dict:
+    scope_ids = [int(scope_id) for scope_id in scope_ids]
+    if not scope_ids:
+        return {}
+    versions = _read_versions([_scope_version_key(kind, scope_id) for scope_id in scope_ids])
+    return dict(zip(scope_ids, versions))
+
+
+def catalog_scopes_current(kind: str, expected_versions) -> bool:
+    """True when none of the recorded entity versions moved since they were captured."""
+    expected_versions = {int(k): int(v) for k, v in (expected_versions or {}).items()}
+    if not expected_versions:
+        return True
+    return get_catalog_scope_versions(kind, expected_versions.keys()) == expected_versions
+
+
+def catalog_cache_key(namespace: str, *parts, scopes=()) -> str:
+    """
+    Build a versioned key from the global version, the namespace version and
+    the version of every (kind, id) entity scope the entry depends on. All
+    versions are fetched in one `get_many` round trip.
+    """
+    group = CATALOG_NAMESPACE_GROUPS.get(namespace, namespace)
+    version_keys = [CATALOG_VERSION_KEY, _namespace_version_key(group)]
+    version_keys.extend(_scope_version_key(kind, scope_id) for kind, scope_id in scopes)
+    version = ".".join(str(value) for value in _read_versions(version_keys))
+
     normalized_parts = [str(part).strip() for part in parts if str(part).strip()]
     suffix = ":".join(normalized_parts)
     key = f"products:{namespace}:v{version}"
@@ -26,8 +168,131 @@ def catalog_cache_key(namespace: str, *parts) -> str:
     return key
 
 
-def invalidate_catalog_cache() -> None:
+def _catalog_stale_key(namespace: str, parts) -> str:
+    normalized_parts = [str(part).strip() for part in parts if str(part).strip()]
+    return ":".join([f"products:{namespace}:stale", *normalized_parts])
+
+
+def _record_metric(name: str) -> None:
+    key = f"{CATALOG_METRICS_KEY}:{name}"
+    if cache.add(key, 1, None):
+        return
     try:
-        cache.incr(CATALOG_VERSION_KEY)
-    except Exception:
-        cache.set(CATALOG_VERSION_KEY, _new_version_value(), None)
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def get_catalog_cache_metrics() -> dict:
+    keys = {f"{CATALOG_METRICS_KEY}:{name}": name for name in CATALOG_METRIC_NAMES}
+    found = cache.get_many(list(keys))
+    return {name: int(found.get(key) or 0) for key, name in keys.items()}
+
+
+def cached_catalog_entry(namespace: str, *parts, build, timeout, scopes=(), is_current=None):
+    """
+    Return the cached value for a catalog key, rebuilding it at most once at
+    a time across all workers.
+
+    `timeout` is seconds or a callable taking the built value. `is_current`
+    can reject a cached value whose embedded versions moved (search entries).
+    """
+    key = catalog_cache_key(namespace, *parts, scopes=scopes)
+    value = cache.get(key)
+    if value is not None and (is_current is None or is_current(value)):
+        return value
+
+    stale_key = _catalog_stale_key(namespace, parts)
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, CATALOG_REBUILD_LOCK_TTL):
+        try:
+            value = build()
+            ttl = timeout(value) if callable(timeout) else timeout
+            cache.set(key, value, ttl)
+            cache.set(stale_key, value, ttl + CATALOG_STALE_WINDOW)
+            _record_metric("rebuilds")
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    stale = cache.get(stale_key)
+    if stale is not None:
+        _record_metric("stale_serves")
+        return stale
+
+    _record_metric("lock_waits")
+    deadline = time.monotonic() + CATALOG_REBUILD_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(CATALOG_REBUILD_POLL_SECONDS)
+        value = cache.get(key)
+        if value is not None and (is_current is None or is_current(value)):
+            return value
+
+    # The builder is slow or died holding the lock; answer this request
+    # directly instead of failing it, but leave the write to the lock holder.
+    _record_metric("wait_timeouts")
+    logger.warning("Catalog rebuild wait timed out key=%s", key)
+    return build()
+
+
+def _bump_versions(keys) -> None:
+    keys = list(keys)
+    for key in keys:
+        _bump_version(key)
+    if keys and transaction.get_connection().in_atomic_block:
+        # Another worker can rebuild from the not yet committed rows under the
+        # version bumped above and keep that snapshot (the read model, the
+        # immutable bundle); bump again once the rows are visible.
+        transaction.on_commit(lambda: [_bump_version(key) for key in keys])
+
+
+def invalidate_catalog_cache() -> None:
+    """Drop every catalog entry at once. Prefer `invalidate_catalog_change` for row-level edits."""
+    _bump_versions([CATALOG_VERSION_KEY])
+
+
+def invalidate_catalog_change(change: str, product_ids=(), category_ids=(), section_ids=()) -> None:
+    """
+    Bump only the versions a change of kind `change` depends on.
+
+    Missing parent ids are resolved from the database, so callers only need
+    to pass the ids they already have (e.g. product ids after a checkout).
+    """
+    dependencies = CATALOG_CHANGE_DEPENDENCIES[change]
+    scope_kinds = dependencies["scopes"]
+    ids = {
+        "product": {int(pk) for pk in product_ids if pk},
+        "category": {int(pk) for pk in category_ids if pk},
+        "section": {int(pk) for pk in section_ids if pk},
+    }
+
+    if ids["product"] and ("category" in scope_kinds or "section" in scope_kinds):
+        from .models import Product
+
+        rows = Product.objects.filter(id__in=ids["product"]).values_list(
+            "category_id", "category__section_id"
+        )
+        for category_id, section_id in rows:
+            ids["category"].add(category_id)
+            ids["section"].add(section_id)
+
+    if ids["category"] and "section" in scope_kinds:
+        from .models import Category
+
+        ids["section"].update(
+            Category.objects.filter(id__in=ids["category"]).values_list("section_id", flat=True)
+        )
+
+    keys = [
+        _scope_version_key(kind, scope_id)
+        for kind in CATALOG_SCOPE_KINDS
+        if kind in scope_kinds
+        for scope_id in sorted(ids[kind])
+    ]
+    keys.extend(_namespace_version_key(namespace) for namespace in dependencies["namespaces"])
+    _bump_versions(keys)
+
+    if dependencies["namespaces"]:
+        from .cache_warmer import schedule_catalog_warm
+
+        transaction.on_commit(schedule_catalog_warm)
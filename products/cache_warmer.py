@@ -0,0 +1,173 @@
+"""
+Background rebuild of the hot catalog cache keys after an invalidation.
+
+Catalog changes schedule one debounced `warm_catalog_cache_task`; bursts of
+edits (or checkouts flipping availability) collapse into a single warm-up a
+few seconds after the first one. Deploys run the same warm-up through the
+`warm_catalog_cache` management command.
+
+Only cache-backed keys are warmed. With USE_CATALOG_READ_MODEL the list,
+detail and search endpoints are served from each web worker's own memory,
+which a Celery worker cannot fill.
+"""
+
+import logging
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpRequest, QueryDict
+
+from core.redis_client import get_redis_client, redis_key
+
+logger = logging.getLogger(__name__)
+
+CATALOG_WARM_PENDING_KEY = "products:catalog:warm:pending"
+SEARCH_QUERIES_KEY = "products:search:queries:v1"
+SEARCH_QUERIES_TTL = 24 * 60 * 60
+SEARCH_QUERIES_KEEP = 500
+CATEGORY_CARD_SECTIONS = ("bakery", "snacks")
+
+
+def record_search_query(query):
+    """Count a search so the warmer can pre-build the most frequent ones."""
+    client = get_redis_client()
+    if client is None:
+        return
+    key = redis_key(SEARCH_QUERIES_KEY)
+    pipe = client.pipeline(transaction=False)
+    pipe.zincrby(key, 1, query.strip().lower()[:64])
+    pipe.expire(key, SEARCH_QUERIES_TTL)
+    pipe.execute()
+
+
+def top_search_queries(limit):
+    client = get_redis_client()
+    if client is None or limit <= 0:
+        return []
+    key = redis_key(SEARCH_QUERIES_KEY)
+    queries = [value.decode() for value in client.zrevrange(key, 0, limit - 1)]
+    # Keep the long tail from growing without bound.
+    client.zremrangebyrank(key, 0, -(SEARCH_QUERIES_KEEP + 1))
+    return queries
+
+
+def schedule_catalog_warm():
+    """Queue one warm-up per debounce window, however many changes land in it."""
+    from .tasks import warm_catalog_cache_task
+
+    delay = settings.CATALOG_WARM_DEBOUNCE_SECONDS
+    if not cache.add(CATALOG_WARM_PENDING_KEY, 1, delay + 60):
+        return
+    try:
+        warm_catalog_cache_task.apply_async(countdown=delay)
+    except Exception:
+        cache.delete(CATALOG_WARM_PENDING_KEY)
+        logger.exception("Could not queue catalog cache warm-up")
+
+
+class _WarmRequest(HttpRequest):
+    """Minimal GET request so views can build absolute image URLs off-request."""
+
+    def __init__(self, base_url, path, params=None):
+        super().__init__()
+        parts = urlsplit(base_url)
+        self._warm_scheme = parts.scheme or "https"
+        self.method = "GET"
+        self.path = self.path_info = path
+        self.META = {
+            "HTTP_HOST": parts.netloc,
+            "SERVER_NAME": parts.hostname or "",
+            "SERVER_PORT": str(parts.port or (443 if self._warm_scheme == "https" else 80)),
+        }
+        self.GET = QueryDict(mutable=True)
+        self.GET.update(params or {})
+        self.user = AnonymousUser()
+        self.catalog_warmup = True
+
+    def _get_scheme(self):
+        return self._warm_scheme
+
+
+def _warm_url(base_url, view, path, params=None, **kwargs):
+    try:
+        response = view(_WarmRequest(base_url, path, params), **kwargs)
+    except Exception:
+        # One bad entry must not stop the rest of the warm-up.
+        logger.exception("Catalog warm-up failed path=%s", path)
+        return
+    if response.status_code != 200:
+        logger.warning("Catalog warm-up got status=%s path=%s", response.status_code, path)
+
+
+def warm_catalog_cache(base_url=None, search_limit=None):
+    """
+    Rebuild every hot catalog key that is currently missing. Keys that are
+    still cached are left alone. Returns the number of entries visited.
+    """
+    from .models import Category, Section
+    from .services import ProductService
+    from .views import (
+        CategoryBySectionAPIView,
+        ProductByCategoryAPIView,
+        ProductBySectionAPIView,
+        ProductSearchAPIView,
+        SectionListAPIView,
+        StorefrontHomeView,
+    )
+
+    started = time.monotonic()
+    base_url = (base_url if base_url is not None else settings.SITE_BASE_URL).rstrip("/")
+    if search_limit is None:
+        search_limit = settings.CATALOG_WARM_SEARCH_LIMIT
+    warmed = 0
+
+    for section in CATEGORY_CARD_SECTIONS:
+        ProductService.category_cards_json(section)
+        warmed += 1
+    StorefrontHomeView._active_ads_by_slot()
+    StorefrontHomeView._top_customer_choices_bakery()
+    StorefrontHomeView._top_customer_choices_snacks()
+    warmed += 3
+
+    if not base_url:
+        # Product payloads embed absolute image URLs; without a base URL
+        # leave them to the first real request.
+        logger.info("Catalog warm-up skipped product keys: SITE_BASE_URL is not set")
+        return warmed
+
+    if not settings.USE_CATALOG_READ_MODEL:
+        _warm_url(base_url, SectionListAPIView.as_view(), "/api/products/sections/")
+        warmed += 1
+        for section_id in Section.objects.values_list("id", flat=True):
+            _warm_url(
+                base_url,
+                CategoryBySectionAPIView.as_view(),
+                f"/api/products/sections/{section_id}/categories/",
+                section_id=section_id,
+            )
+            _warm_url(
+                base_url,
+                ProductBySectionAPIView.as_view(),
+                f"/api/products/sections/{section_id}/products/",
+                section_id=section_id,
+            )
+            warmed += 2
+        for category_id in Category.objects.values_list("id", flat=True):
+            _warm_url(
+                base_url,
+                ProductByCategoryAPIView.as_view(),
+                f"/api/products/categories/{category_id}/products/",
+                category_id=category_id,
+            )
+            warmed += 1
+
+        search_view = ProductSearchAPIView.as_view()
+        for query in top_search_queries(search_limit):
+            _warm_url(base_url, search_view, "/api/products/search/", {"q": query})
+            warmed += 1
+
+    logger.info("Catalog warm-up done entries=%s elapsed_ms=%.1f", warmed, (time.monotonic() - started) * 1000)
+    return warmed
@@ -0,0 +1,72 @@
+"""
+Catalog change feed for incremental client sync.
+
+Product writes append an upsert or delete row to `CatalogChange` once they
+commit (see products/signals.py). Clients keep the highest sequence they
+applied and ask `/api/products/changes/?after=<seq>`; several changes of one
+product inside a page collapse into its latest operation.
+
+`compact_catalog_changes` drops every row that a newer row of the same
+product supersedes. A client resuming from any sequence still sees the
+latest operation of every product changed since, the table stays at about
+one row per product ever created, and `?after=0` is a full sync.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import CatalogChange
+
+CATALOG_CHANGES_PAGE_SIZE = 500
+# Rows younger than this are held back for the next poll: ids are handed out
+# before the insert commits, so a smaller id can still appear after a larger
+# one was already served.
+CATALOG_CHANGES_SETTLE = timedelta(seconds=1)
+
+
+def record_catalog_changes(product_ids, op=CatalogChange.Operation.UPSERT) -> None:
+    """Log `op` for the products once the current transaction commits."""
+    product_ids = sorted({int(product_id) for product_id in product_ids if product_id})
+    if not product_ids:
+        return
+
+    def write():
+        CatalogChange.objects.bulk_create([CatalogChange(product_id=pk, op=op) for pk in product_ids])
+
+    transaction.on_commit(write)
+
+
+def read_catalog_changes(after, limit=CATALOG_CHANGES_PAGE_SIZE):
+    """
+    Latest operation per product among the next `limit` changes after `after`.
+    Returns (upsert_ids, delete_ids, seq, has_more); both id lists are in
+    sequence order and `seq` is the cursor for the next call.
+    """
+    cutoff = timezone.now() - CATALOG_CHANGES_SETTLE
+    rows = list(
+        CatalogChange.objects.filter(id__gt=after, created_at__lte=cutoff)
+        .order_by("id")
+        .values_list("id", "product_id", "op")[: limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    latest = {}
+    for _, product_id, op in rows:
+        # Re-inserted so each product sits at the position of its last change.
+        latest.pop(product_id, None)
+        latest[product_id] = op
+    upsert_ids = [pk for pk, op in latest.items() if op == CatalogChange.Operation.UPSERT]
+    delete_ids = [pk for pk, op in latest.items() if op == CatalogChange.Operation.DELETE]
+    seq = rows[-1][0] if rows else after
+    return upsert_ids, delete_ids, seq, has_more
+
+
+def compact_catalog_changes() -> int:
+    """Delete every change superseded by a newer one for the same product."""
+    newer = CatalogChange.objects.filter(product_id=OuterRef("product_id"), id__gt=OuterRef("id"))
+    deleted, _ = CatalogChange.objects.filter(Exists(newer)).delete()
+    return deleted
@@ -0,0 +1,46 @@
+"""
+Maintenance of the denormalized `Category.card_image` / `product_count`.
+
+The category cards endpoint reads both columns straight off `Category`
+instead of running a correlated subquery over `Product` per category. They
+are recomputed here for the categories a product write touched, with one
+UPDATE per call.
+"""
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Category, Product
+
+
+def card_image_expression(product_model=Product):
+    newest_image = (
+        product_model.objects.filter(category_id=OuterRef("pk"))
+        .exclude(image="")
+        .order_by("-created_at", "name")
+        .values("image")[:1]
+    )
+    return Coalesce(Subquery(newest_image), Value(""))
+
+
+def product_count_expression(product_model=Product):
+    counts = (
+        product_model.objects.filter(category_id=OuterRef("pk"))
+        .order_by()
+        .values("category_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def refresh_category_cards(category_ids=None) -> int:
+    """Recompute the card columns of the given categories (all when None)."""
+    categories = Category.objects.all()
+    if category_ids is not None:
+        category_ids = {int(pk) for pk in category_ids if pk}
+        if not category_ids:
+            return 0
+        categories = categories.filter(id__in=category_ids)
+    # Queryset update: no post_save, so no catalog invalidation loop.
+    return categories.update(card_image=card_image_expression(), product_count=product_count_expression())
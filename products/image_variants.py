@@ -0,0 +1,115 @@
+"""
+Fixed-width WebP/JPEG derivatives of product and advertisement images.
+
+Each size in IMAGE_VARIANT_WIDTHS is written next to the original as
+`<dir>/variants/<stem>-<hash>-<width>w.<ext>`, where the hash is taken from
+the original's bytes. A changed image therefore always gets new names, and
+nginx serves `variants/` as immutable.
+
+The generated names are stored on the row in `image_variants`:
+
+    {"source": "<image name>", "sizes": {"card": {"width": 360, "webp": ..., "jpeg": ...}, ...}}
+
+`source` ties them to the image they were made from, so a replaced image
+is detected (and re-processed) without extra bookkeeping.
+"""
+
+import hashlib
+import io
+import logging
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+IMAGE_VARIANT_WIDTHS = {
+    "cart": 160,
+    "card": 360,
+    "detail": 960,
+}
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+
+def _variant_name(source_name, digest, width, ext):
+    directory, filename = posixpath.split(source_name)
+    stem = posixpath.splitext(filename)[0][:60]
+    return posixpath.join(directory, "variants", f"{stem}-{digest}-{width}w.{ext}")
+
+
+def _encode(image, fmt, quality):
+    buffer = io.BytesIO()
+    if fmt == "JPEG" and image.mode != "RGB":
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A") if "A" in image.getbands() else None)
+        image = background
+    image.save(buffer, fmt, quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def build_image_variants(source_name, storage=default_storage):
+    """
+    Write every size of `source_name` and return the `image_variants`
+    value. Files that already exist (same content hash) are not rewritten.
+    """
+    with storage.open(source_name, "rb") as source:
+        data = source.read()
+    digest = hashlib.blake2b(data, digest_size=6).hexdigest()
+
+    with Image.open(io.BytesIO(data)) as opened:
+        original = ImageOps.exif_transpose(opened)
+        original = original.convert("RGBA" if "A" in original.getbands() else "RGB")
+
+    sizes = {}
+    for variant, width in IMAGE_VARIANT_WIDTHS.items():
+        image = original.copy()
+        # Only ever scale down; small originals are re-encoded at their size.
+        image.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        entry = {"width": image.width}
+        for ext, fmt, quality in (("webp", "WEBP", WEBP_QUALITY), ("jpeg", "JPEG", JPEG_QUALITY)):
+            name = _variant_name(source_name, digest, width, ext)
+            if not storage.exists(name):
+                name = storage.save(name, ContentFile(_encode(image, fmt, quality)))
+            entry[ext] = name
+        sizes[variant] = entry
+    return {"source": source_name, "sizes": sizes}
+
+
+def variants_current(instance) -> bool:
+    image_name = instance.image.name if instance.image else ""
+    return not image_name or (instance.image_variants or {}).get("source") == image_name
+
+
+def image_variant_urls(image_name, variants):
+    """
+    `{"card": {"width": 360, "webp": url, "jpeg": url}, ...}` for the current
+    image, or {} while its variants are missing or were made from an older one.
+    URLs are site-relative, so payloads need no per-item absolute URL.
+    """
+    if not image_name or not variants or variants.get("source") != image_name:
+        return {}
+    return {
+        variant: {
+            "width": entry["width"],
+            "webp": default_storage.url(entry["webp"]),
+            "jpeg": default_storage.url(entry["jpeg"]),
+        }
+        for variant, entry in variants.get("sizes", {}).items()
+    }
+
+
+def refresh_image_variants(instance) -> bool:
+    """Generate variants for `instance.image` if they are missing or stale."""
+    if variants_current(instance):
+        return False
+    try:
+        instance.image_variants = build_image_variants(instance.image.name)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        # A missing or unreadable original keeps serving the full image.
+        logger.exception("Image variants failed model=%s id=%s", instance._meta.label, instance.pk)
+        return False
+    instance.save(update_fields=["image_variants"])
+    return True
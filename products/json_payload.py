@@ -0,0 +1,108 @@
+"""
+Pre-encoded JSON bodies for the catalog endpoints.
+
+Hot catalog reads keep the final UTF-8 body (and a gzipped copy when it is
+worth it) instead of Python lists, and answer with a plain HttpResponse so a
+hit skips unpickling, DRF rendering and GZipMiddleware.
+
+Product payloads carry live stock fields, so they are kept as per-item
+fragments: the stock-free JSON object without its closing brace. The stock
+fields are spliced in per request from the stock overlay.
+
+Every response carries a strong ETag (a hash of the uncompressed body) and
+a matching If-None-Match is answered with 304 before any body is sent.
+"""
+
+import gzip
+import hashlib
+import json
+from collections import namedtuple
+
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+
+from .stock_overlay import get_stock_levels, stock_fields
+
+GZIP_MIN_BYTES = 1024
+JSON_CONTENT_TYPE = "application/json"
+
+EncodedPayload = namedtuple("EncodedPayload", ["body", "gzipped", "etag"], defaults=(None,))
+
+
+def encode_json(payload) -> bytes:
+    # Same output as DRF's JSONRenderer: compact separators, UTF-8.
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def body_etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def encode_payload(payload) -> EncodedPayload:
+    body = encode_json(payload)
+    gzipped = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+    return EncodedPayload(body, gzipped, body_etag(body))
+
+
+def encode_fragment(item) -> bytes:
+    """Encode one object without its closing brace, ready for `splice_stock`."""
+    return encode_json(item)[:-1]
+
+
+def _stock_suffix(stock_qty) -> bytes:
+    return b"," + encode_json(stock_fields(stock_qty))[1:]
+
+
+def splice_stock(fragments):
+    """
+    Join (product_id, fragment) pairs into a JSON array body with the live
+    stock fields of every product. Returns (body, levels).
+    """
+    fragments = list(fragments)
+    levels = get_stock_levels([product_id for product_id, _ in fragments])
+    parts = [fragment + _stock_suffix(levels.get(product_id, 0)) for product_id, fragment in fragments]
+    return b"[" + b",".join(parts) + b"]", levels
+
+
+def _if_none_match(request, digest) -> bool:
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header or request.method not in ("GET", "HEAD"):
+        return False
+    # If-None-Match uses weak comparison; GZipMiddleware also weakens the
+    # ETag of bodies it compresses itself. Either representation matches.
+    etags = {tag[2:] if tag.startswith("W/") else tag for tag in parse_etags(header)}
+    return "*" in etags or f'"{digest}"' in etags or f'"{digest}-gzip"' in etags
+
+
+def json_response(request, payload, status=200, max_age=None) -> HttpResponse:
+    """
+    Answer with pre-encoded bytes, using the gzipped copy when the client
+    accepts it, or with 304 when the client already holds this body.
+
+    Responses are revalidated on every use unless `max_age` is given, which
+    is only meant for versioned URLs whose body can never change.
+    """
+    if isinstance(payload, bytes):
+        payload = EncodedPayload(payload, None)
+    digest = payload.etag or body_etag(payload.body)
+
+    accepts_gzip = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+    use_gzip = payload.gzipped is not None and accepts_gzip
+    if status == 200 and _if_none_match(request, digest):
+        response = HttpResponse(status=304)
+    elif use_gzip:
+        response = HttpResponse(payload.gzipped, content_type=JSON_CONTENT_TYPE, status=status)
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(payload.body, content_type=JSON_CONTENT_TYPE, status=status)
+
+    # Each representation gets its own strong validator.
+    response["ETag"] = f'"{digest}-gzip"' if use_gzip else f'"{digest}"'
+    if max_age is None:
+        patch_cache_control(response, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, max_age=max_age, immutable=True)
+    if payload.gzipped is not None:
+        patch_vary_headers(response, ("Accept-Encoding",))
+    return response
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from products.cache_utils import invalidate_catalog_change
+from products.category_cards import refresh_category_cards
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized card image and product count of every category."
+
+    def handle(self, *args, **options):
+        updated = refresh_category_cards()
+        invalidate_catalog_change("category")
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {updated} category cards."))
@@ -0,0 +1,88 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from products.cache_utils import invalidate_catalog_change
+from products.catalog_changes import record_catalog_changes
+from products.image_variants import build_image_variants
+from products.models import Advertisement, Product
+
+MODELS = {"products": Product, "ads": Advertisement}
+
+
+def _build(job):
+    # Runs in a worker process: only storage and Pillow, no database access.
+    model_label, pk, image_name = job
+    try:
+        return model_label, pk, image_name, build_image_variants(image_name), None
+    except Exception as exc:
+        return model_label, pk, image_name, None, str(exc)
+
+
+class Command(BaseCommand):
+    help = "Generate the WebP/JPEG image sizes for existing product and advertisement images."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+        parser.add_argument(
+            "--only",
+            choices=sorted(MODELS),
+            help="Limit the backfill to products or ads.",
+        )
+        parser.add_argument("--force", action="store_true", help="Rebuild sizes that are already current.")
+
+    def _jobs(self, options):
+        names = [options["only"]] if options["only"] else sorted(MODELS)
+        for name in names:
+            model = MODELS[name]
+            rows = model.objects.exclude(image="").values_list("pk", "image", "image_variants").order_by("pk")
+            for pk, image_name, variants in rows.iterator(chunk_size=500):
+                if options["force"] or (variants or {}).get("source") != image_name:
+                    yield model._meta.label, pk, image_name
+
+    def _results(self, jobs, workers):
+        if workers == 1:
+            yield from map(_build, jobs)
+            return
+        # Forked workers must not share the parent's database sockets.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_build, job) for job in jobs]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        jobs = list(self._jobs(options))
+        if not jobs:
+            self.stdout.write("All images already have their sizes.")
+            return
+
+        done = failed = 0
+        updated = {Product._meta.label: [], Advertisement._meta.label: []}
+        for model_label, pk, image_name, variants, error in self._results(jobs, options["workers"]):
+            if error:
+                failed += 1
+                self.stderr.write(f"{model_label} {pk} ({image_name}): {error}")
+                continue
+            model = Product if model_label == Product._meta.label else Advertisement
+            # Skips rows whose image was replaced while the pool was busy.
+            # Queryset update: one catalog invalidation at the end instead of
+            # one per row from post_save.
+            if not model.objects.filter(pk=pk, image=image_name).update(image_variants=variants):
+                continue
+            updated[model_label].append(pk)
+            done += 1
+            if done % 100 == 0:
+                self.stdout.write(f"  {done}/{len(jobs)} images")
+
+        if updated[Product._meta.label]:
+            invalidate_catalog_change("product", product_ids=updated[Product._meta.label])
+            record_catalog_changes(updated[Product._meta.label])
+        if updated[Advertisement._meta.label]:
+            invalidate_catalog_change("advertisement")
+        self.stdout.write(self.style.SUCCESS(f"Generated sizes for {done}/{len(jobs)} images ({failed} failed)."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from products.affinity import AFFINITY_TOP_K, rebuild_product_affinity
+
+
+class Command(BaseCommand):
+    help = "Recount co-purchased products from orders and store the top neighbours per product."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=AFFINITY_TOP_K, help="Neighbours kept per product.")
+        parser.add_argument("--days", type=int, default=None, help="Only mine orders from the last N days.")
+
+    def handle(self, *args, **options):
+        if options["top_k"] < 1:
+            raise CommandError("--top-k must be at least 1")
+        stored = rebuild_product_affinity(top_k=options["top_k"], days=options["days"])
+        self.stdout.write(self.style.SUCCESS(f"Stored {stored} product affinity rows."))
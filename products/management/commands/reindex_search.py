@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from products.models import Product
+from products.search_vectors import SEARCH_VECTOR_BATCH_SIZE, update_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Rebuild Product.search_vector for the whole catalog in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=SEARCH_VECTOR_BATCH_SIZE,
+            help=f"Products per UPDATE statement (default {SEARCH_VECTOR_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many products and chunks would be reindexed without writing.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        total = Product.objects.count()
+        chunks = (total + chunk_size - 1) // chunk_size
+        if options["dry_run"]:
+            self.stdout.write(f"Dry run: would reindex {total} products in {chunks} chunks of {chunk_size}.")
+            return
+
+        done = 0
+        last_id = 0
+        while True:
+            # Keyset over the primary key keeps every chunk an index range scan.
+            ids = list(
+                Product.objects.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            update_search_vectors(ids)
+            done += len(ids)
+            last_id = ids[-1]
+            self.stdout.write(f"Reindexed {done}/{total} products")
+
+        self.stdout.write(self.style.SUCCESS(f"Reindexed {done} products."))
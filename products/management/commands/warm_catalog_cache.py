@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from products.cache_warmer import warm_catalog_cache
+
+
+class Command(BaseCommand):
+    help = "Rebuild missing hot catalog cache entries (run after deploys)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            default=None,
+            help="Public origin for absolute image URLs. Defaults to SITE_BASE_URL.",
+        )
+        parser.add_argument(
+            "--searches",
+            type=int,
+            default=None,
+            help="How many of the most frequent recent searches to pre-build. Defaults to CATALOG_WARM_SEARCH_LIMIT.",
+        )
+
+    def handle(self, *args, **options):
+        warmed = warm_catalog_cache(base_url=options["base_url"], search_limit=options["searches"])
+        self.stdout.write(self.style.SUCCESS(f"Warmed {warmed} catalog cache entries."))
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-17 00:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_alter_advertisement_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductAffinity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='affinities', to='products.product')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', '-score'], name='products_affinity_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'related'), name='unique_product_affinity')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 6.0.2 on 2026-10-17 00:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_views(apps, schema_editor):
+    ProductViewLog = apps.get_model("products", "ProductViewLog")
+    ProductViewDaily = apps.get_model("products", "ProductViewDaily")
+    db_alias = schema_editor.connection.alias
+
+    rows = (
+        ProductViewLog.objects.using(db_alias)
+        .annotate(day=TruncDate("viewed_at"))
+        .values("product_id", "day")
+        .annotate(views=Count("id"))
+    )
+    ProductViewDaily.objects.using(db_alias).bulk_create(
+        [ProductViewDaily(product_id=row["product_id"], day=row["day"], views=row["views"]) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_productpopularity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductViewDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='products.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='products_viewdaily_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'day'), name='products_viewdaily_product_day_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_views, migrations.RunPython.noop),
+    ]
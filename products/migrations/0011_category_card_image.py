@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-17 01:40
+
+from django.db import migrations, models
+
+
+def backfill_category_cards(apps, schema_editor):
+    from products.category_cards import card_image_expression, product_count_expression
+
+    Category = apps.get_model("products", "Category")
+    Product = apps.get_model("products", "Product")
+    Category.objects.using(schema_editor.connection.alias).update(
+        card_image=card_image_expression(Product),
+        product_count=product_count_expression(Product),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_product_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='card_image',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='product_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_category_cards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-17 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_category_card_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='advertisement',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
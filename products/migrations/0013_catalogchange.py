@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-17 01:40
+
+from django.db import migrations, models
+
+
+def seed_current_products(apps, schema_editor):
+    # One upsert per existing product, so `?after=0` is a full sync.
+    Product = apps.get_model("products", "Product")
+    CatalogChange = apps.get_model("products", "CatalogChange")
+    db_alias = schema_editor.connection.alias
+
+    product_ids = Product.objects.using(db_alias).order_by("id").values_list("id", flat=True)
+    CatalogChange.objects.using(db_alias).bulk_create(
+        [CatalogChange(product_id=product_id, op="upsert") for product_id in product_ids.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.PositiveBigIntegerField()),
+                ('op', models.CharField(choices=[('upsert', 'Upsert'), ('delete', 'Delete')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product_id', 'id'], name='products_change_product_idx')],
+            },
+        ),
+        migrations.RunPython(seed_current_products, migrations.RunPython.noop),
+    ]
@@ -25,6 +25,11 @@ class Section(models.Model):
 class Category(models.Model):
     name = models.CharField(max_length=100)
     section = models.ForeignKey(Section, on_delete=models.CASCADE, related_name="categories", db_index=True)
+    # Denormalized for the category cards: image of the newest product that
+    # has one, and the number of products. Kept current by the product
+    # signals; `backfill_category_cards` rebuilds them.
+    card_image = models.CharField(max_length=255, blank=True, default="")
+    product_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ["name"]
@@ -46,9 +51,14 @@ class Product(models.Model):
     stock_qty = models.PositiveIntegerField(default=20)
     is_available = models.BooleanField(default=True, db_index=True)
     image = models.ImageField(upload_to="products/")
+    # Generated WebP/JPEG sizes of `image`; see products.image_variants.
+    image_variants = models.JSONField(default=dict, blank=True)
     description = models.TextField(blank=True, null=True)
     search_vector = SearchVectorField(null=True)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Bumped by every stock/price/availability write, including the bulk
+    # `.update()` paths in checkout, so the stock tracker can poll for deltas.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     related_products = models.ManyToManyField("self", blank=True, symmetrical=False)
 
     class Meta:
@@ -62,6 +72,13 @@ class Product(models.Model):
         ]
         ordering = ["name"]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the signals refresh the old category's card after a move.
+        instance._loaded_category_id = instance.__dict__.get("category_id")
+        return instance
+
     def save(self, *args, **kwargs):
         self.is_available = self.stock_qty > 0
         super().save(*args, **kwargs)
@@ -70,6 +87,43 @@ class Product(models.Model):
         return self.name
 
 
+# Co-purchase neighbours mined from OrderItem; `score` is the number of
+# orders that contained both products.
+class ProductAffinity(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="affinities")
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    score = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["product", "related"], name="unique_product_affinity")
+        ]
+        indexes = [
+            models.Index(fields=["product", "-score"], name="products_affinity_top_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} ({self.score})"
+
+
+# Rolling order popularity over the last POPULARITY_WINDOW_DAYS, bumped per
+# order and recomputed from OrderItem by a periodic job.
+class ProductPopularity(models.Model):
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name="popularity")
+    total_qty = models.PositiveIntegerField(default=0)
+    order_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-total_qty", "-order_count"], name="products_popularity_rank_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}: {self.total_qty} units / {self.order_count} orders"
+
+
 class ProductViewLog(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, db_index=True)
     viewed_at = models.DateTimeField(auto_now_add=True, db_index=True)
@@ -83,10 +137,54 @@ class ProductViewLog(models.Model):
         return f"{self.product.name} unavailable view"
 
 
+class ProductViewDaily(models.Model):
+    """Unavailable-product views per product and day, flushed from the live counters."""
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="daily_views")
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["product", "day"], name="products_viewdaily_product_day_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["day"], name="products_viewdaily_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} on {self.day}: {self.views} views"
+
+
+class CatalogChange(models.Model):
+    """
+    Product change log behind /api/products/changes/. The id is the sequence
+    clients resume from; product_id is not a foreign key so delete
+    tombstones outlive the product.
+    """
+
+    class Operation(models.TextChoices):
+        UPSERT = "upsert", "Upsert"
+        DELETE = "delete", "Delete"
+
+    product_id = models.PositiveBigIntegerField()
+    op = models.CharField(max_length=10, choices=Operation.choices)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["product_id", "id"], name="products_change_product_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.op} product {self.product_id}"
+
+
 class Advertisement(models.Model):
     title = models.CharField(max_length=120)
     subtitle = models.CharField(max_length=220, blank=True)
     image = models.ImageField(upload_to="ads/")
+    image_variants = models.JSONField(default=dict, blank=True)
     cta_label = models.CharField(max_length=40, blank=True, default="")
     cta_url = models.CharField(max_length=500, blank=True, default="")
     display_order = models.PositiveIntegerField(default=0)
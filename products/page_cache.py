@@ -0,0 +1,61 @@
+"""
+Full-page cache for the public storefront templates.
+
+Anonymous GETs are answered with the rendered HTML of an earlier request.
+The cache key carries the versions of everything the page renders (catalog
+namespaces, entity scopes, the delivery contact), so an admin edit makes the
+next request render a fresh page without any explicit purge. Nothing
+per-visitor is rendered on the server: cart counts, the notification bell and
+the profile menu are filled in by the page scripts.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+STOREFRONT_PAGE_KEY_PREFIX = "products:storefront_page"
+
+
+class CachedStorefrontPageMixin:
+    """
+    Serve anonymous GETs of a TemplateView from the page cache.
+
+    Views override `page_cache_versions` with the version strings their
+    template depends on. The query string is ignored: storefront templates
+    never read it, and campaign parameters would otherwise split the cache.
+    """
+
+    def page_cache_versions(self):
+        return ()
+
+    def _page_cache_key(self):
+        versions = ".".join(str(version) for version in self.page_cache_versions())
+        path = hashlib.md5(self.request.path.encode("utf-8")).hexdigest()
+        return f"{STOREFRONT_PAGE_KEY_PREFIX}:{path}:v{versions}"
+
+    def _page_cacheable(self, request):
+        return (
+            settings.STOREFRONT_PAGE_CACHE_SECONDS > 0
+            and request.method in ("GET", "HEAD")
+            and not request.user.is_authenticated
+        )
+
+    def get(self, request, *args, **kwargs):
+        if not self._page_cacheable(request):
+            return super().get(request, *args, **kwargs)
+
+        cache_key = self._page_cache_key()
+        content = cache.get(cache_key)
+        if content is not None:
+            response = HttpResponse(content)
+        else:
+            response = super().get(request, *args, **kwargs)
+            response.render()
+            if response.status_code == 200:
+                cache.set(cache_key, response.content, settings.STOREFRONT_PAGE_CACHE_SECONDS)
+        # Signed-in staff get a live render; keep shared caches from mixing them up.
+        patch_vary_headers(response, ("Cookie",))
+        return response
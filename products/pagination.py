@@ -0,0 +1,130 @@
+"""
+Keyset (cursor) pagination for the product list and search endpoints.
+
+Clients opt in by sending `page_size` and/or `cursor`, and then get an
+envelope `{"results": [...], "next": <url|null>, "next_cursor": <str|null>}`.
+Requests without either keep the bare array the storefront JS expects, capped
+at a hard maximum.
+
+Cursors are opaque, URL-safe encodings of the sort key of the last item on
+the page: (created_at, name, id) for listings and (rank, name, id) for
+search. A page therefore stays stable when products are added ahead of it.
+"""
+
+import base64
+import bisect
+import json
+import math
+
+from .json_payload import encode_json
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+# Hard caps for the legacy, unpaginated array responses.
+LEGACY_LIST_MAX_ITEMS = 500
+LEGACY_SEARCH_MAX_ITEMS = 100
+# Cursor values are timestamps in microseconds, ranks or snapshot positions;
+# anything beyond float precision did not come from this module.
+MAX_CURSOR_VALUE = 2 ** 53
+MAX_CURSOR_ID = 2 ** 63 - 1
+
+
+class PageParams:
+    __slots__ = ("paginated", "page_size", "cursor", "invalid_cursor")
+
+    def __init__(self, paginated, page_size, cursor, invalid_cursor=False):
+        self.paginated = paginated
+        self.page_size = page_size
+        self.cursor = cursor
+        self.invalid_cursor = invalid_cursor
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _valid_cursor_values(values) -> bool:
+    if not isinstance(values, list) or len(values) != 3:
+        return False
+    value, name, pk = values
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    if not math.isfinite(value) or abs(value) > MAX_CURSOR_VALUE:
+        return False
+    if not isinstance(name, str):
+        return False
+    return not isinstance(pk, bool) and isinstance(pk, int) and 0 <= pk <= MAX_CURSOR_ID
+
+
+def decode_cursor(token):
+    """
+    Return the cursor values as a tuple, or None for a missing/garbled token.
+
+    Only the (number, str, int) shape `encode_cursor` produces is accepted,
+    with the number and id kept within ranges the queries can handle.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if not _valid_cursor_values(values):
+        return None
+    return tuple(values)
+
+
+def cursor_sort_key(cursor):
+    """Turn cursor values (value, name, id) into the (-value, name, id) sort key."""
+    if cursor is None:
+        return None
+    try:
+        return -float(cursor[0]), str(cursor[1]), int(cursor[2])
+    except (TypeError, ValueError):
+        return None
+
+
+def page_params(request) -> PageParams:
+    params = request.GET
+    paginated = "page_size" in params or "cursor" in params
+    try:
+        page_size = int(params.get("page_size") or DEFAULT_PAGE_SIZE)
+    except (TypeError, ValueError):
+        page_size = DEFAULT_PAGE_SIZE
+    page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+    token = params.get("cursor")
+    cursor = decode_cursor(token)
+    return PageParams(paginated, page_size, cursor, invalid_cursor=bool(token) and cursor is None)
+
+
+def keyset_page(items, keys, cursor_key, page_size):
+    """
+    Slice one page out of `items`, already sorted by the parallel `keys`.
+
+    Returns (page, has_more). `cursor_key` is the sort key of the last item
+    the client has seen; the page starts right after it.
+    """
+    start = bisect.bisect_right(keys, cursor_key) if cursor_key is not None else 0
+    page = items[start:start + page_size]
+    return page, start + page_size < len(items)
+
+
+def page_envelope(request, results_body: bytes, next_cursor) -> bytes:
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params["cursor"] = next_cursor
+        next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+    return b"".join(
+        (
+            b'{"results":',
+            results_body,
+            b',"next":',
+            encode_json(next_url),
+            b',"next_cursor":',
+            encode_json(next_cursor),
+            b"}",
+        )
+    )
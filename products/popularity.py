@@ -0,0 +1,83 @@
+"""
+Rolling product popularity for the home page "top customer choices" strips.
+
+Each placed order adds its quantities to ProductPopularity straight away;
+a periodic job recomputes the table from the last POPULARITY_WINDOW_DAYS of
+orders, which is what ages old sales out. Home page reads are then a top-K
+scan of a small indexed table instead of an aggregate over all OrderItems.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .cache_utils import invalidate_catalog_change
+from .models import ProductPopularity
+
+POPULARITY_BATCH_SIZE = 1000
+
+
+def record_order_popularity(order_id):
+    from orders.models import OrderItem
+
+    quantities = dict(
+        OrderItem.objects.filter(order_id=order_id)
+        .values("product_id")
+        .annotate(qty=Sum("quantity"))
+        .values_list("product_id", "qty")
+    )
+    if not quantities:
+        return 0
+
+    with transaction.atomic():
+        ProductPopularity.objects.bulk_create(
+            [ProductPopularity(product_id=product_id) for product_id in quantities],
+            ignore_conflicts=True,
+        )
+        for product_id, qty in quantities.items():
+            ProductPopularity.objects.filter(product_id=product_id).update(
+                total_qty=F("total_qty") + qty,
+                order_count=F("order_count") + 1,
+                updated_at=timezone.now(),
+            )
+    return len(quantities)
+
+
+def recompute_product_popularity(days=None):
+    """Rebuild the table from the orders inside the rolling window."""
+    from orders.models import OrderItem
+
+    days = days or settings.POPULARITY_WINDOW_DAYS
+    cutoff = timezone.now() - timedelta(days=days)
+    rows = (
+        OrderItem.objects.filter(order__created_at__gte=cutoff)
+        .values("product_id")
+        .annotate(total_qty=Sum("quantity"), order_count=Count("order_id", distinct=True))
+        .values_list("product_id", "total_qty", "order_count")
+    )
+    popularity = [
+        ProductPopularity(product_id=product_id, total_qty=total_qty, order_count=order_count)
+        for product_id, total_qty, order_count in rows
+    ]
+
+    with transaction.atomic():
+        ProductPopularity.objects.all().delete()
+        ProductPopularity.objects.bulk_create(popularity, batch_size=POPULARITY_BATCH_SIZE)
+        invalidate_catalog_change("popularity")
+    return len(popularity)
+
+
+def top_popular_product_ids(section_names, limit):
+    """Most ordered available products in the given sections, best first."""
+    return list(
+        ProductPopularity.objects.filter(
+            product__category__section__name__in=section_names,
+            product__is_available=True,
+            total_qty__gt=0,
+        )
+        .order_by("-total_qty", "-order_count", "-product_id")
+        .values_list("product_id", flat=True)[:limit]
+    )
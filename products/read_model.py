@@ -0,0 +1,315 @@
+"""
+Per-worker, immutable in-memory copy of the catalog.
+
+The whole Section/Category/Product catalog is a few thousand rows, so each
+gunicorn worker keeps one read model and serves list/detail/related requests
+from it. Workers poll the catalog read-model version at most every
+CATALOG_READ_MODEL_CHECK_SECONDS and atomically swap in a rebuilt copy when it
+moved. Stock is not part of the model; callers merge it from stock_overlay.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from rest_framework import serializers
+
+from .cache_utils import get_catalog_namespace_version
+from .image_variants import image_variant_urls
+from .json_payload import encode_fragment, encode_payload
+from .search_index import ProductSearchIndex
+from .models import Category, Product, Section
+
+READ_MODEL_NAMESPACE = "read_model"
+
+_datetime_field = serializers.DateTimeField()
+
+
+class SectionRecord:
+    __slots__ = ("id", "name")
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+    def as_payload(self):
+        return {"id": self.id, "name": self.name}
+
+
+class CategoryRecord:
+    __slots__ = ("id", "name", "section_id")
+
+    def __init__(self, id, name, section_id):
+        self.id = id
+        self.name = name
+        self.section_id = section_id
+
+    def as_payload(self):
+        return {"id": self.id, "name": self.name, "section": self.section_id}
+
+
+class ProductRecord:
+    __slots__ = (
+        "id",
+        "name",
+        "category_id",
+        "category_name",
+        "section_id",
+        "section_name",
+        "price",
+        "description",
+        "image_url",
+        "images",
+        "created_at",
+        "created_ts",
+        "related_ids",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+    @staticmethod
+    def _absolute_image(image_url, request):
+        if not image_url or request is None:
+            return None
+        return request.build_absolute_uri(image_url)
+
+    def as_card(self, request=None):
+        """Same shape as ProductCardSerializer, minus the stock fields."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "category_id": self.category_id,
+            "category_name": self.category_name,
+            "section_name": self.section_name,
+            "price": self.price,
+            "description": self.description,
+            "image": self._absolute_image(self.image_url, request),
+            "images": self.images,
+        }
+
+    def as_detail(self, request=None):
+        """Same shape as ProductSerializer, minus the stock fields."""
+        payload = self.as_card(request)
+        payload["created_at"] = self.created_at
+        payload["related_product_ids"] = list(self.related_ids)
+        return payload
+
+    def as_bundle_item(self):
+        """Static card fields for the catalog bundle; category and section come from the nesting."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "price": self.price,
+            "description": self.description,
+            "image": self.image_url or None,
+            "images": self.images,
+        }
+
+    def as_suggestion(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "category_name": self.category_name,
+            "section_name": self.section_name,
+        }
+
+    def as_related(self, request=None):
+        """Same shape as RelatedProductSerializer, minus is_available."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "price": self.price,
+            "image": self._absolute_image(self.image_url, request),
+            "category_name": self.category_name,
+            "section_name": self.section_name,
+        }
+
+
+def listing_sort_key(product):
+    return -product.created_ts, product.name, product.id
+
+
+class CatalogReadModel:
+    __slots__ = (
+        "version",
+        "sections",
+        "categories_by_section",
+        "products_by_id",
+        "products_by_category",
+        "products_by_section",
+        "_encoded",
+        "_search_index",
+    )
+
+    def __init__(self, version, sections, categories, products):
+        self.version = version
+        # Encoded bodies and fragments, filled lazily. Entries never go stale
+        # because the whole snapshot is replaced when the catalog changes.
+        self._encoded = {}
+        self._search_index = None
+        self.sections = tuple(sorted(sections, key=lambda s: s.name))
+
+        categories_by_section = {}
+        for category in sorted(categories, key=lambda c: c.name):
+            categories_by_section.setdefault(category.section_id, []).append(category)
+        self.categories_by_section = {k: tuple(v) for k, v in categories_by_section.items()}
+
+        # Listing order matches the repository queries: newest first, then
+        # name, with id as the final tie-break so keyset cursors are exact.
+        ordered = sorted(products, key=listing_sort_key)
+        self.products_by_id = {product.id: product for product in ordered}
+
+        by_category, by_section = {}, {}
+        for product in ordered:
+            by_category.setdefault(product.category_id, []).append(product)
+            by_section.setdefault(product.section_id, []).append(product)
+        self.products_by_category = {k: tuple(v) for k, v in by_category.items()}
+        self.products_by_section = {k: tuple(v) for k, v in by_section.items()}
+
+    @classmethod
+    def build(cls, version):
+        sections = [SectionRecord(*row) for row in Section.objects.values_list("id", "name")]
+        section_names = {section.id: section.name for section in sections}
+
+        categories = [
+            CategoryRecord(*row) for row in Category.objects.values_list("id", "name", "section_id")
+        ]
+        category_map = {category.id: category for category in categories}
+
+        related = {}
+        through_rows = Product.related_products.through.objects.values_list("from_product_id", "to_product_id")
+        for from_id, to_id in through_rows:
+            related.setdefault(from_id, []).append(to_id)
+
+        price_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+        products = []
+        for product in Product.objects.only(
+            "id", "name", "category_id", "price", "description", "image", "image_variants", "created_at"
+        ).order_by():
+            category = category_map.get(product.category_id)
+            if category is None:
+                continue
+            products.append(
+                ProductRecord(
+                    id=product.id,
+                    name=product.name,
+                    category_id=category.id,
+                    category_name=category.name,
+                    section_id=category.section_id,
+                    section_name=section_names.get(category.section_id, ""),
+                    price=price_field.to_representation(product.price),
+                    description=product.description,
+                    image_url=product.image.url if product.image else "",
+                    images=image_variant_urls(product.image.name, product.image_variants),
+                    created_at=_datetime_field.to_representation(product.created_at),
+                    created_ts=int(product.created_at.timestamp() * 1_000_000),
+                    related_ids=tuple(sorted(related.get(product.id, ()))),
+                )
+            )
+        return cls(version, sections, categories, products)
+
+    def categories_for_section(self, section_id):
+        return self.categories_by_section.get(section_id, ())
+
+    def products_for_category(self, category_id):
+        return self.products_by_category.get(category_id, ())
+
+    def products_for_section(self, section_id):
+        return self.products_by_section.get(section_id, ())
+
+    def product(self, product_id):
+        return self.products_by_id.get(product_id)
+
+    @property
+    def search_index(self):
+        # Built on first search rather than with the snapshot; not every
+        # worker serves searches between catalog changes.
+        if self._search_index is None:
+            self._search_index = ProductSearchIndex(self.products_by_id.values())
+        return self._search_index
+
+    def encoded(self, key, build):
+        """Return the encoded stock-free body for `key`, building it once per snapshot."""
+        payload = self._encoded.get(key)
+        if payload is None:
+            payload = encode_payload(build())
+            self._encoded[key] = payload
+        return payload
+
+    def bundle(self):
+        """The whole menu as one stock-free body: sections -> categories -> products."""
+
+        def build():
+            return {
+                "version": str(self.version),
+                "sections": [
+                    {
+                        "id": section.id,
+                        "name": section.name,
+                        "categories": [
+                            {
+                                "id": category.id,
+                                "name": category.name,
+                                "products": [
+                                    product.as_bundle_item() for product in self.products_for_category(category.id)
+                                ],
+                            }
+                            for category in self.categories_for_section(section.id)
+                        ],
+                    }
+                    for section in self.sections
+                ],
+            }
+
+        return self.encoded("bundle", build)
+
+    def listing_keys(self, list_key, products):
+        """Sort keys parallel to a listing tuple, for keyset pagination."""
+        key = ("listing_keys", list_key)
+        keys = self._encoded.get(key)
+        if keys is None:
+            keys = [listing_sort_key(product) for product in products]
+            self._encoded[key] = keys
+        return keys
+
+    def _fragment(self, kind, product, request):
+        # Image URLs are absolute, so fragments are kept per scheme and host.
+        key = (kind, request.build_absolute_uri("/"), product.id)
+        fragment = self._encoded.get(key)
+        if fragment is None:
+            fragment = encode_fragment(getattr(product, f"as_{kind}")(request))
+            self._encoded[key] = fragment
+        return fragment
+
+    def card_fragments(self, products, request):
+        return [(product.id, self._fragment("card", product, request)) for product in products]
+
+    def detail_fragment(self, product, request):
+        return product.id, self._fragment("detail", product, request)
+
+
+_current = None
+_checked_at = 0.0
+_build_lock = threading.Lock()
+
+
+def get_catalog_read_model():
+    """Return this worker's read model, rebuilding it if the catalog version moved."""
+    global _current, _checked_at
+
+    model = _current
+    check_seconds = getattr(settings, "CATALOG_READ_MODEL_CHECK_SECONDS", 2)
+    if model is not None and time.monotonic() - _checked_at < check_seconds:
+        return model
+
+    version = get_catalog_namespace_version(READ_MODEL_NAMESPACE)
+    if model is None or model.version != version:
+        with _build_lock:
+            model = _current
+            if model is None or model.version != version:
+                model = CatalogReadModel.build(version)
+                _current = model
+    _checked_at = time.monotonic()
+    return model
@@ -1,4 +1,4 @@
-from django.db.models import OuterRef, Q, Subquery
+from django.db.models import F, Q
 from django.contrib.postgres.search import SearchQuery, SearchRank
 from .models import Category, Product
 
@@ -21,66 +21,29 @@ class ProductRepository:
         section_key = (section or "").strip().lower()
         if section_key in {"snack", "snacks"}:
             category_filter = Q(section__name__in=["Snacks", "Snack"])
-            product_section_filter = Q(category__section__name__in=["Snacks", "Snack"])
         elif section_key in {"bakery", "backery"}:
             category_filter = Q(section__name__in=["Bakery", "Backery"])
-            product_section_filter = Q(category__section__name__in=["Bakery", "Backery"])
         else:
             category_filter = Q(section__name__icontains=section)
-            product_section_filter = Q(category__section__name__icontains=section)
-
-        product_image_subquery = (
-            Product.objects.filter(category_id=OuterRef("pk"))
-            .exclude(image="")
-            .order_by("-created_at", "name")
-            .values("image")[:1]
-        )
 
+        # card_image/product_count are maintained on Category by the product
+        # signals, so this is one scan of Category joined to its section.
         categories = (
-            Category.objects.select_related("section")
-            .annotate(card_image=Subquery(product_image_subquery))
-            .filter(category_filter)
+            Category.objects.filter(category_filter)
+            .values("id", "name", "card_image", "product_count", section_name=F("section__name"))
             .order_by("name")
         )
-        data = [
+        return [
             {
-                "id": category.id,
-                "name": category.name,
-                "section": category.section.name,
-                "image": str(category.card_image or ""),
+                "id": row["id"],
+                "name": row["name"],
+                "section": row["section_name"],
+                "image": row["card_image"],
+                "product_count": row["product_count"],
             }
-            for category in categories
+            for row in categories
         ]
 
-        if data:
-            return data
-
-        # Fallback: derive category cards from product table when category
-        # records are inconsistent or section mapping has spelling variants.
-        rows = (
-            Product.objects.select_related("category", "category__section")
-            .filter(product_section_filter)
-            .exclude(image="")
-            .values("category_id", "category__name", "category__section__name", "image")
-            .order_by("category__name", "-created_at", "name")
-        )
-        deduped = []
-        seen_category_ids = set()
-        for row in rows:
-            category_id = row["category_id"]
-            if category_id in seen_category_ids:
-                continue
-            seen_category_ids.add(category_id)
-            deduped.append(
-                {
-                    "id": category_id,
-                    "name": row["category__name"],
-                    "section": row["category__section__name"],
-                    "image": row["image"] or "",
-                }
-            )
-        return deduped
-
     @staticmethod
     def by_category(category_id):
         return (
@@ -93,6 +56,7 @@ class ProductRepository:
                 "stock_qty",
                 "is_available",
                 "image",
+                "image_variants",
                 "category__id",
                 "category__name",
                 "category__section__name",
@@ -113,6 +77,7 @@ class ProductRepository:
                 "stock_qty",
                 "is_available",
                 "image",
+                "image_variants",
                 "category__id",
                 "category__name",
                 "category__section__name",
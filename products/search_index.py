@@ -0,0 +1,131 @@
+"""
+In-process product search over the catalog read model.
+
+Tokens from product name, category, section and description go into an
+inverted index with per-field weights. A query token matches indexed tokens
+exactly, by prefix (autocomplete), or by trigram similarity (typos such as
+"chocolte" or "biscuts"). Every query token has to match for a product to
+be returned; a product's score is the sum of its best match per token.
+"""
+
+import heapq
+import re
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Field weights, highest first so a token keeps its best field.
+FIELD_WEIGHTS = (
+    ("name", 3.0),
+    ("category_name", 1.5),
+    ("section_name", 1.0),
+    ("description", 0.5),
+)
+PREFIX_FACTOR = 0.8
+FUZZY_FACTOR = 0.6
+FUZZY_MIN_SIMILARITY = 0.4
+FUZZY_MIN_LENGTH = 4
+MAX_PREFIX_LENGTH = 12
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def _trigrams(token):
+    padded = f"  {token} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class ProductSearchIndex:
+    __slots__ = ("products", "postings", "prefixes", "trigrams", "token_trigrams")
+
+    def __init__(self, products):
+        self.products = {product.id: product for product in products}
+        # token -> {product_id: weight}
+        self.postings = {}
+        for product in self.products.values():
+            for field, weight in FIELD_WEIGHTS:
+                for token in tokenize(getattr(product, field)):
+                    entry = self.postings.setdefault(token, {})
+                    if entry.get(product.id, 0) < weight:
+                        entry[product.id] = weight
+
+        # prefix -> tokens, and trigram -> tokens over the vocabulary.
+        self.prefixes = {}
+        self.trigrams = {}
+        self.token_trigrams = {}
+        for token in self.postings:
+            for length in range(1, min(len(token), MAX_PREFIX_LENGTH) + 1):
+                self.prefixes.setdefault(token[:length], set()).add(token)
+            grams = _trigrams(token)
+            self.token_trigrams[token] = grams
+            for gram in grams:
+                self.trigrams.setdefault(gram, set()).add(token)
+
+    def _matching_tokens(self, query_token):
+        """Yield (indexed_token, factor) for every token the query token matches."""
+        if query_token in self.postings:
+            yield query_token, 1.0
+
+        if len(query_token) <= MAX_PREFIX_LENGTH:
+            candidates = self.prefixes.get(query_token, ())
+        else:
+            candidates = [
+                token for token in self.prefixes.get(query_token[:MAX_PREFIX_LENGTH], ())
+                if token.startswith(query_token)
+            ]
+        for token in candidates:
+            if token != query_token:
+                yield token, PREFIX_FACTOR
+
+        if len(query_token) < FUZZY_MIN_LENGTH:
+            return
+        grams = _trigrams(query_token)
+        shared = {}
+        for gram in grams:
+            for token in self.trigrams.get(gram, ()):
+                shared[token] = shared.get(token, 0) + 1
+        for token, count in shared.items():
+            similarity = count / len(grams | self.token_trigrams[token])
+            if similarity >= FUZZY_MIN_SIMILARITY and not token.startswith(query_token):
+                yield token, FUZZY_FACTOR * similarity
+
+    def search(self, query, limit=None):
+        """Return matching product records, best first (ties by name)."""
+        return [product for _, product in self.search_scored(query, limit=limit)]
+
+    def search_scored(self, query, limit=None, after=None):
+        """
+        Return (score, product) pairs ordered by (-score, name, id). `after`
+        is the (-score, name, id) key of the last result already seen.
+        """
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            return []
+
+        scores = None
+        for query_token in query_tokens:
+            token_scores = {}
+            for token, factor in self._matching_tokens(query_token):
+                for product_id, weight in self.postings[token].items():
+                    score = weight * factor
+                    if score > token_scores.get(product_id, 0):
+                        token_scores[product_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {pid: score + token_scores[pid] for pid, score in scores.items() if pid in token_scores}
+            if not scores:
+                return []
+
+        def rank_key(item):
+            return -item[1], self.products[item[0]].name, item[0]
+
+        candidates = scores.items()
+        if after is not None:
+            candidates = [item for item in candidates if rank_key(item) > after]
+        if limit is not None and limit < len(candidates):
+            ranked = heapq.nsmallest(limit, candidates, key=rank_key)
+        else:
+            ranked = sorted(candidates, key=rank_key)
+        return [(score, self.products[product_id]) for product_id, score in ranked]
@@ -0,0 +1,80 @@
+"""
+Batched maintenance of `Product.search_vector`.
+
+Saves that touch name/description add the product id to a Redis set and
+schedule one debounced flush; the flush pops ids in batches and rewrites
+each batch with a single UPDATE. Without Redis (local DEBUG runs) each save
+falls back to its own `update_product_search_vector_task`.
+"""
+
+import logging
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.core.cache import cache
+
+from core.redis_client import get_redis_client, redis_key
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+SEARCH_VECTOR_PENDING_KEY = "products:search_vector:pending"
+SEARCH_VECTOR_FLUSH_SCHEDULED_KEY = "products:search_vector:flush_scheduled"
+SEARCH_VECTOR_BATCH_SIZE = 500
+
+
+def search_vector_expression():
+    return SearchVector("name", weight="A") + SearchVector("description", weight="B")
+
+
+def update_search_vectors(product_ids) -> int:
+    """Rewrite the search vector of every given product in one statement."""
+    product_ids = list(product_ids)
+    if not product_ids:
+        return 0
+    return Product.objects.filter(pk__in=product_ids).update(search_vector=search_vector_expression())
+
+
+def queue_search_vector_update(product_ids):
+    from .tasks import flush_search_vector_updates_task, update_product_search_vector_task
+
+    product_ids = [int(pk) for pk in product_ids if pk]
+    if not product_ids:
+        return
+
+    client = get_redis_client()
+    if client is None:
+        for product_id in product_ids:
+            update_product_search_vector_task.delay(product_id)
+        return
+
+    client.sadd(redis_key(SEARCH_VECTOR_PENDING_KEY), *product_ids)
+    delay = settings.SEARCH_VECTOR_FLUSH_DELAY_SECONDS
+    if cache.add(SEARCH_VECTOR_FLUSH_SCHEDULED_KEY, 1, delay + 60):
+        flush_search_vector_updates_task.apply_async(countdown=delay)
+
+
+def flush_search_vector_updates(batch_size=SEARCH_VECTOR_BATCH_SIZE) -> int:
+    """Drain the pending set, one UPDATE per batch. Returns the rows updated."""
+    client = get_redis_client()
+    if client is None:
+        return 0
+
+    # Clear the marker before draining so ids added mid-flush schedule a new run.
+    cache.delete(SEARCH_VECTOR_FLUSH_SCHEDULED_KEY)
+    key = redis_key(SEARCH_VECTOR_PENDING_KEY)
+    updated = 0
+    while True:
+        batch = client.spop(key, batch_size)
+        if not batch:
+            break
+        try:
+            updated += update_search_vectors(int(product_id) for product_id in batch)
+        except Exception:
+            # Put the batch back so the retry (or the next flush) picks it up.
+            client.sadd(key, *batch)
+            raise
+    if updated:
+        logger.info("Search vectors flushed rows=%s", updated)
+    return updated
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from .models import Section, Category, Product,ProductViewLog
+from .image_variants import image_variant_urls
+from .stock_overlay import UNAVAILABLE_MESSAGE
 
 class SectionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -14,6 +16,7 @@ class CategorySerializer(serializers.ModelSerializer):
         
 class ProductSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    images = serializers.SerializerMethodField()
     message = serializers.SerializerMethodField()
     category_id = serializers.IntegerField(source='category.id', read_only=True)
     category_name = serializers.CharField(source='category.name', read_only=True)
@@ -38,6 +41,7 @@ class ProductSerializer(serializers.ModelSerializer):
             'message',
             'description',
             'image',
+            'images',
             'created_at',
             'related_product_ids',
         ]
@@ -48,15 +52,19 @@ class ProductSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.image.url)
         return None
 
+    def get_images(self, obj):
+        return image_variant_urls(obj.image.name, obj.image_variants)
+
     def get_message(self, obj):
         if not obj.is_available:
-            return "Currently unavailable. Please call the owner to confirm."
+            return UNAVAILABLE_MESSAGE
         return None
 
 
 
 class ProductCardSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    images = serializers.SerializerMethodField()
     message = serializers.SerializerMethodField()
     category_id = serializers.IntegerField(source='category.id', read_only=True)
     category_name = serializers.CharField(source='category.name', read_only=True)
@@ -76,6 +84,7 @@ class ProductCardSerializer(serializers.ModelSerializer):
             'message',
             'description',
             'image',
+            'images',
         ]
 
     def get_image(self, obj):
@@ -84,9 +93,12 @@ class ProductCardSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.image.url)
         return None
 
+    def get_images(self, obj):
+        return image_variant_urls(obj.image.name, obj.image_variants)
+
     def get_message(self, obj):
         if not obj.is_available:
-            return "Currently unavailable. Please call the owner to confirm."
+            return UNAVAILABLE_MESSAGE
         return None
 
 
@@ -1,7 +1,7 @@
 from django.conf import settings
-from django.core.cache import cache
 
-from .cache_utils import catalog_cache_key
+from .cache_utils import cached_catalog_entry
+from .json_payload import encode_payload
 from .repositories import ProductRepository
 
 
@@ -19,21 +19,25 @@ class ProductService:
         return f"{media_url}{image_value}"
 
     @staticmethod
-    def category_cards(section):
-        section_key = (section or "").strip().lower()
-        cache_key = catalog_cache_key("category_cards_v2", section_key)
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return cached
-
+    def _build_category_cards(section):
         data = []
         for item in ProductRepository.category_cards(section):
             payload = dict(item)
             payload["image"] = ProductService._category_card_image_url(payload.get("image"))
             data.append(payload)
-        cache.set(cache_key, data, 120 if not data else 300)
         return data
 
+    @staticmethod
+    def category_cards_json(section):
+        """Encoded category cards body, ready for `json_response`."""
+        section_key = (section or "").strip().lower()
+        return cached_catalog_entry(
+            "category_cards_json",
+            section_key,
+            build=lambda: encode_payload(ProductService._build_category_cards(section)),
+            timeout=lambda payload: 120 if payload.body == b"[]" else 300,
+        )
+
     @staticmethod
     def products_by_category(category_id):
         return ProductRepository.by_category(category_id)
@@ -51,14 +55,14 @@ class ProductService:
         categories = ProductRepository.admin_categories_by_section(section_id)
         related = []
         if load_related:
-            cache_key = catalog_cache_key("admin_related", section_id)
-            cached = cache.get(cache_key)
-            if cached is not None:
-                related = cached
-            else:
-                related_qs = ProductRepository.admin_related_products_by_section(section_id)
-                related = [(p.id, p.name) for p in related_qs]
-                cache.set(cache_key, related, 300)
+            related = cached_catalog_entry(
+                "admin_related",
+                section_id,
+                build=lambda: [
+                    (p.id, p.name) for p in ProductRepository.admin_related_products_by_section(section_id)
+                ],
+                timeout=300,
+            )
         return {
             "categories": categories,
             "related": related,
@@ -2,9 +2,27 @@ from django.db import transaction
 from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from .cache_utils import invalidate_catalog_cache
-from .models import Advertisement, Category, Product, Section
-from .tasks import update_product_search_vector_task
+from .cache_utils import invalidate_catalog_change
+from .catalog_changes import record_catalog_changes
+from .category_cards import refresh_category_cards
+from .image_variants import variants_current
+from .models import Advertisement, CatalogChange, Category, Product, Section
+from .search_vectors import queue_search_vector_update
+from .stock_overlay import forget_stock_levels, set_stock_levels
+
+STOCK_FIELDS = frozenset({"stock_qty", "is_available", "updated_at"})
+CATEGORY_CARD_FIELDS = frozenset({"image", "category"})
+
+
+def _queue_image_variants(instance, update_fields):
+    if update_fields is not None and "image" not in update_fields:
+        return
+    if variants_current(instance):
+        return
+    from .tasks import generate_image_variants_task
+
+    label, pk = instance._meta.label, instance.pk
+    transaction.on_commit(lambda: generate_image_variants_task.delay(label, pk))
 
 
 @receiver(post_save, sender=Product)
@@ -12,25 +30,77 @@ def update_search_vector(sender, instance, update_fields=None, **kwargs):
     # Skip indexing for updates that don't touch searchable fields.
     if update_fields is not None and not ({"name", "description"} & set(update_fields)):
         return
-    # Defer indexing until DB commit completes and run async in Celery.
-    transaction.on_commit(lambda: update_product_search_vector_task.delay(instance.pk))
+    # Defer indexing until DB commit completes; saves are batched into one
+    # debounced Celery flush.
+    product_id = instance.pk
+    transaction.on_commit(lambda: queue_search_vector_update([product_id]))
+
+
+# Catalog endpoints are read-heavy and version-keyed; each receiver bumps only
+# the scopes its change touches (see CATALOG_CHANGE_DEPENDENCIES) instead of
+# dropping every cached section, category and search entry.
+@receiver(post_save, sender=Product)
+def invalidate_catalog_on_product_save(sender, instance, update_fields=None, **kwargs):
+    change = "product"
+    if update_fields is not None and set(update_fields) <= STOCK_FIELDS:
+        change = "availability"
+    # A moved product also leaves its old category's (and section's) listings.
+    category_ids = [instance.category_id, getattr(instance, "_loaded_category_id", None)]
+    invalidate_catalog_change(change, product_ids=[instance.pk], category_ids=category_ids)
+    record_catalog_changes([instance.pk])
+    levels = {instance.pk: instance.stock_qty}
+    transaction.on_commit(lambda: set_stock_levels(levels))
+
+
+@receiver(post_save, sender=Product)
+def refresh_category_card_on_product_save(sender, instance, created=False, update_fields=None, **kwargs):
+    if not created and update_fields is not None and not (CATEGORY_CARD_FIELDS & set(update_fields)):
+        return
+    # Same transaction as the save, so the cards never lag the catalog
+    # version bump above.
+    refresh_category_cards({instance.category_id, getattr(instance, "_loaded_category_id", None)})
+    instance._loaded_category_id = instance.category_id
 
 
 @receiver(post_save, sender=Product)
+@receiver(post_save, sender=Advertisement)
+def queue_image_variants_on_save(sender, instance, update_fields=None, **kwargs):
+    _queue_image_variants(instance, update_fields)
+
+
 @receiver(post_delete, sender=Product)
+def invalidate_catalog_on_product_delete(sender, instance, **kwargs):
+    invalidate_catalog_change("product", product_ids=[instance.pk], category_ids=[instance.category_id])
+    record_catalog_changes([instance.pk], op=CatalogChange.Operation.DELETE)
+    refresh_category_cards([instance.category_id])
+    product_id = instance.pk
+    transaction.on_commit(lambda: forget_stock_levels([product_id]))
+
+
 @receiver(post_save, sender=Category)
 @receiver(post_delete, sender=Category)
+def invalidate_catalog_on_category_changes(sender, instance, created=False, **kwargs):
+    invalidate_catalog_change("category", category_ids=[instance.pk], section_ids=[instance.section_id])
+    # Cards carry the category name; deleted products log their own deletes.
+    if kwargs["signal"] is post_save and not created:
+        record_catalog_changes(Product.objects.filter(category_id=instance.pk).values_list("id", flat=True))
+
+
 @receiver(post_save, sender=Section)
 @receiver(post_delete, sender=Section)
+def invalidate_catalog_on_section_changes(sender, instance, created=False, **kwargs):
+    invalidate_catalog_change("section", section_ids=[instance.pk])
+    if kwargs["signal"] is post_save and not created:
+        record_catalog_changes(Product.objects.filter(category__section_id=instance.pk).values_list("id", flat=True))
+
+
 @receiver(post_save, sender=Advertisement)
 @receiver(post_delete, sender=Advertisement)
-def invalidate_catalog_on_model_changes(sender, **kwargs):
-    # Catalog endpoints are read-heavy and version-keyed; bumping version
-    # invalidates all relevant cache entries without wildcard deletes.
-    invalidate_catalog_cache()
+def invalidate_catalog_on_ad_changes(sender, **kwargs):
+    invalidate_catalog_change("advertisement")
 
 
 @receiver(m2m_changed, sender=Product.related_products.through)
-def invalidate_catalog_on_related_m2m(sender, action, **kwargs):
+def invalidate_catalog_on_related_m2m(sender, instance, action, pk_set=None, **kwargs):
     if action in {"post_add", "post_remove", "post_clear"}:
-        invalidate_catalog_cache()
+        invalidate_catalog_change("related", product_ids=[instance.pk, *(pk_set or ())])
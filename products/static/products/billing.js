@@ -25,7 +25,9 @@ const placeOrderBtnEl = document.getElementById("placeOrderBtn");
 const statusMsgEl = document.getElementById("statusMsg");
 const historyBtnEl = document.getElementById("historyBtn");
 const historyPanelEl = document.getElementById("historyPanel");
-const qtyTimers = {};
+// Quantity edits are coalesced per product and sent as one batch.
+const pendingCartOps = new Map();
+let cartFlushTimer = null;
 let historyLoaded = false;
 
 function setProfileButtonState(label = "Save Profile (Optional)", ready = false) {
@@ -344,21 +346,49 @@ function getQtyFromRow(row) {
     return Math.min(value, 99);
 }
 
-async function updateCartItem(productId, quantity) {
-    const cartPhone = getOrCreateCartPhone();
-    await apiPost("/api/cart/item/update/", {
-        phone: cartPhone,
-        product_id: productId,
-        quantity
+async function flushCartOps() {
+    clearTimeout(cartFlushTimer);
+    if (!pendingCartOps.size) return;
+    const operations = Array.from(pendingCartOps, ([productId, op]) => ({ product_id: productId, ...op }));
+    pendingCartOps.clear();
+
+    const payload = await apiPost("/api/cart/batch/", {
+        phone: getOrCreateCartPhone(),
+        operations
     });
+    // Newer local edits win until their own batch comes back.
+    if (!pendingCartOps.size) {
+        state.cart = {
+            items: payload.items || [],
+            total_items: payload.total_items || 0,
+            total_amount: payload.total_amount || "0.00"
+        };
+        recalcCart();
+        renderCart();
+    }
+}
+
+function queueCartOp(productId, op, delay = 180) {
+    pendingCartOps.set(productId, op);
+    clearTimeout(cartFlushTimer);
+    cartFlushTimer = setTimeout(async () => {
+        try {
+            await flushCartOps();
+        } catch (err) {
+            statusMsgEl.textContent = err.message || "Unable to sync cart.";
+            await loadCart();
+        }
+    }, delay);
+}
+
+async function updateCartItem(productId, quantity) {
+    pendingCartOps.set(productId, { op: "set", quantity });
+    await flushCartOps();
 }
 
 async function removeCartItem(productId) {
-    const cartPhone = getOrCreateCartPhone();
-    await apiPost("/api/cart/item/remove/", {
-        phone: cartPhone,
-        product_id: productId
-    });
+    pendingCartOps.set(productId, { op: "remove" });
+    await flushCartOps();
 }
 
 async function onCartAction(event) {
@@ -378,15 +408,7 @@ async function onCartAction(event) {
         applyLocalQty(productId, safeNext);
         renderCart();
 
-        clearTimeout(qtyTimers[productId]);
-        qtyTimers[productId] = setTimeout(async () => {
-            try {
-                await updateCartItem(productId, safeNext);
-            } catch (err) {
-                statusMsgEl.textContent = err.message || "Unable to sync cart.";
-                await loadCart();
-            }
-        }, 180);
+        queueCartOp(productId, { op: "set", quantity: safeNext });
         return;
     }
 
@@ -411,6 +433,13 @@ async function onCartAction(event) {
 }
 
 async function proceedToCheckout() {
+    try {
+        await flushCartOps();
+    } catch (err) {
+        statusMsgEl.textContent = err.message || "Unable to sync cart.";
+        await loadCart();
+        return;
+    }
     if (!state.cart.items.length) {
         statusMsgEl.textContent = "Your cart is empty.";
         return;
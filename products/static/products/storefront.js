@@ -4,6 +4,8 @@ const state = {
     selectedSectionId: null,
     selectedCategoryId: null,
     products: [],
+    bundle: null,
+    stock: {},
     profile: {
         name: "",
         phone: "",
@@ -165,8 +167,55 @@ function renderProducts(title = "All Products") {
     productGridEl.innerHTML = state.products.map(productCardTemplate).join("");
 }
 
+const BUNDLE_STORAGE_KEY = "thathwamasi_catalog_bundle";
+
+function readStoredBundle() {
+    try {
+        return JSON.parse(localStorage.getItem(BUNDLE_STORAGE_KEY) || "null");
+    } catch (error) {
+        return null;
+    }
+}
+
+// The menu only changes with the catalog version, so it is downloaded once
+// per version and kept in localStorage; stock is fetched separately.
+async function loadBundle() {
+    const probe = await apiGet("/api/products/bundle/version/");
+    let bundle = readStoredBundle();
+    if (!bundle || bundle.version !== probe.version) {
+        bundle = await apiGet(probe.url);
+        try {
+            localStorage.setItem(BUNDLE_STORAGE_KEY, JSON.stringify(bundle));
+        } catch (error) {
+            // Storage full or disabled: keep the bundle for this page only.
+        }
+    }
+    state.bundle = bundle;
+    state.sections = bundle.sections;
+}
+
+async function loadStock() {
+    state.stock = await apiGet("/api/products/bundle/stock/");
+}
+
+function withStock(product, category, section) {
+    const stockQty = state.stock[product.id] || 0;
+    return {
+        ...product,
+        category_id: category.id,
+        category_name: category.name,
+        section_name: section.name,
+        stock_qty: stockQty,
+        is_available: stockQty > 0
+    };
+}
+
+function bundleProducts(section, categories) {
+    return categories.flatMap((category) => category.products.map((product) => withStock(product, category, section)));
+}
+
 async function loadSections() {
-    state.sections = await apiGet("/api/products/sections/");
+    await Promise.all([loadBundle(), loadStock()]);
     if (!state.sections.length) {
         renderProducts("Products");
         return;
@@ -175,19 +224,22 @@ async function loadSections() {
 }
 
 async function loadCategories(sectionId) {
-    state.categories = await apiGet(`/api/products/sections/${sectionId}/categories/`);
+    const section = state.sections.find((x) => x.id === sectionId);
+    state.categories = section ? section.categories : [];
     renderCategories();
 }
 
 async function loadProductsBySection(sectionId) {
-    state.products = await apiGet(`/api/products/sections/${sectionId}/products/`);
     const section = state.sections.find((x) => x.id === sectionId);
+    // Grouped by category; newest first within each one.
+    state.products = section ? bundleProducts(section, section.categories) : [];
     renderProducts(section ? `${section.name} Picks` : "Products");
 }
 
 async function loadProductsByCategory(categoryId) {
-    state.products = await apiGet(`/api/products/categories/${categoryId}/products/`);
+    const section = state.sections.find((x) => x.id === state.selectedSectionId);
     const category = state.categories.find((x) => x.id === categoryId);
+    state.products = section && category ? bundleProducts(section, [category]) : [];
     renderProducts(category ? `${category.name} Products` : "Products");
 }
 
@@ -289,6 +341,7 @@ async function buyNow(productId) {
 
         clearBuyNowKey(productId);
         notify(`Order placed. ID ${result.order_id}`);
+        await loadStock();
         if (state.selectedCategoryId) {
             await loadProductsByCategory(state.selectedCategoryId);
         } else {
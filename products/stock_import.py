@@ -0,0 +1,175 @@
+"""
+Bulk stock and price updates for the admin stock tracker.
+
+Every row is validated first; rows with errors are reported back and
+skipped, the rest are written with one `bulk_update` inside a single
+transaction. `bulk_update` bypasses the post_save receivers, so the catalog
+invalidation, change log and stock overlay refresh are done here, once per
+batch.
+"""
+
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache_utils import invalidate_catalog_change
+from .catalog_changes import record_catalog_changes
+from .models import Product
+from .stock_overlay import set_stock_levels
+
+MAX_BULK_ROWS = 2000
+PRICE_QUANT = Decimal("0.01")
+MAX_PRICE = Decimal("99999999.99")
+
+
+class StockImportError(ValueError):
+    """The upload as a whole could not be read (as opposed to one bad row)."""
+
+
+def parse_stock_csv(uploaded_file):
+    """
+    Read a CSV with a `product_id` (or `id`) column and `stock_qty` and/or
+    `price` columns. Returns the rows as dicts; values are validated later.
+    """
+    try:
+        text = uploaded_file.read().decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise StockImportError("CSV file must be UTF-8 encoded") from exc
+
+    reader = csv.DictReader(io.StringIO(text))
+    columns = {(name or "").strip().lower() for name in reader.fieldnames or ()}
+    if not ({"product_id", "id"} & columns):
+        raise StockImportError("CSV needs a product_id column")
+    if not ({"stock_qty", "price"} & columns):
+        raise StockImportError("CSV needs a stock_qty and/or price column")
+
+    rows = []
+    for raw in reader:
+        # DictReader collects values beyond the header under the None key.
+        extra = raw.pop(None, None)
+        row = {(key or "").strip().lower(): (value or "").strip() for key, value in raw.items()}
+        if not any(row.values()) and not extra:
+            continue
+        parsed = {
+            "product_id": row.get("product_id") or row.get("id"),
+            "stock_qty": row.get("stock_qty") or None,
+            "price": row.get("price") or None,
+        }
+        if extra:
+            parsed["extra_fields"] = len(extra)
+        rows.append(parsed)
+    return rows
+
+
+def _clean_row(row):
+    """Return (product_id, stock_qty, price) or raise ValueError with the reason."""
+    if row.get("extra_fields"):
+        raise ValueError("row has more fields than the header")
+    try:
+        product_id = int(row.get("product_id"))
+    except (TypeError, ValueError):
+        raise ValueError("product_id must be a valid integer")
+
+    stock_qty = row.get("stock_qty")
+    if stock_qty not in (None, ""):
+        try:
+            stock_qty = int(stock_qty)
+        except (TypeError, ValueError):
+            raise ValueError("stock_qty must be a valid integer")
+        if stock_qty < 0:
+            raise ValueError("stock_qty cannot be negative")
+    else:
+        stock_qty = None
+
+    price = row.get("price")
+    if price not in (None, ""):
+        try:
+            price = Decimal(str(price))
+        except InvalidOperation:
+            raise ValueError("price must be a valid amount")
+        if not price.is_finite() or price < 0 or price > MAX_PRICE:
+            raise ValueError("price must be between 0 and 99999999.99")
+        price = price.quantize(PRICE_QUANT)
+    else:
+        price = None
+
+    if stock_qty is None and price is None:
+        raise ValueError("stock_qty or price is required")
+    return product_id, stock_qty, price
+
+
+def apply_stock_updates(rows):
+    """
+    Validate and apply update rows. Returns a dict with the number of
+    products updated, the updated items and the per-row errors (1-based).
+    """
+    rows = list(rows)
+    if len(rows) > MAX_BULK_ROWS:
+        raise StockImportError(f"At most {MAX_BULK_ROWS} rows can be imported at once")
+
+    errors = []
+    cleaned = {}
+    for index, row in enumerate(rows, start=1):
+        row = row if isinstance(row, dict) else {}
+        try:
+            product_id, stock_qty, price = _clean_row(row)
+        except ValueError as exc:
+            errors.append({"row": index, "product_id": row.get("product_id"), "detail": str(exc)})
+            continue
+        if product_id in cleaned:
+            errors.append({"row": index, "product_id": product_id, "detail": "duplicate product_id in this batch"})
+            continue
+        cleaned[product_id] = (index, stock_qty, price)
+
+    updated = []
+    price_changed = []
+    availability_changed = False
+    with transaction.atomic():
+        products = Product.objects.select_for_update().only("id", "stock_qty", "is_available", "price").in_bulk(
+            list(cleaned)
+        )
+        for product_id, (index, stock_qty, price) in cleaned.items():
+            product = products.get(product_id)
+            if product is None:
+                errors.append({"row": index, "product_id": product_id, "detail": "product not found"})
+                continue
+            if stock_qty is not None:
+                is_available = stock_qty > 0
+                availability_changed = availability_changed or is_available != product.is_available
+                product.stock_qty = stock_qty
+                product.is_available = is_available
+            if price is not None and price != product.price:
+                product.price = price
+                price_changed.append(product_id)
+            updated.append(product)
+
+        if updated:
+            now = timezone.now()
+            for product in updated:
+                product.updated_at = now
+            Product.objects.bulk_update(updated, ["stock_qty", "is_available", "price", "updated_at"], batch_size=500)
+            if price_changed:
+                invalidate_catalog_change("product", product_ids=price_changed)
+            elif availability_changed:
+                invalidate_catalog_change("availability")
+            levels = {product.id: product.stock_qty for product in updated}
+            record_catalog_changes(levels)
+            transaction.on_commit(lambda: set_stock_levels(levels))
+
+    errors.sort(key=lambda error: error["row"])
+    return {
+        "updated": len(updated),
+        "items": [
+            {
+                "id": product.id,
+                "stock_qty": product.stock_qty,
+                "is_available": product.is_available,
+                "price": str(product.price),
+            }
+            for product in updated
+        ],
+        "errors": errors,
+    }
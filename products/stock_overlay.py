@@ -0,0 +1,188 @@
+"""
+Live stock overlay for cached catalog payloads.
+
+Cached product payloads only hold static card data. `stock_qty`,
+`is_available` and `message` are merged in at response time from one compact
+Redis hash (product id -> stock_qty), so a sale is a single hash update
+instead of a catalog cache flush. Without django-redis (local DEBUG runs) the
+overlay falls back to one cache key per product.
+
+Missing fields are filled from the database on read. Every sale bumps a
+per-product generation, and a fill is dropped when the generation moved
+while it was reading, so a database read taken just before a sale can never
+land in the overlay after the sale's delta was skipped.
+"""
+
+from django.core.cache import cache
+
+from core.redis_client import get_redis_client, redis_key
+
+STOCK_OVERLAY_KEY = "products:stock:v1"
+STOCK_GENERATION_KEY = "products:stock:gen:v1"
+STOCK_OVERLAY_TTL = 60 * 60
+STOCK_FIELDS = ("stock_qty", "is_available", "message")
+UNAVAILABLE_MESSAGE = "Currently unavailable. Please call the owner to confirm."
+
+# KEYS[1] overlay, KEYS[2] generations; ARGV: (product id, delta) pairs.
+# Apply deltas only to fields that are already loaded; missing fields are
+# filled from the database on the next read.
+_ADJUST_SCRIPT = """
+for i = 1, #ARGV, 2 do
+  redis.call('HINCRBY', KEYS[2], ARGV[i], 1)
+  if redis.call('HEXISTS', KEYS[1], ARGV[i]) == 1 then
+    local value = redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+    if value < 0 then
+      redis.call('HSET', KEYS[1], ARGV[i], 0)
+    end
+  end
+end
+return 1
+"""
+
+# KEYS[1] overlay, KEYS[2] generations; ARGV: ttl, then (product id, stock,
+# generation seen before the database read) triples.
+_FILL_SCRIPT = """
+for i = 2, #ARGV, 3 do
+  if (redis.call('HGET', KEYS[2], ARGV[i]) or '0') == ARGV[i + 2] then
+    redis.call('HSETNX', KEYS[1], ARGV[i], ARGV[i + 1])
+  end
+end
+if redis.call('TTL', KEYS[1]) == -1 then
+  redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+
+def _fallback_key(product_id):
+    return f"{STOCK_OVERLAY_KEY}:{product_id}"
+
+
+def _fallback_generation_key(product_id):
+    return f"{STOCK_GENERATION_KEY}:{product_id}"
+
+
+def _read_generations(product_ids, client):
+    if client is None:
+        found = cache.get_many([_fallback_generation_key(pid) for pid in product_ids])
+        return {pid: int(found.get(_fallback_generation_key(pid), 0)) for pid in product_ids}
+    raw = client.hmget(redis_key(STOCK_GENERATION_KEY), product_ids)
+    return {pid: int(value or 0) for pid, value in zip(product_ids, raw)}
+
+
+def _load_from_db(product_ids):
+    from .models import Product
+
+    return dict(Product.objects.filter(id__in=product_ids).values_list("id", "stock_qty"))
+
+
+def _fill_missing(levels, generations, client):
+    # Fills never overwrite a value written concurrently by a stock edit, and
+    # are dropped for products sold since `generations` was read.
+    if client is None:
+        current = _read_generations(list(levels), None)
+        for product_id, stock_qty in levels.items():
+            if current[product_id] == generations[product_id]:
+                cache.add(_fallback_key(product_id), int(stock_qty), STOCK_OVERLAY_TTL)
+        return
+
+    args = [STOCK_OVERLAY_TTL]
+    for product_id, stock_qty in levels.items():
+        args.extend([product_id, int(stock_qty), generations[product_id]])
+    client.eval(_FILL_SCRIPT, 2, redis_key(STOCK_OVERLAY_KEY), redis_key(STOCK_GENERATION_KEY), *args)
+
+
+def get_stock_levels(product_ids):
+    product_ids = list(dict.fromkeys(int(product_id) for product_id in product_ids))
+    if not product_ids:
+        return {}
+
+    client = get_redis_client()
+    if client is not None:
+        raw = client.hmget(redis_key(STOCK_OVERLAY_KEY), product_ids)
+        levels = {pid: int(value) for pid, value in zip(product_ids, raw) if value is not None}
+    else:
+        found = cache.get_many([_fallback_key(pid) for pid in product_ids])
+        levels = {pid: int(found[_fallback_key(pid)]) for pid in product_ids if _fallback_key(pid) in found}
+
+    missing = [pid for pid in product_ids if pid not in levels]
+    if missing:
+        # Read before the database, so a sale committing in between is seen.
+        generations = _read_generations(missing, client)
+        loaded = _load_from_db(missing)
+        if loaded:
+            _fill_missing(loaded, generations, client)
+        levels.update(loaded)
+    return levels
+
+
+def set_stock_levels(levels):
+    """Overwrite absolute stock values, e.g. after an admin stock edit."""
+    levels = {int(pid): max(int(qty), 0) for pid, qty in (levels or {}).items()}
+    if not levels:
+        return
+
+    client = get_redis_client()
+    if client is None:
+        cache.set_many({_fallback_key(pid): qty for pid, qty in levels.items()}, STOCK_OVERLAY_TTL)
+        return
+    client.hset(redis_key(STOCK_OVERLAY_KEY), mapping=levels)
+
+
+def adjust_stock_levels(deltas):
+    """Atomically apply stock deltas, e.g. {product_id: -qty} for a sale."""
+    deltas = {int(pid): int(delta) for pid, delta in (deltas or {}).items() if int(delta)}
+    if not deltas:
+        return
+
+    client = get_redis_client()
+    if client is None:
+        for product_id, delta in deltas.items():
+            generation_key = _fallback_generation_key(product_id)
+            cache.add(generation_key, 0, None)
+            cache.incr(generation_key)
+            key = _fallback_key(product_id)
+            try:
+                if cache.incr(key, delta) < 0:
+                    cache.set(key, 0, STOCK_OVERLAY_TTL)
+            except ValueError:
+                continue
+        return
+
+    args = []
+    for product_id, delta in deltas.items():
+        args.extend([product_id, delta])
+    client.eval(_ADJUST_SCRIPT, 2, redis_key(STOCK_OVERLAY_KEY), redis_key(STOCK_GENERATION_KEY), *args)
+
+
+def forget_stock_levels(product_ids):
+    product_ids = [int(pid) for pid in product_ids]
+    if not product_ids:
+        return
+
+    client = get_redis_client()
+    if client is None:
+        cache.delete_many([_fallback_key(pid) for pid in product_ids])
+        return
+    client.hdel(redis_key(STOCK_OVERLAY_KEY), *product_ids)
+
+
+def strip_stock_fields(payload):
+    """Drop volatile fields before a product payload goes into the catalog cache."""
+    return [{k: v for k, v in item.items() if k not in STOCK_FIELDS} for item in payload]
+
+
+def stock_fields(stock_qty):
+    stock_qty = max(int(stock_qty or 0), 0)
+    is_available = stock_qty > 0
+    return {
+        "stock_qty": stock_qty,
+        "is_available": is_available,
+        "message": None if is_available else UNAVAILABLE_MESSAGE,
+    }
+
+
+def apply_stock_overlay(payload, id_field="id"):
+    """Return copies of cached product payloads with live stock fields merged in."""
+    levels = get_stock_levels(item[id_field] for item in payload)
+    return [{**item, **stock_fields(levels.get(item[id_field], 0))} for item in payload]
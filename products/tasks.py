@@ -1,18 +1,34 @@
+import logging
+
 from celery import shared_task
-from django.contrib.postgres.search import SearchVector
+from django.apps import apps
+from django.core.cache import cache
 from django.core.files import File
 from django.core.files.storage import default_storage
 
+from .affinity import rebuild_product_affinity, record_order_affinity
+from .popularity import recompute_product_popularity, record_order_popularity
+from .cache_warmer import CATALOG_WARM_PENDING_KEY, warm_catalog_cache
+from .catalog_changes import compact_catalog_changes
+from .image_variants import build_image_variants, refresh_image_variants
 from .models import Product
+from .search_vectors import flush_search_vector_updates, update_search_vectors
+from .view_counters import flush_unavailable_views
+
+logger = logging.getLogger(__name__)
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=5)
 def update_product_search_vector_task(self, product_id):
-    Product.objects.filter(pk=product_id).update(
-        search_vector=(
-            SearchVector("name", weight="A") + SearchVector("description", weight="B")
-        )
-    )
+    update_search_vectors([product_id])
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=5)
+def flush_search_vector_updates_task(self):
+    try:
+        return flush_search_vector_updates()
+    except Exception as exc:
+        raise self.retry(exc=exc)
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=5)
@@ -28,6 +44,57 @@ def process_product_image_upload_task(self, product_id, temp_path):
 
     with default_storage.open(temp_path, "rb") as src:
         filename = temp_path.split("/")[-1]
-        product.image.save(filename, File(src), save=True)
+        product.image.save(filename, File(src), save=False)
+
+    try:
+        product.image_variants = build_image_variants(product.image.name)
+    except Exception:
+        # Saved without sizes; the post_save receiver queues another attempt.
+        logger.exception("Image variants failed product_id=%s", product_id)
+    product.save()
 
     default_storage.delete(temp_path)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=5)
+def warm_catalog_cache_task(self):
+    # Clear the debounce marker first so changes landing mid-run queue another pass.
+    cache.delete(CATALOG_WARM_PENDING_KEY)
+    return warm_catalog_cache()
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=5)
+def record_placed_order_task(self, order_id):
+    """Feed a newly placed order into the popularity and co-purchase tables."""
+    record_order_popularity(order_id)
+    record_order_affinity(order_id)
+
+
+@shared_task(bind=True, max_retries=1, default_retry_delay=60)
+def rebuild_product_affinity_task(self):
+    return rebuild_product_affinity()
+
+
+@shared_task(bind=True, max_retries=1, default_retry_delay=60)
+def recompute_product_popularity_task(self):
+    return recompute_product_popularity()
+
+
+@shared_task(bind=True, max_retries=1, default_retry_delay=60)
+def compact_catalog_changes_task(self):
+    return compact_catalog_changes()
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def flush_unavailable_views_task(self):
+    try:
+        return flush_unavailable_views()
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def generate_image_variants_task(self, model_label, pk):
+    instance = apps.get_model(model_label).objects.filter(pk=pk).first()
+    if instance is not None:
+        refresh_image_variants(instance)
@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from orders.models import Order, OrderItem
+from products.affinity import affinity_related_ids, rebuild_product_affinity, record_order_affinity
+from products.models import Category, Product, ProductAffinity, Section
+from users.models import Customer
+
+
+@override_settings(CATALOG_READ_MODEL_CHECK_SECONDS=0)
+class ProductAffinityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = Customer.objects.create(
+            name="Walkin Customer",
+            phone="9876543210",
+            whatsapp_no="9876543210",
+            address="Main Road, Pune",
+        )
+        bakery = Section.objects.create(name=Section.SectionType.BAKERY)
+        snacks = Section.objects.create(name=Section.SectionType.SNACKS)
+        bread = Category.objects.create(name="Bread", section=bakery)
+        chips = Category.objects.create(name="Chips", section=snacks)
+        self.bread = self.product("Milk Bread", bread)
+        self.bun = self.product("Sweet Bun", bread)
+        self.butter = self.product("Butter Khari", bread)
+        self.chips = self.product("Masala Chips", chips)
+
+    def product(self, name, category):
+        return Product.objects.create(name=name, category=category, price=Decimal("30.00"), stock_qty=10)
+
+    def order(self, *products):
+        order = Order.objects.create(customer=self.customer, total_price=Decimal("100.00"))
+        for product in products:
+            OrderItem.objects.create(order=order, product=product, quantity=1, price=product.price)
+        return order
+
+    def test_rebuild_keeps_top_k_neighbours_by_co_purchase_count(self):
+        self.order(self.bread, self.chips)
+        self.order(self.bread, self.chips, self.butter)
+        self.order(self.bread, self.bun)
+
+        rebuild_product_affinity(top_k=2)
+
+        self.assertEqual(affinity_related_ids(self.bread.id), [self.chips.id, self.bun.id])
+        self.assertEqual(
+            ProductAffinity.objects.get(product=self.chips, related=self.bread).score, 2
+        )
+
+    def test_new_orders_increment_pairs_incrementally(self):
+        record_order_affinity(self.order(self.bread, self.bun).id)
+        record_order_affinity(self.order(self.bread, self.bun, self.chips).id)
+
+        self.assertEqual(ProductAffinity.objects.get(product=self.bread, related=self.bun).score, 2)
+        self.assertEqual(ProductAffinity.objects.get(product=self.chips, related=self.bun).score, 1)
+
+    @override_settings(USE_CATALOG_READ_MODEL=True)
+    def test_related_endpoint_prefers_co_purchases_over_same_category(self):
+        self.order(self.bread, self.chips)
+        rebuild_product_affinity()
+
+        items = self.client.get(f"/api/products/{self.bread.id}/related/").json()
+        self.assertEqual([item["id"] for item in items], [self.chips.id])
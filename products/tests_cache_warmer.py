@@ -0,0 +1,52 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from products.cache_utils import catalog_cache_key
+from products.models import Category, Product, Section
+
+
+class CatalogCacheWarmerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.section = Section.objects.create(name=Section.SectionType.BAKERY)
+        self.category = Category.objects.create(name="Bread", section=self.section)
+        self.product = Product.objects.create(
+            name="Milk Bread",
+            category=self.category,
+            price=Decimal("50.00"),
+            stock_qty=3,
+            image=SimpleUploadedFile("bread.jpg", b"image-bytes", content_type="image/jpeg"),
+        )
+
+    def test_catalog_changes_queue_a_single_debounced_warm_up(self):
+        with mock.patch("products.tasks.warm_catalog_cache_task.apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.product.price = Decimal("55.00")
+                self.product.save(update_fields=["price"])
+                self.category.name = "Breads"
+                self.category.save()
+        apply_async.assert_called_once()
+
+    def test_stock_only_changes_do_not_queue_a_warm_up(self):
+        from products.cache_utils import invalidate_catalog_change
+
+        with mock.patch("products.tasks.warm_catalog_cache_task.apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                invalidate_catalog_change("stock", product_ids=[self.product.id])
+        apply_async.assert_not_called()
+
+    @override_settings(USE_CATALOG_READ_MODEL=False, ALLOWED_HOSTS=["shop.example.com"])
+    def test_command_fills_product_lists_with_absolute_image_urls(self):
+        call_command("warm_catalog_cache", "--base-url", "https://shop.example.com", stdout=mock.MagicMock())
+
+        cached = cache.get(
+            catalog_cache_key("category_products", self.category.id, scopes=[("category", self.category.id)])
+        )
+        self.assertEqual(cached[0]["name"], "Milk Bread")
+        self.assertTrue(cached[0]["image"].startswith("https://shop.example.com/"))
+        self.assertIsNotNone(cache.get(catalog_cache_key("category_cards_json", "bakery")))
@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from products.models import Category, Product, Section
+from products.stock_overlay import adjust_stock_levels
+
+
+@override_settings(USE_CATALOG_READ_MODEL=True, CATALOG_READ_MODEL_CHECK_SECONDS=0)
+class CatalogBundleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.section = Section.objects.create(name=Section.SectionType.BAKERY)
+        self.bread = Category.objects.create(name="Bread", section=self.section)
+        self.cakes = Category.objects.create(name="Cakes", section=self.section)
+        self.product = Product.objects.create(
+            name="Milk Bread", category=self.bread, price=Decimal("50.00"), stock_qty=3
+        )
+
+    def probe(self):
+        return self.client.get("/api/products/bundle/version/").json()
+
+    def test_versioned_bundle_is_immutable_and_stock_free(self):
+        probe = self.probe()
+        self.assertEqual(probe["url"], f"/api/products/bundle/?v={probe['version']}")
+
+        self.client.get(probe["url"])
+        with self.assertNumQueries(0):
+            response = self.client.get(probe["url"])
+
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertNotIn("Cookie", response.get("Vary", ""))
+        bundle = response.json()
+        self.assertEqual(bundle["version"], probe["version"])
+        section = bundle["sections"][0]
+        self.assertEqual([category["name"] for category in section["categories"]], ["Bread", "Cakes"])
+        self.assertEqual(
+            section["categories"][0]["products"],
+            [{"id": self.product.id, "name": "Milk Bread", "price": "50.00", "description": None, "image": None, "images": {}}],
+        )
+
+    def test_unversioned_or_old_urls_redirect_to_the_current_bundle(self):
+        version = self.probe()["version"]
+
+        for url in ("/api/products/bundle/", "/api/products/bundle/?v=1"):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(response["Location"], f"/api/products/bundle/?v={version}")
+            self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_version_moves_with_the_catalog_but_not_with_stock(self):
+        version = self.probe()["version"]
+
+        Product.objects.filter(pk=self.product.pk).update(stock_qty=1)
+        adjust_stock_levels({self.product.pk: -2})
+        self.assertEqual(self.probe()["version"], version)
+        self.assertEqual(self.client.get("/api/products/bundle/stock/").json(), {str(self.product.id): 1})
+
+        self.product.price = Decimal("55.00")
+        self.product.save(update_fields=["price"])
+        probe = self.probe()
+        self.assertNotEqual(probe["version"], version)
+        bundle = self.client.get(probe["url"]).json()
+        self.assertEqual(bundle["sections"][0]["categories"][0]["products"][0]["price"], "55.00")
+
+    @override_settings(USE_CATALOG_READ_MODEL=False)
+    def test_bundle_without_the_read_model_is_cached_by_version(self):
+        probe = self.probe()
+        self.client.get(probe["url"])
+        with self.assertNumQueries(0):
+            bundle = self.client.get(probe["url"]).json()
+        self.assertEqual(bundle["version"], probe["version"])
+        self.assertEqual(bundle["sections"][0]["categories"][0]["products"][0]["id"], self.product.id)
@@ -0,0 +1,128 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from products.cache_utils import (
+    cached_catalog_entry,
+    catalog_cache_key,
+    catalog_scopes_current,
+    get_catalog_cache_metrics,
+    get_catalog_scope_versions,
+    invalidate_catalog_change,
+)
+from products.models import Category, Product, Section
+
+
+class ScopedCatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.section = Section.objects.create(name=Section.SectionType.BAKERY)
+        self.bread = Category.objects.create(name="Bread", section=self.section)
+        self.cake = Category.objects.create(name="Cake", section=self.section)
+        self.product = Product.objects.create(
+            name="Milk Bread",
+            category=self.bread,
+            price=Decimal("50.00"),
+            stock_qty=30,
+            image=SimpleUploadedFile("bread.jpg", b"image-bytes", content_type="image/jpeg"),
+        )
+
+    def test_product_change_only_touches_its_own_category(self):
+        bread_key = catalog_cache_key("category_products", self.bread.id, scopes=[("category", self.bread.id)])
+        cake_key = catalog_cache_key("category_products", self.cake.id, scopes=[("category", self.cake.id)])
+        sections_key = catalog_cache_key("sections")
+
+        invalidate_catalog_change("product", product_ids=[self.product.id])
+
+        self.assertNotEqual(
+            bread_key,
+            catalog_cache_key("category_products", self.bread.id, scopes=[("category", self.bread.id)]),
+        )
+        self.assertEqual(
+            cake_key,
+            catalog_cache_key("category_products", self.cake.id, scopes=[("category", self.cake.id)]),
+        )
+        self.assertEqual(sections_key, catalog_cache_key("sections"))
+
+    def test_moved_product_leaves_its_old_category_and_section(self):
+        snacks = Section.objects.create(name=Section.SectionType.SNACKS)
+        puffs = Category.objects.create(name="Puffs", section=snacks)
+        product = Product.objects.get(pk=self.product.pk)
+        before = {
+            "old_category": get_catalog_scope_versions("category", [self.bread.id]),
+            "old_section": get_catalog_scope_versions("section", [self.section.id]),
+            "other_category": get_catalog_scope_versions("category", [self.cake.id]),
+        }
+
+        product.category = puffs
+        product.save()
+
+        self.assertNotEqual(before["old_category"], get_catalog_scope_versions("category", [self.bread.id]))
+        self.assertNotEqual(before["old_section"], get_catalog_scope_versions("section", [self.section.id]))
+        self.assertEqual(before["other_category"], get_catalog_scope_versions("category", [self.cake.id]))
+
+    def test_versions_move_again_when_the_change_commits(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_catalog_change("product", product_ids=[self.product.id])
+            # What a worker reading before the commit would build its entry under.
+            before_commit = catalog_cache_key("category_products", self.bread.id, scopes=[("category", self.bread.id)])
+
+        self.assertNotEqual(
+            before_commit,
+            catalog_cache_key("category_products", self.bread.id, scopes=[("category", self.bread.id)]),
+        )
+
+    def test_stock_change_keeps_cached_catalog_entries(self):
+        bread_key = catalog_cache_key("category_products", self.bread.id, scopes=[("category", self.bread.id)])
+        invalidate_catalog_change("stock", product_ids=[self.product.id])
+        self.assertEqual(
+            bread_key,
+            catalog_cache_key("category_products", self.bread.id, scopes=[("category", self.bread.id)]),
+        )
+
+    def test_recorded_product_versions_only_expire_for_changed_products(self):
+        other = Product.objects.create(
+            name="Plum Cake",
+            category=self.cake,
+            price=Decimal("120.00"),
+            stock_qty=5,
+            image=SimpleUploadedFile("cake.jpg", b"image-bytes", content_type="image/jpeg"),
+        )
+        bread_versions = get_catalog_scope_versions("product", [self.product.id])
+
+        other.price = Decimal("110.00")
+        other.save(update_fields=["price"])
+        self.assertTrue(catalog_scopes_current("product", bread_versions))
+
+        self.product.price = Decimal("55.00")
+        self.product.save(update_fields=["price"])
+        self.assertFalse(catalog_scopes_current("product", bread_versions))
+
+
+class SingleFlightCatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_rebuild_runs_once_and_is_reused(self):
+        calls = []
+
+        def build():
+            calls.append(1)
+            return ["fresh"]
+
+        self.assertEqual(cached_catalog_entry("sections", build=build, timeout=60), ["fresh"])
+        self.assertEqual(cached_catalog_entry("sections", build=build, timeout=60), ["fresh"])
+        self.assertEqual(len(calls), 1)
+
+    def test_previous_payload_is_served_while_another_worker_rebuilds(self):
+        cached_catalog_entry("sections", build=lambda: ["old"], timeout=60)
+        invalidate_catalog_change("section", section_ids=[1])
+
+        # Simulate another worker holding the rebuild lock for the new version.
+        cache.add(f"{catalog_cache_key('sections')}:lock", 1, 10)
+        payload = cached_catalog_entry("sections", build=lambda: ["new"], timeout=60)
+
+        self.assertEqual(payload, ["old"])
+        self.assertEqual(get_catalog_cache_metrics()["stale_serves"], 1)
@@ -0,0 +1,130 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from cart.cache_store import set_cached_cart
+from orders.models import Bill, ServiceablePincode
+from products.catalog_changes import compact_catalog_changes
+from products.models import CatalogChange, Category, Product, Section
+from products.stock_import import apply_stock_updates
+
+
+class CatalogChangeFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Postgres-only full-text indexing also runs on commit; not under test here.
+        patcher = mock.patch("products.signals.queue_search_vector_update")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.section = Section.objects.create(name=Section.SectionType.BAKERY)
+        self.bread = Category.objects.create(name="Bread", section=self.section)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milk = self.create_product("Milk Bread")
+            self.brown = self.create_product("Brown Bread")
+
+    def create_product(self, name):
+        return Product.objects.create(name=name, category=self.bread, price=Decimal("50.00"), stock_qty=3)
+
+    def changes(self, after=0):
+        # Everything logged so far is past the settle window.
+        CatalogChange.objects.update(created_at=timezone.now() - timedelta(minutes=1))
+        return self.client.get(f"/api/products/changes/?after={after}").json()
+
+    def test_full_sync_then_only_later_changes(self):
+        first = self.changes()
+        self.assertEqual([item["name"] for item in first["upserts"]], ["Milk Bread", "Brown Bread"])
+        self.assertEqual((first["deletes"], first["has_more"]), ([], False))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milk.price = Decimal("55.00")
+            self.milk.save(update_fields=["price"])
+            self.milk.stock_qty = 0
+            self.milk.save(update_fields=["stock_qty", "is_available", "updated_at"])
+            brown_id = self.brown.id
+            self.brown.delete()
+
+        delta = self.changes(first["seq"])
+        self.assertEqual(len(delta["upserts"]), 1)
+        self.assertEqual((delta["upserts"][0]["price"], delta["upserts"][0]["stock_qty"]), ("55.00", 0))
+        self.assertEqual(delta["deletes"], [brown_id])
+        self.assertEqual(self.changes(delta["seq"])["upserts"], [])
+
+    def test_category_rename_and_bulk_stock_import_are_logged(self):
+        seq = self.changes()["seq"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bread.name = "Breads"
+            self.bread.save()
+        delta = self.changes(seq)
+        self.assertEqual({item["category_name"] for item in delta["upserts"]}, {"Breads"})
+        self.assertEqual(len(delta["upserts"]), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_stock_updates([{"product_id": self.brown.id, "stock_qty": 9}])
+        delta = self.changes(delta["seq"])
+        self.assertEqual([(item["id"], item["stock_qty"]) for item in delta["upserts"]], [(self.brown.id, 9)])
+
+    @mock.patch("cart.services.record_placed_order_task")
+    @mock.patch("cart.services.send_order_notifications")
+    def test_checkout_and_bill_cancel_log_the_stock_change(self, *_):
+        ServiceablePincode.objects.create(code="400001", area_name="Test Area", is_active=True)
+        seq = self.changes()["seq"]
+        set_cached_cart("9123456789", {str(self.milk.id): 3})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/cart/place/",
+                {
+                    "phone": "9123456789",
+                    "customer_name": "Feed User",
+                    "address": "Test Street 400001",
+                    "pincode": "400001",
+                    "idempotency_key": str(uuid4()),
+                },
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 200)
+
+        delta = self.changes(seq)
+        self.assertEqual(
+            [(item["id"], item["stock_qty"], item["is_available"]) for item in delta["upserts"]], [(self.milk.id, 0, False)]
+        )
+
+        bill = Bill.objects.get(order_id=response.data["order_id"], recipient_type="ADMIN")
+        self.client.force_login(get_user_model().objects.create_user(username="admin", password="x", is_staff=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/api/orders/admin/dashboard/bills/{bill.id}/cancel/")
+        delta = self.changes(delta["seq"])
+        self.assertEqual([(item["id"], item["stock_qty"]) for item in delta["upserts"]], [(self.milk.id, 3)])
+
+    def test_unsettled_rows_wait_for_the_next_poll(self):
+        seq = self.changes()["seq"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milk.save()
+
+        response = self.client.get(f"/api/products/changes/?after={seq}").json()
+        self.assertEqual((response["seq"], response["upserts"]), (seq, []))
+
+    def test_compaction_keeps_the_latest_row_per_product(self):
+        seq = self.changes()["seq"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milk.save()
+            self.milk.save()
+            brown_id = self.brown.id
+            self.brown.delete()
+
+        self.assertEqual(compact_catalog_changes(), 3)
+        self.assertEqual(
+            sorted(CatalogChange.objects.values_list("product_id", "op")),
+            sorted([(self.milk.id, "upsert"), (brown_id, "delete")]),
+        )
+        delta = self.changes(seq)
+        self.assertEqual(([item["id"] for item in delta["upserts"]], delta["deletes"]), ([self.milk.id], [brown_id]))
+
+    def test_invalid_cursor_is_rejected(self):
+        self.assertEqual(self.client.get("/api/products/changes/?after=abc").status_code, 400)
+        self.assertEqual(self.client.get("/api/products/changes/?after=-1").status_code, 400)
@@ -0,0 +1,70 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from products.models import Category, Product, Section
+from products.repositories import ProductRepository
+
+
+class CategoryCardColumnTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.section = Section.objects.create(name=Section.SectionType.BAKERY)
+        self.bread = Category.objects.create(name="Bread", section=self.section)
+        self.cakes = Category.objects.create(name="Cakes", section=self.section)
+
+    def create_product(self, name, category, image=""):
+        return Product.objects.create(name=name, category=category, price=Decimal("30.00"), stock_qty=5, image=image)
+
+    def test_saves_keep_the_newest_image_and_count(self):
+        older = self.create_product("Milk Bread", self.bread, "products/milk.jpg")
+        Product.objects.filter(pk=older.pk).update(created_at=timezone.now() - timedelta(days=1))
+        self.create_product("Brown Bread", self.bread, "products/brown.jpg")
+        self.create_product("Plain Bun", self.bread)
+
+        self.bread.refresh_from_db()
+        self.assertEqual((self.bread.card_image, self.bread.product_count), ("products/brown.jpg", 3))
+
+    def test_moving_and_deleting_products_update_both_categories(self):
+        product = self.create_product("Plum Cake", self.bread, "products/plum.jpg")
+        product = Product.objects.get(pk=product.pk)
+        product.category = self.cakes
+        product.save()
+
+        self.bread.refresh_from_db()
+        self.cakes.refresh_from_db()
+        self.assertEqual((self.bread.card_image, self.bread.product_count), ("", 0))
+        self.assertEqual((self.cakes.card_image, self.cakes.product_count), ("products/plum.jpg", 1))
+
+        product.delete()
+        self.cakes.refresh_from_db()
+        self.assertEqual((self.cakes.card_image, self.cakes.product_count), ("", 0))
+
+    def test_cards_are_read_from_category_columns_in_one_query(self):
+        self.create_product("Milk Bread", self.bread, "products/milk.jpg")
+
+        with self.assertNumQueries(1):
+            cards = ProductRepository.category_cards("bakery")
+        self.assertEqual(
+            cards,
+            [
+                {"id": self.bread.id, "name": "Bread", "section": "Bakery", "image": "products/milk.jpg", "product_count": 1},
+                {"id": self.cakes.id, "name": "Cakes", "section": "Bakery", "image": "", "product_count": 0},
+            ],
+        )
+
+    def test_backfill_command_repairs_drifted_columns(self):
+        self.create_product("Milk Bread", self.bread, "products/milk.jpg")
+        Category.objects.update(card_image="", product_count=0)
+
+        out = StringIO()
+        call_command("backfill_category_cards", stdout=out)
+
+        self.bread.refresh_from_db()
+        self.assertEqual((self.bread.card_image, self.bread.product_count), ("products/milk.jpg", 1))
+        self.assertIn("Refreshed 2 category cards", out.getvalue())
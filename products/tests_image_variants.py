@@ -0,0 +1,102 @@
+import io
+import shutil
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from PIL import Image
+
+from products.image_variants import IMAGE_VARIANT_WIDTHS, build_image_variants
+from products.models import Advertisement, Category, Product, Section
+from products.serializers import ProductCardSerializer
+from products.tasks import generate_image_variants_task, process_product_image_upload_task
+from products.views import StorefrontHomeView
+
+
+def png_bytes(width=1200, height=800, mode="RGBA"):
+    buffer = io.BytesIO()
+    Image.new(mode, (width, height), (200, 120, 40, 255) if mode == "RGBA" else (200, 120, 40)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.media = override_settings(MEDIA_ROOT=self.media_root)
+        self.media.enable()
+        section = Section.objects.create(name=Section.SectionType.BAKERY)
+        self.category = Category.objects.create(name="Cakes", section=section)
+
+    def tearDown(self):
+        self.media.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_sizes_are_scaled_down_and_content_hashed(self):
+        name = default_storage.save("products/cake.png", ContentFile(png_bytes()))
+
+        variants = build_image_variants(name)
+
+        self.assertEqual(variants["source"], name)
+        self.assertEqual(
+            {variant: entry["width"] for variant, entry in variants["sizes"].items()},
+            IMAGE_VARIANT_WIDTHS,
+        )
+        card = variants["sizes"]["card"]
+        self.assertRegex(card["webp"], r"^products/variants/cake-[0-9a-f]{12}-360w\.webp$")
+        with default_storage.open(card["jpeg"]) as stored, Image.open(stored) as image:
+            self.assertEqual((image.format, image.size), ("JPEG", (360, 240)))
+        # Same bytes, same names: re-running is a no-op.
+        self.assertEqual(build_image_variants(name), variants)
+
+    def test_upload_task_stores_sizes_exposed_by_the_card_serializer(self):
+        product = Product.objects.create(name="Plum Cake", category=self.category, price=Decimal("250.00"), stock_qty=3)
+        temp_path = default_storage.save("tmp/product_uploads/plum.png", ContentFile(png_bytes(200, 100)))
+
+        process_product_image_upload_task(product.id, temp_path)
+
+        product.refresh_from_db()
+        request = RequestFactory().get("/")
+        images = ProductCardSerializer(product, context={"request": request}).data["images"]
+        self.assertEqual(set(images), set(IMAGE_VARIANT_WIDTHS))
+        self.assertEqual(images["detail"]["width"], 200)
+        self.assertTrue(images["cart"]["webp"].startswith("/media/products/variants/"))
+
+    def test_ad_saves_queue_sizes_for_the_home_carousel(self):
+        with mock.patch.object(generate_image_variants_task, "delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                ad = Advertisement.objects.create(
+                    title="Diwali Hampers",
+                    image=ContentFile(png_bytes(), name="hamper.png"),
+                    display_order=1,
+                )
+        delay.assert_called_once_with("products.Advertisement", ad.pk)
+
+        generate_image_variants_task(*delay.call_args.args)
+        ad.refresh_from_db()
+        self.assertEqual(ad.image_variants["source"], ad.image.name)
+        ads = StorefrontHomeView._active_ads_by_slot()
+        self.assertEqual(ads[0]["images"]["detail"]["width"], 960)
+
+    def test_backfill_command_fills_missing_sizes(self):
+        product = Product.objects.create(
+            name="Fruit Cake",
+            category=self.category,
+            price=Decimal("300.00"),
+            stock_qty=3,
+            image=ContentFile(png_bytes(), name="fruit.png"),
+        )
+        Product.objects.filter(pk=product.pk).update(image_variants={})
+
+        out = StringIO()
+        call_command("backfill_image_variants", "--workers", "1", stdout=out)
+
+        product.refresh_from_db()
+        self.assertEqual(product.image_variants["source"], product.image.name)
+        self.assertIn("Generated sizes for 1/1 images", out.getvalue())
@@ -0,0 +1,77 @@
+import gzip
+import json
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+
+from products.json_payload import encode_payload, json_response
+from products.models import Category, Product, Section
+
+
+class JsonPayloadTests(TestCase):
+    def test_large_bodies_are_served_pre_gzipped_when_accepted(self):
+        payload = encode_payload([{"id": index, "name": "Milk Bread"} for index in range(100)])
+        self.assertIsNotNone(payload.gzipped)
+
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        response = json_response(request, payload)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), payload.body)
+
+        plain = json_response(RequestFactory().get("/"), payload)
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertEqual(plain.content, payload.body)
+
+    def test_small_bodies_skip_gzip(self):
+        self.assertIsNone(encode_payload([{"id": 1}]).gzipped)
+
+
+@override_settings(USE_CATALOG_READ_MODEL=True, CATALOG_READ_MODEL_CHECK_SECONDS=0)
+class EncodedCatalogResponseTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        section = Section.objects.create(name=Section.SectionType.BAKERY)
+        self.category = Category.objects.create(name="Bread", section=section)
+        self.product = Product.objects.create(
+            name="Milk Bread",
+            category=self.category,
+            price=Decimal("50.00"),
+            stock_qty=0,
+            image=SimpleUploadedFile("bread.jpg", b"image-bytes", content_type="image/jpeg"),
+        )
+
+    def test_product_list_body_has_live_stock_fields(self):
+        response = self.client.get(f"/api/products/categories/{self.category.id}/products/")
+        self.assertEqual(response["Content-Type"], "application/json")
+        item = json.loads(response.content)[0]
+        self.assertEqual(item["name"], "Milk Bread")
+        self.assertEqual(item["stock_qty"], 0)
+        self.assertFalse(item["is_available"])
+        self.assertIsNotNone(item["message"])
+
+    def test_product_detail_body_is_a_single_object(self):
+        payload = json.loads(self.client.get(f"/api/products/{self.product.id}/").content)
+        self.assertEqual(payload["id"], self.product.id)
+        self.assertEqual(payload["related_product_ids"], [])
+        self.assertFalse(payload["is_available"])
+
+    def test_matching_if_none_match_returns_304_without_body(self):
+        url = f"/api/products/categories/{self.category.id}/products/"
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+        Product.objects.filter(pk=self.product.pk).update(stock_qty=5, is_available=True)
+        cache.clear()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_gzip_and_weakened_validators_match_the_same_body(self):
+        payload = encode_payload([{"id": index, "name": "Milk Bread"} for index in range(100)])
+        for etag in (f'"{payload.etag}-gzip"', f'W/"{payload.etag}"'):
+            request = RequestFactory().get("/", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(json_response(request, payload).status_code, 304)
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from products.models import Category, Product, Section
+from products.pagination import encode_cursor
+
+
+@override_settings(CATALOG_READ_MODEL_CHECK_SECONDS=0)
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        section = Section.objects.create(name=Section.SectionType.BAKERY)
+        self.category = Category.objects.create(name="Cakes", section=section)
+        now = timezone.now()
+        for index, name in enumerate(["Plum Cake", "Fruit Cake", "Honey Cake", "Black Forest Cake", "Tea Cake"]):
+            product = Product.objects.create(
+                name=name, category=self.category, price=Decimal("100.00"), stock_qty=index
+            )
+            # Two products share a timestamp so the name/id tie-break is exercised.
+            Product.objects.filter(pk=product.pk).update(created_at=now - timedelta(minutes=min(index, 3)))
+
+    def walk(self, url, **params):
+        ids, cursor, pages = [], None, 0
+        while True:
+            query = dict(params, page_size=2)
+            if cursor:
+                query["cursor"] = cursor
+            payload = self.client.get(url, query).json()
+            ids.extend(item["id"] for item in payload["results"])
+            pages += 1
+            cursor = payload["next_cursor"]
+            if cursor is None:
+                self.assertIsNone(payload["next"])
+                return ids, pages
+            self.assertIn("cursor=", payload["next"])
+
+    def assert_pages_match_full_list(self, url):
+        full = [item["id"] for item in self.client.get(url).json()]
+        self.assertEqual(len(full), 5)
+        ids, pages = self.walk(url)
+        self.assertEqual(ids, full)
+        self.assertEqual(pages, 3)
+
+    @override_settings(USE_CATALOG_READ_MODEL=True)
+    def test_read_model_listing_pages_cover_the_list_once(self):
+        self.assert_pages_match_full_list(f"/api/products/categories/{self.category.id}/products/")
+
+    @override_settings(USE_CATALOG_READ_MODEL=False)
+    def test_cached_listing_pages_cover_the_list_once(self):
+        self.assert_pages_match_full_list(f"/api/products/categories/{self.category.id}/products/")
+
+    @override_settings(USE_CATALOG_READ_MODEL=True)
+    def test_search_pages_follow_rank_order(self):
+        full = [item["id"] for item in self.client.get("/api/products/search/", {"q": "cake"}).json()]
+        ids, _ = self.walk("/api/products/search/", q="cake")
+        self.assertEqual(ids, full)
+
+    @override_settings(USE_CATALOG_READ_MODEL=True)
+    def test_page_size_is_capped(self):
+        response = self.client.get(f"/api/products/categories/{self.category.id}/products/", {"page_size": 1000})
+        self.assertEqual(len(response.json()["results"]), 5)
+
+    def test_malformed_cursors_are_rejected(self):
+        url = f"/api/products/categories/{self.category.id}/products/"
+        tokens = [
+            "not-a-cursor",
+            encode_cursor(("abc", "Tea Cake", 1)),
+            encode_cursor((10 ** 30, "Tea Cake", 1)),
+            encode_cursor((0, "Tea Cake", -1)),
+            encode_cursor((0, ["Tea Cake"], 1)),
+        ]
+        for read_model in (True, False):
+            for token in tokens:
+                with self.subTest(read_model=read_model, token=token), override_settings(
+                    USE_CATALOG_READ_MODEL=read_model
+                ):
+                    response = self.client.get(url, {"cursor": token})
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(response.json()["detail"], "invalid cursor")
+                    response = self.client.get("/api/products/search/", {"q": "cake", "cursor": token})
+                    self.assertEqual(response.status_code, 400)
@@ -0,0 +1,57 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from products.models import Category, Product, ProductPopularity, Section
+from products.popularity import recompute_product_popularity, record_order_popularity
+from products.views import StorefrontHomeView
+from users.models import Customer
+
+
+class ProductPopularityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = Customer.objects.create(
+            name="Walkin Customer",
+            phone="9876543210",
+            whatsapp_no="9876543210",
+            address="Main Road, Pune",
+        )
+        bakery = Section.objects.create(name=Section.SectionType.BAKERY)
+        bread = Category.objects.create(name="Bread", section=bakery)
+        self.bread = Product.objects.create(name="Milk Bread", category=bread, price=Decimal("30.00"), stock_qty=10)
+        self.bun = Product.objects.create(name="Sweet Bun", category=bread, price=Decimal("20.00"), stock_qty=10)
+
+    def order(self, quantities, days_ago=0):
+        order = Order.objects.create(customer=self.customer, total_price=Decimal("100.00"))
+        if days_ago:
+            Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        for product, qty in quantities:
+            OrderItem.objects.create(order=order, product=product, quantity=qty, price=product.price)
+        return order
+
+    def test_orders_increment_counters(self):
+        record_order_popularity(self.order([(self.bread, 2), (self.bun, 1)]).id)
+        record_order_popularity(self.order([(self.bread, 3)]).id)
+
+        popularity = ProductPopularity.objects.get(product=self.bread)
+        self.assertEqual((popularity.total_qty, popularity.order_count), (5, 2))
+
+    def test_recompute_ages_out_orders_beyond_the_window(self):
+        self.order([(self.bun, 9)], days_ago=45)
+        self.order([(self.bread, 1)])
+
+        recompute_product_popularity(days=30)
+
+        self.assertFalse(ProductPopularity.objects.filter(product=self.bun).exists())
+        self.assertEqual(ProductPopularity.objects.get(product=self.bread).total_qty, 1)
+
+    def test_home_strip_reads_popularity_before_newest_products(self):
+        record_order_popularity(self.order([(self.bread, 4)]).id)
+
+        choices = StorefrontHomeView._build_top_customer_choices_bakery()
+        self.assertEqual([item["id"] for item in choices], [self.bread.id, self.bun.id])
@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from products.models import Category, Product, Section
+from products.read_model import get_catalog_read_model
+from products.stock_overlay import adjust_stock_levels
+
+
+@override_settings(USE_CATALOG_READ_MODEL=True, CATALOG_READ_MODEL_CHECK_SECONDS=0)
+class CatalogReadModelTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.section = Section.objects.create(name=Section.SectionType.BAKERY)
+        self.bread = Category.objects.create(name="Bread", section=self.section)
+        self.product = Product.objects.create(
+            name="Milk Bread",
+            category=self.bread,
+            price=Decimal("50.00"),
+            stock_qty=3,
+            image=SimpleUploadedFile("bread.jpg", b"image-bytes", content_type="image/jpeg"),
+        )
+        self.other = Product.objects.create(
+            name="Brown Bread",
+            category=self.bread,
+            price=Decimal("60.00"),
+            stock_qty=4,
+            image=SimpleUploadedFile("brown.jpg", b"image-bytes", content_type="image/jpeg"),
+        )
+
+    def test_listing_is_served_without_queries_once_built(self):
+        url = f"/api/products/categories/{self.bread.id}/products/"
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            items = self.client.get(url).json()
+
+        self.assertEqual([item["name"] for item in items], ["Brown Bread", "Milk Bread"])
+        self.assertEqual(items[1]["price"], "50.00")
+        self.assertEqual(items[1]["stock_qty"], 3)
+        self.assertTrue(items[1]["image"].startswith("http://testserver/"))
+
+    def test_model_is_rebuilt_when_catalog_changes(self):
+        before = get_catalog_read_model()
+        self.assertIs(before, get_catalog_read_model())
+
+        self.product.price = Decimal("55.00")
+        self.product.save(update_fields=["price"])
+
+        after = get_catalog_read_model()
+        self.assertIsNot(before, after)
+        self.assertEqual(after.product(self.product.id).price, "55.00")
+
+    def test_stock_change_keeps_model_and_reads_overlay(self):
+        before = get_catalog_read_model()
+        Product.objects.filter(pk=self.product.pk).update(stock_qty=0, is_available=False)
+        adjust_stock_levels({self.product.pk: -3})
+
+        self.assertIs(before, get_catalog_read_model())
+        payload = self.client.get(f"/api/products/{self.product.id}/").json()
+        self.assertEqual(payload["stock_qty"], 0)
+        self.assertFalse(payload["is_available"])
+
+    def test_related_falls_back_to_available_products_in_category(self):
+        response = self.client.get(f"/api/products/{self.product.id}/related/")
+        self.assertEqual([item["id"] for item in response.json()], [self.other.id])
+        self.assertTrue(response.json()[0]["is_available"])
@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from products.models import Category, Product, Section
+from products.read_model import get_catalog_read_model
+
+
+@override_settings(USE_CATALOG_READ_MODEL=True, CATALOG_READ_MODEL_CHECK_SECONDS=0)
+class ProductSearchIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        bakery = Section.objects.create(name=Section.SectionType.BAKERY)
+        snacks = Section.objects.create(name=Section.SectionType.SNACKS)
+        cakes = Category.objects.create(name="Cakes", section=bakery)
+        chips = Category.objects.create(name="Chips", section=snacks)
+        self.truffle = Product.objects.create(
+            name="Chocolate Truffle Cake", category=cakes, price=Decimal("450.00"), stock_qty=2
+        )
+        self.plum = Product.objects.create(
+            name="Plum Cake", category=cakes, price=Decimal("300.00"), stock_qty=0,
+            description="Rich cake with chocolate chips",
+        )
+        self.masala = Product.objects.create(
+            name="Masala Chips", category=chips, price=Decimal("40.00"), stock_qty=9
+        )
+
+    def search(self, query, **kwargs):
+        return [product.id for product in get_catalog_read_model().search_index.search(query, **kwargs)]
+
+    def test_name_matches_rank_above_description_matches(self):
+        self.assertEqual(self.search("chocolate"), [self.truffle.id, self.plum.id])
+
+    def test_prefix_and_typo_queries_match(self):
+        self.assertEqual(self.search("choc"), [self.truffle.id, self.plum.id])
+        self.assertEqual(self.search("chocolte truffel"), [self.truffle.id])
+        self.assertEqual(self.search("masla"), [self.masala.id])
+
+    def test_every_query_token_must_match(self):
+        self.assertEqual(self.search("plum chips"), [self.plum.id])
+        self.assertEqual(self.search("snacks cake"), [])
+
+    def test_search_endpoint_serves_index_results_with_live_stock(self):
+        items = self.client.get("/api/products/search/", {"q": "cake"}).json()
+        self.assertEqual([item["id"] for item in items], [self.truffle.id, self.plum.id])
+        self.assertTrue(items[0]["is_available"])
+        self.assertFalse(items[1]["is_available"])
+
+    def test_suggest_endpoint_returns_limited_name_suggestions(self):
+        response = self.client.get("/api/products/search/suggest/", {"q": "ca", "limit": 1})
+        self.assertEqual(
+            response.json(),
+            [
+                {
+                    "id": self.truffle.id,
+                    "name": "Chocolate Truffle Cake",
+                    "category_name": "Cakes",
+                    "section_name": "Bakery",
+                }
+            ],
+        )
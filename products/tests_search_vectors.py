@@ -0,0 +1,47 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from products.models import Category, Product, Section
+
+
+class SearchVectorPipelineTests(TestCase):
+    def setUp(self):
+        section = Section.objects.create(name=Section.SectionType.BAKERY)
+        self.category = Category.objects.create(name="Bread", section=section)
+
+    def create_product(self, name):
+        return Product.objects.create(name=name, category=self.category, price=Decimal("40.00"), stock_qty=1)
+
+    def test_name_edits_are_queued_after_commit(self):
+        product = self.create_product("Milk Bread")
+        with mock.patch("products.signals.queue_search_vector_update") as queue:
+            with self.captureOnCommitCallbacks(execute=True):
+                product.name = "Sweet Milk Bread"
+                product.save(update_fields=["name"])
+                product.price = Decimal("45.00")
+                product.save(update_fields=["price"])
+        queue.assert_called_once_with([product.pk])
+
+    def test_reindex_dry_run_reports_chunks_without_writing(self):
+        for index in range(5):
+            self.create_product(f"Bun {index}")
+        out = StringIO()
+        with mock.patch("products.management.commands.reindex_search.update_search_vectors") as update:
+            call_command("reindex_search", "--chunk-size", "2", "--dry-run", stdout=out)
+        update.assert_not_called()
+        self.assertIn("would reindex 5 products in 3 chunks", out.getvalue())
+
+    def test_reindex_updates_in_primary_key_chunks(self):
+        products = [self.create_product(f"Bun {index}") for index in range(5)]
+        out = StringIO()
+        with mock.patch("products.management.commands.reindex_search.update_search_vectors") as update:
+            call_command("reindex_search", "--chunk-size", "2", stdout=out)
+        self.assertEqual(
+            [call.args[0] for call in update.call_args_list],
+            [[p.pk for p in products[0:2]], [p.pk for p in products[2:4]], [products[4].pk]],
+        )
+        self.assertIn("Reindexed 5/5 products", out.getvalue())
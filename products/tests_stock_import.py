@@ -0,0 +1,133 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from products.models import Category, Product, Section
+
+
+class AdminStockBulkUpdateTests(TestCase):
+    url = "/api/products/admin/stock/bulk/"
+
+    def setUp(self):
+        cache.clear()
+        section = Section.objects.create(name=Section.SectionType.BAKERY)
+        category = Category.objects.create(name="Bread", section=section)
+        self.bread = Product.objects.create(name="Milk Bread", category=category, price=Decimal("30.00"), stock_qty=0)
+        self.bun = Product.objects.create(name="Sweet Bun", category=category, price=Decimal("20.00"), stock_qty=5)
+        staff = get_user_model().objects.create_user(username="stock", password="x", is_staff=True)
+        self.client.force_login(staff)
+
+    def test_valid_rows_are_applied_and_bad_rows_reported(self):
+        items = [
+            {"product_id": self.bread.id, "stock_qty": 12},
+            {"product_id": self.bun.id, "stock_qty": -1},
+            {"product_id": 999999, "stock_qty": 3},
+            {"product_id": self.bread.id, "stock_qty": 1},
+        ]
+        with mock.patch("products.stock_import.invalidate_catalog_change") as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(self.url, {"items": items}, content_type="application/json")
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["updated"], 1)
+        self.assertEqual(
+            [(error["row"], error["detail"]) for error in data["errors"]],
+            [
+                (2, "stock_qty cannot be negative"),
+                (3, "product not found"),
+                (4, "duplicate product_id in this batch"),
+            ],
+        )
+        self.bread.refresh_from_db()
+        self.assertEqual((self.bread.stock_qty, self.bread.is_available), (12, True))
+        invalidate.assert_called_once_with("availability")
+
+    def test_price_changes_invalidate_once_for_the_whole_batch(self):
+        items = [
+            {"product_id": self.bread.id, "price": "32.50"},
+            {"product_id": self.bun.id, "price": "21", "stock_qty": 8},
+        ]
+        with mock.patch("products.stock_import.invalidate_catalog_change") as invalidate:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, {"items": items}, content_type="application/json")
+
+        self.assertEqual(response.json()["updated"], 2)
+        updates = [query["sql"] for query in queries.captured_queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        invalidate.assert_called_once_with("product", product_ids=[self.bread.id, self.bun.id])
+        self.bun.refresh_from_db()
+        self.assertEqual((self.bun.price, self.bun.stock_qty), (Decimal("21.00"), 8))
+
+    def test_csv_upload(self):
+        csv_file = SimpleUploadedFile(
+            "restock.csv",
+            f"product_id,stock_qty,price\n{self.bread.id},7,\n{self.bun.id},abc,\n".encode(),
+            content_type="text/csv",
+        )
+        response = self.client.post(self.url, {"file": csv_file})
+
+        data = response.json()
+        self.assertEqual(data["updated"], 1)
+        self.assertEqual(data["errors"], [{"row": 2, "product_id": str(self.bun.id), "detail": "stock_qty must be a valid integer"}])
+        self.assertEqual(Product.objects.get(pk=self.bread.pk).stock_qty, 7)
+
+    def test_csv_row_with_more_fields_than_the_header_is_reported(self):
+        csv_file = SimpleUploadedFile(
+            "restock.csv",
+            f"product_id,stock_qty\n{self.bread.id},5,\n{self.bun.id},9\n".encode(),
+            content_type="text/csv",
+        )
+        response = self.client.post(self.url, {"file": csv_file})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["updated"], 1)
+        self.assertEqual(
+            data["errors"], [{"row": 1, "product_id": str(self.bread.id), "detail": "row has more fields than the header"}]
+        )
+        self.assertEqual(Product.objects.get(pk=self.bread.pk).stock_qty, 0)
+
+    def test_csv_without_product_column_is_rejected(self):
+        csv_file = SimpleUploadedFile("restock.csv", b"name,stock_qty\nBread,4\n", content_type="text/csv")
+        response = self.client.post(self.url, {"file": csv_file})
+        self.assertEqual(response.status_code, 400)
+
+
+class AdminStockDeltaSyncTests(TestCase):
+    url = "/api/products/admin/stock/"
+
+    def setUp(self):
+        section = Section.objects.create(name=Section.SectionType.BAKERY)
+        category = Category.objects.create(name="Bread", section=section)
+        self.bread = Product.objects.create(name="Milk Bread", category=category, price=Decimal("30.00"), stock_qty=4)
+        self.bun = Product.objects.create(name="Sweet Bun", category=category, price=Decimal("20.00"), stock_qty=5)
+        Product.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        staff = get_user_model().objects.create_user(username="stock", password="x", is_staff=True)
+        self.client.force_login(staff)
+
+    def test_since_returns_only_products_changed_after_the_cursor(self):
+        full = self.client.get(self.url).json()
+        self.assertTrue(full["full"])
+        self.assertEqual(len(full["items"]), 2)
+
+        self.client.post(
+            "/api/products/admin/stock/update/",
+            {"product_id": self.bun.id, "stock_qty": 0},
+            content_type="application/json",
+        )
+        delta = self.client.get(self.url, {"since": full["cursor"]}).json()
+
+        self.assertFalse(delta["full"])
+        self.assertEqual([(item["id"], item["stock_qty"]) for item in delta["items"]], [(self.bun.id, 0)])
+
+    def test_garbled_cursor_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {"since": "yesterday"}).status_code, 400)
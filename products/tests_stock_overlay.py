@@ -0,0 +1,69 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from products.cache_utils import catalog_cache_key
+from products.models import Category, Product, Section
+from products.stock_overlay import _load_from_db, adjust_stock_levels, get_stock_levels
+
+
+class StockOverlayTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.section = Section.objects.create(name=Section.SectionType.BAKERY)
+        self.category = Category.objects.create(name="Bread", section=self.section)
+        self.product = Product.objects.create(
+            name="Milk Bread",
+            category=self.category,
+            price=Decimal("50.00"),
+            stock_qty=3,
+            image=SimpleUploadedFile("bread.jpg", b"image-bytes", content_type="image/jpeg"),
+        )
+        self.url = f"/api/products/categories/{self.category.id}/products/"
+
+    @override_settings(USE_CATALOG_READ_MODEL=False)
+    def test_cached_category_payload_has_no_stock_fields(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["stock_qty"], 3)
+
+        cache_key = catalog_cache_key("category_products", self.category.id, scopes=[("category", self.category.id)])
+        cached = cache.get(cache_key)
+        self.assertNotIn("stock_qty", cached[0])
+        self.assertNotIn("is_available", cached[0])
+
+    @override_settings(USE_CATALOG_READ_MODEL=False)
+    def test_sale_updates_overlay_without_dropping_cached_payload(self):
+        self.client.get(self.url)
+        cache_key = catalog_cache_key("category_products", self.category.id, scopes=[("category", self.category.id)])
+
+        Product.objects.filter(pk=self.product.pk).update(stock_qty=0, is_available=False)
+        adjust_stock_levels({self.product.pk: -3})
+
+        self.assertIsNotNone(cache.get(cache_key))
+        item = self.client.get(self.url).json()[0]
+        self.assertEqual(item["stock_qty"], 0)
+        self.assertFalse(item["is_available"])
+        self.assertIsNotNone(item["message"])
+
+    def test_admin_stock_save_overwrites_overlay(self):
+        self.assertEqual(get_stock_levels([self.product.pk]), {self.product.pk: 3})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.stock_qty = 12
+            self.product.save(update_fields=["stock_qty", "is_available"])
+        self.assertEqual(get_stock_levels([self.product.pk]), {self.product.pk: 12})
+
+    def test_fill_read_before_a_sale_is_not_stored(self):
+        def load_then_sell(product_ids):
+            levels = _load_from_db(product_ids)
+            Product.objects.filter(pk=self.product.pk).update(stock_qty=1)
+            # The sale's delta finds no field to adjust yet.
+            adjust_stock_levels({self.product.pk: -2})
+            return levels
+
+        with mock.patch("products.stock_overlay._load_from_db", side_effect=load_then_sell):
+            self.assertEqual(get_stock_levels([self.product.pk]), {self.product.pk: 3})
+        self.assertEqual(get_stock_levels([self.product.pk]), {self.product.pk: 1})
@@ -0,0 +1,95 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from orders.delivery_contact import get_delivery_contact_number
+from orders.models import DeliveryContactSetting
+from products.models import Advertisement, Category, Product, Section
+from products.views import StorefrontHomeView
+
+
+class StorefrontPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        bakery = Section.objects.create(name=Section.SectionType.BAKERY)
+        self.bread = Category.objects.create(name="Bread", section=bakery)
+        Product.objects.create(name="Milk Bread", category=self.bread, price=Decimal("30.00"), stock_qty=10)
+
+    def create_ad(self, title):
+        return Advertisement.objects.create(
+            title=title,
+            image=SimpleUploadedFile("ad.jpg", b"image-bytes", content_type="image/jpeg"),
+            display_order=1,
+        )
+
+    def test_anonymous_home_is_served_from_the_page_cache(self):
+        first = self.client.get("/")
+        self.assertEqual(first.status_code, 200)
+
+        with self.assertNumQueries(0):
+            second = self.client.get("/?utm_source=flyer")
+        self.assertEqual(second.content, first.content)
+
+    def test_ad_change_renders_a_fresh_home_page(self):
+        self.client.get("/")
+        self.create_ad("Weekend Cake Offer")
+
+        response = self.client.get("/")
+        self.assertContains(response, "Weekend Cake Offer")
+
+    def test_home_ads_cache_holds_rendered_fields(self):
+        ad = self.create_ad("Fresh Buns")
+        StorefrontHomeView._active_ads_by_slot()
+
+        with self.assertNumQueries(0):
+            ads = StorefrontHomeView._active_ads_by_slot()
+        self.assertEqual([item["id"] for item in ads], [ad.id])
+        self.assertEqual(ads[0]["image_url"], ad.image.url)
+
+    def test_signed_in_users_get_a_live_page_with_cached_fragments(self):
+        user = get_user_model().objects.create_user(username="staff", password="x", is_staff=True)
+        self.client.force_login(user)
+        self.client.get("/")
+
+        with mock.patch.object(StorefrontHomeView, "_active_ads_by_slot") as ads:
+            response = self.client.get("/")
+        self.assertEqual(response.status_code, 200)
+        ads.assert_not_called()
+
+    def test_category_rename_renders_a_fresh_category_page(self):
+        path = f"/bakery/category/{self.bread.id}/"
+        self.assertContains(self.client.get(path), "Bread")
+
+        self.bread.name = "Sourdough"
+        self.bread.save()
+
+        self.assertContains(self.client.get(path), "Sourdough")
+
+    def test_missing_category_is_not_cached(self):
+        path = "/bakery/category/999/"
+        self.assertEqual(self.client.get(path).status_code, 404)
+
+        Category.objects.create(id=999, name="Cookies", section=self.bread.section)
+        self.assertContains(self.client.get(path), "Cookies")
+
+
+class DeliveryContactCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_number_is_cached_until_the_dashboard_saves_it(self):
+        DeliveryContactSetting.objects.create(delivery_contact_number="9876543210")
+        self.assertEqual(get_delivery_contact_number(), "9876543210")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_delivery_contact_number(), "9876543210")
+
+        staff = get_user_model().objects.create_user(username="staff", password="x", is_staff=True)
+        self.client.force_login(staff)
+        self.client.post("/admin-dashboard/delivery-contact/", {"delivery_contact_number": "9123456780"})
+
+        self.assertEqual(get_delivery_contact_number(), "9123456780")
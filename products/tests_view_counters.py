@@ -0,0 +1,72 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from orders.analytics import unavailable_product_demand
+from products.models import Category, Product, ProductViewDaily, Section
+from products.view_counters import add_daily_views, flush_unavailable_views
+
+
+class UnavailableViewCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        section = Section.objects.create(name=Section.SectionType.BAKERY)
+        category = Category.objects.create(name="Cakes", section=section)
+        self.cake = Product.objects.create(name="Plum Cake", category=category, price=Decimal("250.00"), stock_qty=0)
+        self.tart = Product.objects.create(name="Fruit Tart", category=category, price=Decimal("90.00"), stock_qty=0)
+
+    def test_view_log_endpoint_counts_into_the_rollup_without_redis(self):
+        for _ in range(2):
+            response = self.client.post("/api/products/view-log/", {"product": self.cake.id})
+            self.assertEqual(response.status_code, 202)
+
+        self.assertEqual(ProductViewDaily.objects.get(product=self.cake).views, 2)
+
+    def test_add_daily_views_increments_existing_rows_and_skips_deleted_products(self):
+        day = date(2026, 10, 1)
+        ProductViewDaily.objects.create(product=self.cake, day=day, views=3)
+
+        stored = add_daily_views(day, {self.cake.id: 4, self.tart.id: 1, 999999: 7})
+
+        self.assertEqual(stored, 5)
+        self.assertEqual(
+            dict(ProductViewDaily.objects.filter(day=day).values_list("product_id", "views")),
+            {self.cake.id: 7, self.tart.id: 1},
+        )
+
+    def test_flush_moves_counters_and_restores_them_on_failure(self):
+        client = mock.MagicMock()
+        # Three days back (after missed flushes) through today.
+        client.pipeline.return_value.execute.side_effect = [
+            [{}, 0],
+            [{str(self.cake.id).encode(): b"1"}, 1],
+            [{}, 0],
+            [{str(self.tart.id).encode(): b"6"}, 1],
+        ]
+        with mock.patch("products.view_counters.get_redis_client", return_value=client):
+            self.assertEqual(flush_unavailable_views(), 7)
+        self.assertEqual(ProductViewDaily.objects.get(product=self.tart).views, 6)
+        cake_day = ProductViewDaily.objects.get(product=self.cake).day
+        self.assertEqual((timezone.localdate() - cake_day).days, 2)
+
+        client.pipeline.return_value.execute.side_effect = [[{str(self.tart.id).encode(): b"2"}, 1], None]
+        with mock.patch("products.view_counters.get_redis_client", return_value=client), mock.patch(
+            "products.view_counters.add_daily_views", side_effect=RuntimeError("db down")
+        ):
+            with self.assertRaises(RuntimeError):
+                flush_unavailable_views()
+        client.pipeline.return_value.hincrby.assert_called_with(mock.ANY, self.tart.id, 2)
+
+    def test_demand_analytics_sums_the_rollup(self):
+        ProductViewDaily.objects.create(product=self.cake, day=date(2026, 10, 1), views=2)
+        ProductViewDaily.objects.create(product=self.cake, day=date(2026, 10, 2), views=3)
+        ProductViewDaily.objects.create(product=self.tart, day=date(2026, 10, 2), views=4)
+
+        self.assertEqual(
+            unavailable_product_demand(),
+            [{"name": "Plum Cake", "views": 5}, {"name": "Fruit Tart", "views": 4}],
+        )
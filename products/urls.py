@@ -6,9 +6,14 @@ from .views import (
     ProductBySectionAPIView,
     ProductDetailAPIView,
     ProductSearchAPIView,
+    ProductSearchSuggestAPIView,
     ProductViewLogCreateAPIView,
     RelatedProductAPIView,
     CategoryCardAPIView,
+    CatalogBundleAPIView,
+    CatalogBundleStockAPIView,
+    CatalogBundleVersionAPIView,
+    CatalogChangeFeedAPIView,
 )
 
 urlpatterns = [
@@ -21,6 +26,16 @@ urlpatterns = [
     path('sections/<int:section_id>/categories/', CategoryBySectionAPIView.as_view(), name='category-by-section'),
     path('category-cards/', CategoryCardAPIView.as_view(), name='category-cards'),
 
+    # Whole menu in one versioned, immutable body
+    # Example: /api/products/bundle/version/ -> /api/products/bundle/?v=<version>
+    path('bundle/', CatalogBundleAPIView.as_view(), name='catalog-bundle'),
+    path('bundle/version/', CatalogBundleVersionAPIView.as_view(), name='catalog-bundle-version'),
+    path('bundle/stock/', CatalogBundleStockAPIView.as_view(), name='catalog-bundle-stock'),
+
+    # Incremental sync: product upserts and deletes after a sequence
+    # Example: /api/products/changes/?after=1200
+    path('changes/', CatalogChangeFeedAPIView.as_view(), name='catalog-changes'),
+
     # Products under a Section (across categories)
     path('sections/<int:section_id>/products/', ProductBySectionAPIView.as_view(), name='products-by-section'),
 
@@ -36,5 +51,7 @@ urlpatterns = [
     # 🔍 5. Search Products
     # Example: /api/products/search/?q=cake
     path('search/', ProductSearchAPIView.as_view(), name='product-search'),
+    # Example: /api/products/search/suggest/?q=choc
+    path('search/suggest/', ProductSearchSuggestAPIView.as_view(), name='product-search-suggest'),
     path('view-log/', ProductViewLogCreateAPIView.as_view(), name='product-view-log'),
 ]
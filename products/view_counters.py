@@ -0,0 +1,109 @@
+"""
+Unavailable-product view counters.
+
+Views are counted in one Redis hash per day (product id -> views) instead of
+one DB row per view. A periodic flush takes each hash atomically (read and
+delete in one MULTI) and adds the counts to the `ProductViewDaily` rollup that
+the analytics dashboard reads. The keys carry no catalog version, so catalog
+invalidations no longer orphan counts. Without Redis (local DEBUG runs) each
+view goes straight to the rollup.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from core.redis_client import get_redis_client, redis_key
+
+from .models import Product, ProductViewDaily
+
+logger = logging.getLogger(__name__)
+
+UNAVAILABLE_VIEWS_KEY = "products:unavailable_views"
+# Long enough to survive a few missed flushes.
+UNAVAILABLE_VIEWS_TTL = 3 * 24 * 60 * 60
+
+
+def _day_key(day):
+    return redis_key(f"{UNAVAILABLE_VIEWS_KEY}:{day.isoformat()}")
+
+
+def record_unavailable_view(product_id):
+    day = timezone.localdate()
+    client = get_redis_client()
+    if client is None:
+        add_daily_views(day, {int(product_id): 1})
+        return
+    key = _day_key(day)
+    pipe = client.pipeline(transaction=False)
+    pipe.hincrby(key, int(product_id), 1)
+    pipe.expire(key, UNAVAILABLE_VIEWS_TTL)
+    pipe.execute()
+
+
+def add_daily_views(day, counts) -> int:
+    """Add {product_id: views} to the rollup rows of `day`. Returns the views stored."""
+    counts = {int(product_id): int(views) for product_id, views in counts.items() if int(views) > 0}
+    # Counters can outlive a deleted product.
+    product_ids = set(Product.objects.filter(id__in=counts).values_list("id", flat=True))
+    counts = {product_id: views for product_id, views in counts.items() if product_id in product_ids}
+    if not counts:
+        return 0
+
+    with transaction.atomic():
+        rows = ProductViewDaily.objects.filter(day=day, product_id__in=counts)
+        existing = set(rows.values_list("product_id", flat=True))
+        if existing:
+            rows.update(
+                views=F("views")
+                + Case(
+                    *[When(product_id=product_id, then=Value(counts[product_id])) for product_id in existing],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+        ProductViewDaily.objects.bulk_create(
+            [
+                ProductViewDaily(product_id=product_id, day=day, views=views)
+                for product_id, views in counts.items()
+                if product_id not in existing
+            ]
+        )
+    return sum(counts.values())
+
+
+def flush_unavailable_views() -> int:
+    """Move every day's counters still alive into the rollup. Returns the views moved."""
+    client = get_redis_client()
+    if client is None:
+        return 0
+
+    today = timezone.localdate()
+    # Oldest first, back as far as a day key can outlive its day.
+    days = [today - timedelta(days=offset) for offset in range(UNAVAILABLE_VIEWS_TTL // (24 * 60 * 60), -1, -1)]
+    flushed = 0
+    for day in days:
+        key = _day_key(day)
+        pipe = client.pipeline(transaction=True)
+        pipe.hgetall(key)
+        pipe.delete(key)
+        raw_counts, _ = pipe.execute()
+        if not raw_counts:
+            continue
+        counts = {int(product_id): int(views) for product_id, views in raw_counts.items()}
+        try:
+            flushed += add_daily_views(day, counts)
+        except Exception:
+            # Put the counts back so the next flush retries them.
+            pipe = client.pipeline(transaction=False)
+            for product_id, views in counts.items():
+                pipe.hincrby(key, product_id, views)
+            pipe.expire(key, UNAVAILABLE_VIEWS_TTL)
+            pipe.execute()
+            raise
+    if flushed:
+        logger.info("Unavailable views flushed views=%s", flushed)
+    return flushed
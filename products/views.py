@@ -1,29 +1,58 @@
 import re
+from datetime import datetime, timedelta, timezone as dt_timezone
 from rest_framework import generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework import status
 from django.shortcuts import get_object_or_404
-from django.http import Http404
-from django.db.models import Q, Count, Sum
+from django.urls import reverse
+from django.http import Http404, HttpResponseRedirect
+from django.db.models import Q
 from django.db import transaction
 from django.db.utils import OperationalError, ProgrammingError
 from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.views.generic import TemplateView
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from django.utils.decorators import method_decorator
 from core.dashboard_auth import dashboard_staff_required as staff_member_required
 from django.core.files.storage import default_storage
 from django.utils.text import get_valid_filename
-from django.core.cache import cache
 from django.conf import settings
 from .models import Advertisement, Product, Section, Category, ProductViewLog
-from .cache_utils import catalog_cache_key, invalidate_catalog_cache
+from .cache_utils import (
+    CATALOG_STATIC_CACHE_TTL,
+    cached_catalog_entry,
+    catalog_scopes_current,
+    get_catalog_cache_version,
+    get_catalog_namespace_version,
+    get_catalog_scope_versions,
+)
+from .affinity import affinity_related_ids
+from .popularity import top_popular_product_ids
+from .cache_warmer import record_search_query
+from .catalog_changes import read_catalog_changes
+from .page_cache import CachedStorefrontPageMixin
+from .image_variants import image_variant_urls
+from .json_payload import encode_fragment, encode_json, encode_payload, json_response, splice_stock
+from .pagination import (
+    LEGACY_LIST_MAX_ITEMS,
+    LEGACY_SEARCH_MAX_ITEMS,
+    cursor_sort_key,
+    encode_cursor,
+    keyset_page,
+    page_envelope,
+    page_params,
+)
+from .read_model import READ_MODEL_NAMESPACE, CatalogReadModel, get_catalog_read_model
+from .stock_import import StockImportError, apply_stock_updates, parse_stock_csv
+from .stock_overlay import apply_stock_overlay, get_stock_levels, strip_stock_fields
 from .services import ProductService
 from .forms import AdminAdvertisementForm, AdminProductCreateForm
 from .tasks import process_product_image_upload_task
-from orders.delivery_contact import get_delivery_contact_number
-from orders.models import OrderItem
+from .view_counters import record_unavailable_view
+from orders.delivery_contact import delivery_contact_version, get_delivery_contact_number
 
 from .serializers import (
     ProductSerializer,
@@ -35,26 +64,23 @@ from .serializers import (
 )
 
 
-class StorefrontHomeView(TemplateView):
+class StorefrontHomeView(CachedStorefrontPageMixin, TemplateView):
     template_name = "products/storefront_home.html"
     OFFER_SLOTS = (1, 2, 3)
 
     @classmethod
     def _active_ads_by_slot(cls):
-        cache_key = catalog_cache_key("home_ads")
-        cached_ids = cache.get(cache_key)
-        if cached_ids:
-            ordered_ids = [item["id"] for item in cached_ids]
-            ads_map = Advertisement.objects.in_bulk(ordered_ids)
-            if len(ads_map) == len(ordered_ids):
-                return [ads_map[ad_id] for ad_id in ordered_ids]
+        return cached_catalog_entry("home_ads", build=cls._build_active_ads_by_slot, timeout=180)
 
+    @classmethod
+    def _build_active_ads_by_slot(cls):
         slot_ads = {}
         field_names = (
             "id",
             "title",
             "subtitle",
             "image",
+            "image_variants",
             "cta_label",
             "cta_url",
             "display_order",
@@ -79,30 +105,32 @@ class StorefrontHomeView(TemplateView):
             for slot, ad in zip(empty_slots, fallback_qs):
                 slot_ads[slot] = ad
 
-        payload = [{"id": ad.id} for ad in [slot_ads[slot] for slot in cls.OFFER_SLOTS if slot in slot_ads]]
-        cache.set(cache_key, payload, 180)
-        return [slot_ads[slot] for slot in cls.OFFER_SLOTS if slot in slot_ads]
+        # Cache what the carousel renders, not ids: a hit needs no query.
+        return [
+            {
+                "id": ad.id,
+                "title": ad.title,
+                "subtitle": ad.subtitle,
+                "image_url": ad.image.url if ad.image else "",
+                "images": image_variant_urls(ad.image.name, ad.image_variants),
+                "cta_label": ad.cta_label,
+                "cta_url": ad.cta_url,
+            }
+            for ad in [slot_ads[slot] for slot in cls.OFFER_SLOTS if slot in slot_ads]
+        ]
 
     @classmethod
     def _top_customer_choices_bakery(cls):
-        cache_key = catalog_cache_key("home_top_choices_bakery_v1")
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return cached
+        return cached_catalog_entry(
+            "home_top_choices_bakery_v1",
+            build=cls._build_top_customer_choices_bakery,
+            timeout=lambda payload: 300 if payload else 180,
+        )
 
+    @classmethod
+    def _build_top_customer_choices_bakery(cls):
         bakery_sections = ("Bakery", "Backery")
-        chosen_ids = []
-
-        ranked_rows = (
-            OrderItem.objects.filter(
-                product__category__section__name__in=bakery_sections,
-                product__is_available=True,
-            )
-            .values("product_id")
-            .annotate(total_qty=Sum("quantity"), total_orders=Count("order_id", distinct=True))
-            .order_by("-total_qty", "-total_orders", "-product_id")[:4]
-        )
-        chosen_ids.extend([row["product_id"] for row in ranked_rows if row.get("product_id")])
+        chosen_ids = top_popular_product_ids(bakery_sections, 4)
 
         if len(chosen_ids) < 4:
             fallback_ids = list(
@@ -117,7 +145,6 @@ class StorefrontHomeView(TemplateView):
             chosen_ids.extend(fallback_ids)
 
         if not chosen_ids:
-            cache.set(cache_key, [], 180)
             return []
 
         product_map = Product.objects.select_related("category").in_bulk(chosen_ids)
@@ -138,30 +165,20 @@ class StorefrontHomeView(TemplateView):
                 }
             )
 
-        payload = payload[:4]
-        cache.set(cache_key, payload, 300 if payload else 180)
-        return payload
+        return payload[:4]
 
     @classmethod
     def _top_customer_choices_snacks(cls):
-        cache_key = catalog_cache_key("home_top_choices_snacks_v1")
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return cached
+        return cached_catalog_entry(
+            "home_top_choices_snacks_v1",
+            build=cls._build_top_customer_choices_snacks,
+            timeout=lambda payload: 300 if payload else 180,
+        )
 
+    @classmethod
+    def _build_top_customer_choices_snacks(cls):
         snack_sections = ("Snacks", "Snack")
-        chosen_ids = []
-
-        ranked_rows = (
-            OrderItem.objects.filter(
-                product__category__section__name__in=snack_sections,
-                product__is_available=True,
-            )
-            .values("product_id")
-            .annotate(total_qty=Sum("quantity"), total_orders=Count("order_id", distinct=True))
-            .order_by("-total_qty", "-total_orders", "-product_id")[:4]
-        )
-        chosen_ids.extend([row["product_id"] for row in ranked_rows if row.get("product_id")])
+        chosen_ids = top_popular_product_ids(snack_sections, 4)
 
         if len(chosen_ids) < 4:
             fallback_ids = list(
@@ -176,7 +193,6 @@ class StorefrontHomeView(TemplateView):
             chosen_ids.extend(fallback_ids)
 
         if not chosen_ids:
-            cache.set(cache_key, [], 180)
             return []
 
         product_map = Product.objects.select_related("category").in_bulk(chosen_ids)
@@ -197,9 +213,14 @@ class StorefrontHomeView(TemplateView):
                 }
             )
 
-        payload = payload[:4]
-        cache.set(cache_key, payload, 300 if payload else 180)
-        return payload
+        return payload[:4]
+
+    def page_cache_versions(self):
+        return (
+            get_catalog_namespace_version("home_ads"),
+            get_catalog_namespace_version("home_top_choices"),
+            delivery_contact_version(),
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -210,9 +231,15 @@ class StorefrontHomeView(TemplateView):
             support_phone = ""
         support_phone_href = re.sub(r"[^0-9+]", "", support_phone)
         support_email = (settings.ADMIN_EMAIL or "support@thathwamasibakery.com").strip()
-        context["ads"] = self._active_ads_by_slot()
-        context["top_bakery_choices"] = self._top_customer_choices_bakery()
-        context["top_snacks_choices"] = self._top_customer_choices_snacks()
+        # Passed uncalled: the template only runs them when its fragment
+        # cache misses.
+        context["ads"] = self._active_ads_by_slot
+        context["top_bakery_choices"] = self._top_customer_choices_bakery
+        context["top_snacks_choices"] = self._top_customer_choices_snacks
+        context["fragment_cache_seconds"] = settings.STOREFRONT_FRAGMENT_CACHE_SECONDS
+        context["ads_version"] = get_catalog_namespace_version("home_ads")
+        context["top_choices_version"] = get_catalog_namespace_version("home_top_choices")
+        context["contact_version"] = delivery_contact_version()
         context["support_phone"] = support_phone
         context["support_phone_href"] = f"tel:{support_phone_href}" if support_phone_href else ""
         context["support_email"] = support_email
@@ -228,9 +255,12 @@ def _normalize_public_section_name(section_name):
     return section
 
 
-class StorefrontSectionView(TemplateView):
+class StorefrontSectionView(CachedStorefrontPageMixin, TemplateView):
     template_name = "products/storefront_section.html"
 
+    def page_cache_versions(self):
+        return (get_catalog_cache_version(),)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         section = _normalize_public_section_name(self.kwargs["section_name"])
@@ -239,9 +269,16 @@ class StorefrontSectionView(TemplateView):
         return context
 
 
-class StorefrontCategoryView(TemplateView):
+class StorefrontCategoryView(CachedStorefrontPageMixin, TemplateView):
     template_name = "products/storefront_category.html"
 
+    def page_cache_versions(self):
+        category_id = int(self.kwargs["category_id"])
+        return (
+            get_catalog_cache_version(),
+            get_catalog_scope_versions("category", [category_id])[category_id],
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         section = _normalize_public_section_name(self.kwargs["section_name"])
@@ -528,10 +565,40 @@ class AdminAdvertisingManageView(TemplateView):
         )
 
 
+# Delta cursors step back this far so a write committed just after a poll,
+# but stamped before it, is still picked up by the next one.
+STOCK_SYNC_OVERLAP = timedelta(seconds=10)
+
+
+def _encode_stock_cursor(moment):
+    return str(int((moment - _CURSOR_EPOCH).total_seconds() * 1_000_000))
+
+
+def _decode_stock_cursor(token):
+    try:
+        return _CURSOR_EPOCH + timedelta(microseconds=int(token))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
 class AdminStockListAPIView(APIView):
+    """
+    Stock tracker rows. With `?since=<cursor>` only products whose stock,
+    price or availability changed after the cursor are returned; every
+    response carries the cursor for the next poll.
+    """
+
     permission_classes = [IsAdminUser]
 
     def get(self, request):
+        since_token = request.GET.get("since")
+        since = None
+        if since_token:
+            since = _decode_stock_cursor(since_token)
+            if since is None:
+                return Response({"detail": "since must be a cursor returned by this endpoint"}, status=400)
+        cursor = _encode_stock_cursor(timezone.now() - STOCK_SYNC_OVERLAP)
+
         section_key = (request.GET.get("section") or "").strip().lower()
         products = Product.objects.select_related("category", "category__section").only(
             "id",
@@ -554,7 +621,10 @@ class AdminStockListAPIView(APIView):
             else:
                 products = products.filter(category__section__name__icontains=section_key)
 
-        products = products.order_by("category__section__name", "category__name", "name")
+        if since is not None:
+            products = products.filter(updated_at__gt=since).order_by("updated_at")
+        else:
+            products = products.order_by("category__section__name", "category__name", "name")
         payload = [
             {
                 "id": product.id,
@@ -567,7 +637,7 @@ class AdminStockListAPIView(APIView):
             }
             for product in products
         ]
-        return Response({"items": payload})
+        return Response({"items": payload, "cursor": cursor, "full": since is None})
 
 
 class AdminStockUpdateAPIView(APIView):
@@ -586,8 +656,8 @@ class AdminStockUpdateAPIView(APIView):
         product = get_object_or_404(Product, pk=product_id)
         product.stock_qty = stock_qty
         product.is_available = stock_qty > 0
-        product.save(update_fields=["stock_qty", "is_available"])
-        invalidate_catalog_cache()
+        # The post_save receiver bumps only this product's catalog scopes.
+        product.save(update_fields=["stock_qty", "is_available", "updated_at"])
 
         return Response(
             {
@@ -599,21 +669,45 @@ class AdminStockUpdateAPIView(APIView):
         )
 
 
+class AdminStockBulkUpdateAPIView(APIView):
+    """
+    Apply many stock/price rows at once, from JSON `{"items": [...]}` or a
+    CSV upload in `file`. Bad rows are reported in `errors` and skipped.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        try:
+            upload = request.FILES.get("file")
+            if upload is not None:
+                rows = parse_stock_csv(upload)
+            else:
+                rows = request.data.get("items") if hasattr(request.data, "get") else None
+                if not isinstance(rows, list):
+                    return Response({"detail": "Send items as a list or a CSV file"}, status=400)
+            result = apply_stock_updates(rows)
+        except StockImportError as exc:
+            return Response({"detail": str(exc)}, status=400)
+        return Response(result, status=status.HTTP_200_OK)
+
+
 # 🧁 List all Sections (Bakery, Snacks)
 class SectionListAPIView(generics.ListAPIView):
     serializer_class = SectionSerializer
     pagination_class = None
 
     def list(self, request, *args, **kwargs):
-        cache_key = catalog_cache_key("sections")
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
+        if settings.USE_CATALOG_READ_MODEL:
+            model = get_catalog_read_model()
+            payload = model.encoded("sections", lambda: [section.as_payload() for section in model.sections])
+            return json_response(request, payload)
 
-        queryset = Section.objects.only("id", "name").order_by("name")
-        payload = self.get_serializer(queryset, many=True).data
-        cache.set(cache_key, payload, 180)
-        return Response(payload)
+        def build():
+            queryset = Section.objects.only("id", "name").order_by("name")
+            return encode_payload(self.get_serializer(queryset, many=True).data)
+
+        return json_response(request, cached_catalog_entry("sections_json", build=build, timeout=180))
 
 
 # 🍞 Categories by Section
@@ -627,14 +721,21 @@ class CategoryBySectionAPIView(generics.ListAPIView):
 
     def list(self, request, *args, **kwargs):
         section_id = self.kwargs["section_id"]
-        cache_key = catalog_cache_key("section_categories", section_id)
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
+        if settings.USE_CATALOG_READ_MODEL:
+            model = get_catalog_read_model()
+            payload = model.encoded(
+                ("section_categories", section_id),
+                lambda: [category.as_payload() for category in model.categories_for_section(section_id)],
+            )
+            return json_response(request, payload)
 
-        payload = self.get_serializer(self.get_queryset(), many=True).data
-        cache.set(cache_key, payload, 180)
-        return Response(payload)
+        payload = cached_catalog_entry(
+            "section_categories_json",
+            section_id,
+            build=lambda: encode_payload(self.get_serializer(self.get_queryset(), many=True).data),
+            timeout=180,
+        )
+        return json_response(request, payload)
 
 
 class CategoryCardAPIView(APIView):
@@ -647,7 +748,188 @@ class CategoryCardAPIView(APIView):
         section = request.GET.get("section", "").strip()
         if not section:
             return Response({"detail": "section query param is required"}, status=400)
-        return Response(ProductService.category_cards(section))
+        return json_response(request, ProductService.category_cards_json(section))
+
+
+# A bundle URL carries its catalog version, so its body never changes.
+CATALOG_BUNDLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def _catalog_bundle_version():
+    if settings.USE_CATALOG_READ_MODEL:
+        return str(get_catalog_read_model().version)
+    return get_catalog_namespace_version(READ_MODEL_NAMESPACE)
+
+
+def _catalog_bundle():
+    """(version, encoded bundle) for the catalog this worker currently serves."""
+    if settings.USE_CATALOG_READ_MODEL:
+        model = get_catalog_read_model()
+        return str(model.version), model.bundle()
+
+    def build():
+        version = get_catalog_namespace_version(READ_MODEL_NAMESPACE)
+        return {"version": version, "payload": CatalogReadModel.build(version).bundle()}
+
+    entry = cached_catalog_entry("catalog_bundle_json", build=build, timeout=CATALOG_STATIC_CACHE_TTL)
+    return entry["version"], entry["payload"]
+
+
+class CatalogBundleVersionAPIView(APIView):
+    """
+    Current catalog bundle version and its URL. Clients keep the bundle they
+    have until this changes.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        version = _catalog_bundle_version()
+        url = f"{reverse('catalog-bundle')}?v={version}"
+        return json_response(request, encode_json({"version": version, "url": url}))
+
+
+class CatalogBundleAPIView(APIView):
+    """
+    Sections -> categories -> product cards in one stock-free body.
+
+    `?v=<version>` for the current version is served as immutable; any other
+    (or no) version redirects to the current URL. Live stock comes from
+    CatalogBundleStockAPIView.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        version, payload = _catalog_bundle()
+        if request.GET.get("v") != version:
+            response = HttpResponseRedirect(f"{request.path}?v={version}")
+            patch_cache_control(response, no_cache=True)
+            return response
+        return json_response(request, payload, max_age=CATALOG_BUNDLE_MAX_AGE)
+
+
+class CatalogBundleStockAPIView(APIView):
+    """`{product_id: stock_qty}` for every bundle product, from the stock overlay."""
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        if settings.USE_CATALOG_READ_MODEL:
+            product_ids = get_catalog_read_model().products_by_id.keys()
+        else:
+            product_ids = Product.objects.values_list("id", flat=True)
+        levels = get_stock_levels(product_ids)
+        return json_response(request, encode_json({str(pk): max(int(qty), 0) for pk, qty in levels.items()}))
+
+
+class CatalogChangeFeedAPIView(APIView):
+    """
+    Product changes after `?after=<seq>`: current cards for upserted
+    products and ids of deleted ones. Clients store `seq` and resume from
+    it, following up straight away while `has_more` is true.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            after = int(request.GET.get("after") or 0)
+        except (TypeError, ValueError):
+            after = -1
+        if after < 0:
+            return Response({"detail": "after must be a sequence returned by this endpoint"}, status=400)
+
+        upsert_ids, delete_ids, seq, has_more = read_catalog_changes(after)
+        products = Product.objects.select_related("category", "category__section").in_bulk(upsert_ids)
+        # A product deleted since its upsert was logged is reported as deleted
+        # now; its own delete row follows later and is harmless to re-apply.
+        delete_ids.extend(pk for pk in upsert_ids if pk not in products)
+        upserts = ProductCardSerializer(
+            [products[pk] for pk in upsert_ids if pk in products], many=True, context={"request": request}
+        ).data
+        payload = {"seq": seq, "has_more": has_more, "upserts": upserts, "deletes": delete_ids}
+        return json_response(request, encode_json(payload))
+
+
+_CURSOR_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _read_model_listing_response(request, model, list_key, products):
+    params = page_params(request)
+    if params.invalid_cursor:
+        return Response({"detail": "invalid cursor"}, status=400)
+    if not params.paginated:
+        body, _ = splice_stock(model.card_fragments(products[:LEGACY_LIST_MAX_ITEMS], request))
+        return json_response(request, body)
+
+    keys = model.listing_keys(list_key, products)
+    page, has_more = keyset_page(products, keys, cursor_sort_key(params.cursor), params.page_size)
+    body, _ = splice_stock(model.card_fragments(page, request))
+    next_cursor = None
+    if has_more:
+        last = page[-1]
+        next_cursor = encode_cursor((last.created_ts, last.name, last.id))
+    return json_response(request, page_envelope(request, body, next_cursor))
+
+
+def _cached_listing_response(view, request, namespace, scope_kind, scope_id):
+    params = page_params(request)
+    if params.invalid_cursor:
+        return Response({"detail": "invalid cursor"}, status=400)
+    if not params.paginated:
+        payload = cached_catalog_entry(
+            namespace,
+            scope_id,
+            scopes=[(scope_kind, scope_id)],
+            build=lambda: strip_stock_fields(
+                view.get_serializer(
+                    view.get_queryset()[:LEGACY_LIST_MAX_ITEMS], many=True, context={"request": request}
+                ).data
+            ),
+            timeout=CATALOG_STATIC_CACHE_TTL,
+        )
+        return json_response(request, encode_json(apply_stock_overlay(payload)))
+
+    def build_page():
+        queryset = view.get_queryset().order_by("-created_at", "name", "id")
+        cursor = params.cursor
+        if cursor_sort_key(cursor) is not None:
+            created_at = _CURSOR_EPOCH + timedelta(microseconds=int(cursor[0]))
+            name, pk = str(cursor[1]), int(cursor[2])
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at)
+                | Q(created_at=created_at, name__gt=name)
+                | Q(created_at=created_at, name=name, id__gt=pk)
+            )
+        products = list(queryset[: params.page_size + 1])
+        page = products[: params.page_size]
+        next_cursor = None
+        if len(products) > params.page_size:
+            last = page[-1]
+            next_cursor = encode_cursor(
+                (int(last.created_at.timestamp() * 1_000_000), last.name, last.id)
+            )
+        payload = view.get_serializer(page, many=True, context={"request": request}).data
+        return {"payload": strip_stock_fields(payload), "next_cursor": next_cursor}
+
+    # Every page is its own entry, versioned by the same scope as the full list.
+    entry = cached_catalog_entry(
+        namespace,
+        scope_id,
+        "page",
+        params.page_size,
+        request.GET.get("cursor") or "first",
+        scopes=[(scope_kind, scope_id)],
+        build=build_page,
+        timeout=CATALOG_STATIC_CACHE_TTL,
+    )
+    body = encode_json(apply_stock_overlay(entry["payload"]))
+    return json_response(request, page_envelope(request, body, entry["next_cursor"]))
 
 
 # 🍩 Products by Category
@@ -671,6 +953,7 @@ class ProductByCategoryAPIView(generics.ListAPIView):
                 "stock_qty",
                 "is_available",
                 "image",
+                "image_variants",
                 "category__id",
                 "category__name",
                 "category__section__name",
@@ -681,14 +964,11 @@ class ProductByCategoryAPIView(generics.ListAPIView):
 
     def list(self, request, *args, **kwargs):
         category_id = self.kwargs["category_id"]
-        cache_key = catalog_cache_key("category_products", category_id)
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-
-        payload = self.get_serializer(self.get_queryset(), many=True, context={"request": request}).data
-        cache.set(cache_key, payload, 180)
-        return Response(payload)
+        if settings.USE_CATALOG_READ_MODEL:
+            model = get_catalog_read_model()
+            products = model.products_for_category(category_id)
+            return _read_model_listing_response(request, model, ("category", category_id), products)
+        return _cached_listing_response(self, request, "category_products", "category", category_id)
 
 
 class ProductBySectionAPIView(generics.ListAPIView):
@@ -711,6 +991,7 @@ class ProductBySectionAPIView(generics.ListAPIView):
                 "stock_qty",
                 "is_available",
                 "image",
+                "image_variants",
                 "category__id",
                 "category__name",
                 "category__section__name",
@@ -721,51 +1002,109 @@ class ProductBySectionAPIView(generics.ListAPIView):
 
     def list(self, request, *args, **kwargs):
         section_id = self.kwargs["section_id"]
-        cache_key = catalog_cache_key("section_products", section_id)
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
-
-        payload = self.get_serializer(self.get_queryset(), many=True, context={"request": request}).data
-        cache.set(cache_key, payload, 180)
-        return Response(payload)
+        if settings.USE_CATALOG_READ_MODEL:
+            model = get_catalog_read_model()
+            products = model.products_for_section(section_id)
+            return _read_model_listing_response(request, model, ("section", section_id), products)
+        return _cached_listing_response(self, request, "section_products", "section", section_id)
 
 
 # single product details
-def _record_unavailable_view(product_id):
-    """Aggregate unavailable product views in cache to avoid per-request DB writes."""
-    cache_key = catalog_cache_key("unavailable_view", product_id)
-    try:
-        cache.incr(cache_key)
-    except ValueError:
-        cache.set(cache_key, 1, 24 * 60 * 60)
-
-
 class ProductDetailAPIView(generics.RetrieveAPIView):
     queryset = Product.objects.select_related("category", "category__section").prefetch_related("related_products")
     serializer_class = ProductSerializer
 
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-
-        if not instance.is_available:
-            _record_unavailable_view(instance.id)
-
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        product_id = self.kwargs["pk"]
+        model = get_catalog_read_model() if settings.USE_CATALOG_READ_MODEL else None
+        record = model.product(product_id) if model is not None else None
+        if record is not None:
+            body, levels = splice_stock([model.detail_fragment(record, request)])
+            if levels.get(record.id, 0) <= 0:
+                record_unavailable_view(product_id)
+            return json_response(request, body[1:-1])
+
+        # Also covers products created since this worker last refreshed its read model.
+        cached = cached_catalog_entry(
+            "product_detail",
+            product_id,
+            scopes=[("product", product_id)],
+            build=lambda: strip_stock_fields([self.get_serializer(self.get_object()).data])[0],
+            timeout=CATALOG_STATIC_CACHE_TTL,
+        )
+        payload = apply_stock_overlay([cached])[0]
+        if not payload["is_available"]:
+            record_unavailable_view(product_id)
+        return json_response(request, encode_json(payload))
 
 
 class ProductSearchAPIView(APIView):
     def get(self, request):
         query = (request.GET.get("q") or "").strip()
         if not query:
-            return Response([])
+            return json_response(request, b"[]")
+        params = page_params(request)
+        if params.invalid_cursor:
+            return Response({"detail": "invalid cursor"}, status=400)
+        if settings.USE_CATALOG_READ_MODEL:
+            model = get_catalog_read_model()
+            index = model.search_index
+            if params.paginated:
+                after = cursor_sort_key(params.cursor)
+                scored = index.search_scored(query, limit=params.page_size + 1, after=after)
+            else:
+                scored = index.search_scored(query, limit=LEGACY_SEARCH_MAX_ITEMS)
+            if scored or (params.cursor is not None and index.search_scored(query, limit=1)):
+                return self._index_response(request, model, scored, params)
+            # Nothing matched in memory: let Postgres FTS (stemming, ranking
+            # over search_vector) have a go before answering with no results.
+
+        if not getattr(request, "catalog_warmup", False):
+            record_search_query(query)
+
+        # Entries remember the version of every product they contain, so a
+        # price or image edit only drops the searches that include it.
+        entry = cached_catalog_entry(
+            "search_json",
+            query.lower()[:64],
+            build=lambda: self._build_entry(request, query),
+            timeout=lambda entry: 120 if len(entry["fragments"]) < 10 else 180,
+            is_current=lambda entry: catalog_scopes_current("product", entry["product_versions"]),
+        )
+        fragments = entry["fragments"]
+        if not params.paginated:
+            body, _ = splice_stock(fragments)
+            return json_response(request, body)
+
+        # FTS results are a capped snapshot cached per query, so the cursor
+        # is simply the position reached in that snapshot.
+        start = 0
+        if params.cursor is not None:
+            start = max(int(params.cursor[0]), 0)
+        page = fragments[start:start + params.page_size]
+        next_cursor = None
+        if start + params.page_size < len(fragments):
+            end = start + params.page_size
+            next_cursor = encode_cursor((end, "", page[-1][0]))
+        body, _ = splice_stock(page)
+        return json_response(request, page_envelope(request, body, next_cursor))
 
-        cache_key = catalog_cache_key("search", query.lower()[:64])
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return Response(cached)
+    @staticmethod
+    def _index_response(request, model, scored, params):
+        if not params.paginated:
+            body, _ = splice_stock(model.card_fragments([product for _, product in scored], request))
+            return json_response(request, body)
+
+        page = scored[: params.page_size]
+        next_cursor = None
+        if len(scored) > params.page_size:
+            score, last = page[-1]
+            next_cursor = encode_cursor((score, last.name, last.id))
+        body, _ = splice_stock(model.card_fragments([product for _, product in page], request))
+        return json_response(request, page_envelope(request, body, next_cursor))
 
+    @staticmethod
+    def _build_entry(request, query):
         if settings.USE_LAYERED_ARCHITECTURE:
             products = ProductService.search(query)
         else:
@@ -790,9 +1129,46 @@ class ProductSearchAPIView(APIView):
                     .order_by("name")
                 )
 
-        payload = ProductCardSerializer(products, many=True, context={"request": request}).data
-        cache.set(cache_key, payload, 120 if len(payload) < 10 else 180)
-        return Response(payload)
+        products = products[:LEGACY_SEARCH_MAX_ITEMS]
+        payload = strip_stock_fields(ProductCardSerializer(products, many=True, context={"request": request}).data)
+        return {
+            "product_versions": get_catalog_scope_versions("product", [item["id"] for item in payload]),
+            "fragments": [(item["id"], encode_fragment(item)) for item in payload],
+        }
+
+
+class ProductSearchSuggestAPIView(APIView):
+    MAX_LIMIT = 20
+
+    def get(self, request):
+        query = (request.GET.get("q") or "").strip()
+        try:
+            limit = min(max(int(request.GET.get("limit", 8)), 1), self.MAX_LIMIT)
+        except (TypeError, ValueError):
+            limit = 8
+        if not query:
+            return json_response(request, b"[]")
+
+        if settings.USE_CATALOG_READ_MODEL:
+            products = get_catalog_read_model().search_index.search(query, limit=limit)
+            return json_response(request, encode_json([product.as_suggestion() for product in products]))
+
+        rows = (
+            Product.objects.filter(name__icontains=query)
+            .order_by("name")
+            .values("id", "name", "category__name", "category__section__name")[:limit]
+        )
+        payload = [
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "category_name": row["category__name"],
+                "section_name": row["category__section__name"],
+            }
+            for row in rows
+        ]
+        return json_response(request, encode_json(payload))
+
 
 class ProductViewLogCreateAPIView(APIView):
     authentication_classes = []
@@ -802,7 +1178,7 @@ class ProductViewLogCreateAPIView(APIView):
         serializer = ProductViewLogSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         product = serializer.validated_data["product"]
-        _record_unavailable_view(product.id)
+        record_unavailable_view(product.id)
         return Response({"status": "accepted"}, status=status.HTTP_202_ACCEPTED)
 
 
@@ -810,6 +1186,38 @@ class RelatedProductAPIView(generics.ListAPIView):
     serializer_class = RelatedProductSerializer
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        model = get_catalog_read_model() if settings.USE_CATALOG_READ_MODEL else None
+        product = model.product(self.kwargs["pk"]) if model is not None else None
+        if product is None:
+            queryset = self.get_queryset()
+            return json_response(request, encode_json(self.get_serializer(queryset, many=True).data))
+
+        # Same rules as get_queryset, with availability read from the stock overlay.
+        def available(candidates, limit=None):
+            candidates = [candidate for candidate in candidates if candidate is not None]
+            levels = get_stock_levels([candidate.id for candidate in candidates])
+            return [candidate for candidate in candidates if levels.get(candidate.id, 0) > 0][:limit]
+
+        related = available(model.product(pk) for pk in product.related_ids)
+        if not related:
+            related = available((model.product(pk) for pk in affinity_related_ids(product.id)), limit=8)
+        if not related:
+            related = available(
+                (
+                    candidate for candidate in model.products_for_category(product.category_id)
+                    if candidate.id != product.id
+                ),
+                limit=8,
+            )
+
+        payload = []
+        for candidate in related:
+            item = candidate.as_related(request)
+            item["is_available"] = True
+            payload.append(item)
+        return json_response(request, encode_json(payload))
+
     def get_queryset(self):
         product_id = self.kwargs["pk"]
         product = get_object_or_404(
@@ -821,6 +1229,16 @@ class RelatedProductAPIView(generics.ListAPIView):
         if explicit_related.exists():
             return explicit_related.select_related("category", "category__section")
 
+        # Then what customers bought together with it, best neighbours first.
+        affinity_ids = affinity_related_ids(product.pk)
+        if affinity_ids:
+            neighbours = Product.objects.filter(pk__in=affinity_ids, is_available=True).select_related(
+                "category", "category__section"
+            )
+            neighbours = sorted(neighbours, key=lambda candidate: affinity_ids.index(candidate.pk))
+            if neighbours:
+                return neighbours
+
         return Product.objects.filter(
             category=product.category,
             is_available=True,